@@ -0,0 +1,495 @@
+# bench.py
+# Benchmarks for the hot paths: pokemon search, one round of each of the seven
+# games, and the nine leaderboards, against databases seeded with 10k / 1M / 10M
+# leaderboard rows. Every path is the real function from project.py, run with
+# scripted answers and the output thrown away, so the numbers are what a player
+# waits for. Reports p50/p95/p99 and throughput, saves them as JSON, and compares
+# them with a stored baseline so a slowdown shows up here and not in complaints.
+#
+# python bench.py                                  -> 10k rows, compared with bench_baseline.json
+# python bench.py --rows 10k 1m 10m --iterations 500
+# python bench.py --rows 10k --save-baseline       -> records the current numbers as the baseline
+# python bench.py --startup                        -> cold start to the first prompt, fails over budget
+#
+# The seeded databases are SQLite files in bench_data/ (seeded once, reused after).
+# --backend mysql runs against the configured MySQL database instead, that has to
+# be a scratch database, it gets filled with fake players and rounds.
+
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+
+SIZES = {'k': 1_000, 'm': 1_000_000}
+
+# every hot path by name, grouped so the report reads in menu order
+SEARCH_PATHS = ['search_exact', 'search_typo']
+GAME_PATHS = {
+    'round_guess_stats': 'guess_stats_game',
+    'round_guess_weight': 'guess_weight_game',
+    'round_guess_species': 'guess_species_game',
+    'round_guess_egg_group': 'guess_egg_group_game',
+    'round_guess_dexnum': 'guess_dexnum_game',
+    'round_guess_ability': 'guess_ability_game',
+    'round_guess_type': 'guess_type_game',
+}
+LEADERBOARD_PATHS = {
+    'board_general': 'view_general_leaderboard',
+    'board_guess_weight': 'view_guess_weight_leaderboard',
+    'board_guess_stats': 'view_guess_stats_leaderboard',
+    'board_guess_species': 'view_guess_species_leaderboard',
+    'board_guess_egg_group': 'view_guess_egg_group_leaderboard',
+    'board_guess_dexnum': 'view_guess_dexnum_leaderboard',
+    'board_guess_ability': 'view_guess_ability_leaderboard',
+    'board_guess_type': 'view_guess_type_leaderboard',
+    'board_favorites': 'view_favorite_pokemon_leaderboard',
+}
+
+
+# "10k" -> 10000, "1m" -> 1000000, plain numbers work too
+def parse_rows(text):
+    text = text.strip().lower().replace('_', '')
+    if text[-1:] in SIZES:
+        return int(float(text[:-1]) * SIZES[text[-1]])
+    return int(text)
+
+def label(rows):
+    for suffix, size in sorted(SIZES.items(), key=lambda s: -s[1]):
+        if rows >= size and rows % size == 0:
+            return f"{rows // size}{suffix}"
+    return str(rows)
+
+
+# --------------------------------------------------------------------
+# SEEDING
+# --------------------------------------------------------------------
+
+TYPES = ['Normal', 'Fire', 'Water', 'Grass', 'Electric', 'Ice', 'Fighting', 'Poison', 'Ground',
+         'Flying', 'Psychic', 'Bug', 'Rock', 'Ghost', 'Dragon', 'Dark', 'Steel', 'Fairy']
+EGG_GROUPS = ['Amorphous', 'Bug', 'Dragon', 'Fairy', 'Field', 'Flying', 'Grass', 'Human-Like',
+              'Mineral', 'Monster', 'Water 1', 'Water 2', 'Water 3']
+GROWTH_RATES = ['Erratic', 'Fast', 'Medium Fast', 'Medium Slow', 'Slow', 'Fluctuating']
+SYLLABLES = ['bul', 'ba', 'saur', 'char', 'man', 'der', 'squir', 'tle', 'pi', 'ka', 'chu', 'ee',
+             'vee', 'gen', 'gar', 'on', 'ix', 'mew', 'tw', 'dra', 'go', 'nite', 'lu', 'cario']
+
+GUESS_INSERTS = {
+    'leaderboard_guess_stats': (
+        "INSERT INTO leaderboard_guess_stats (user_id, pokemon_id, is_correct, score, created_at) "
+        "VALUES (%s, %s, %s, %s, %s);",
+        lambda rng, ids, user, p1, p2, ok, score: (user, p1, ok, score)),
+    'leaderboard_guess_weight': (
+        "INSERT INTO leaderboard_guess_weight (user_id, pokemon1_id, pokemon2_id, user_choice_id, "
+        "correct_pokemon_id, is_correct, score, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s);",
+        lambda rng, ids, user, p1, p2, ok, score: (user, p1, p2, p1, p1 if ok else p2, ok, score)),
+    'leaderboard_guess_species': (
+        "INSERT INTO leaderboard_guess_species (user_id, given_species, guessed_pokemon_id, is_correct, "
+        "score, created_at) VALUES (%s, %s, %s, %s, %s, %s);",
+        lambda rng, ids, user, p1, p2, ok, score: (user, f"Bench {p1 % 50} Pokemon", p1, ok, score)),
+    'leaderboard_guess_egg_group': (
+        "INSERT INTO leaderboard_guess_egg_group (user_id, pokemon1_id, pokemon2_id, share_egg_group, "
+        "user_answer, is_correct, score, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s);",
+        lambda rng, ids, user, p1, p2, ok, score: (user, p1, p2, ok, True, ok, score)),
+    'leaderboard_guess_dexnum': (
+        "INSERT INTO leaderboard_guess_dexnum (user_id, shown_dex, user_choice_id, correct_pokemon_id, "
+        "is_correct, score, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s);",
+        lambda rng, ids, user, p1, p2, ok, score: (user, p1, p1 if ok else p2, p1, ok, score)),
+    'leaderboard_guess_ability': (
+        "INSERT INTO leaderboard_guess_ability (user_id, ability_id, guessed_pokemon_id, is_correct, "
+        "score, created_at) VALUES (%s, %s, %s, %s, %s, %s);",
+        lambda rng, ids, user, p1, p2, ok, score: (user, rng.choice(ids['abilities']), p1, ok, score)),
+    'leaderboard_guess_type': (
+        "INSERT INTO leaderboard_guess_type (user_id, type1_id, type2_id, guessed_pokemon_id, is_correct, "
+        "score, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s);",
+        lambda rng, ids, user, p1, p2, ok, score: (user, rng.choice(ids['types']), None, p1, ok, score)),
+}
+
+
+def fake_pokemon(rng, count=1025):
+    names = set()
+    while len(names) < count:
+        names.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize())
+    records = []
+    for dexnum, name in enumerate(sorted(names, key=lambda n: rng.random()), start=1):
+        stats = [rng.randint(20, 160) for _ in range(6)]
+        type1, type2 = rng.sample(TYPES, 2)
+        egg1, egg2 = rng.sample(EGG_GROUPS, 2)
+        records.append({
+            'pokemon_id': dexnum, 'name': name, 'generation': (dexnum - 1) // 120 + 1,
+            'species': f"Bench {dexnum % 50} Pokemon", 'height': rng.randint(1, 50) / 10,
+            'weight': rng.randint(1, 9000) / 10, 'base_exp': rng.randint(40, 300),
+            'catch_rate': rng.randint(3, 255), 'base_friendship': 50, 'egg_cycles': 20,
+            'growth_rate': rng.choice(GROWTH_RATES), 'special_group': 'Ordinary',
+            'hp': stats[0], 'attack': stats[1], 'defense': stats[2], 'sp_atk': stats[3],
+            'sp_def': stats[4], 'speed': stats[5], 'total': sum(stats), 'ev_yield': '1 HP',
+            'type1': type1, 'type2': type2 if rng.random() < 0.5 else None,
+            'ability1': f"Ability {rng.randint(1, 200)}", 'ability2': None,
+            'hidden_ability': f"Ability {rng.randint(1, 200)}",
+            'egg_group1': egg1, 'egg_group2': egg2 if rng.random() < 0.5 else None,
+        })
+    return records
+
+# fills an empty database with pokemon, players and `rows` rounds of history
+# (rows in leaderboard_general, and the same rows spread over the seven game tables)
+def seed(pool, rows, chunk=10_000, rng=None):
+    from leaderboards import recompute_period_totals, recompute_totals
+    from load_pokedex import PokedexLoader
+
+    rng = rng or random.Random(1025)
+    loader = PokedexLoader(pool.cursor)
+    loader.load_lookups()
+    pokemon = fake_pokemon(rng)
+    loader.load_batch(pokemon)
+    pokemon_ids = [p['pokemon_id'] for p in pokemon]
+    ids = {table: sorted(loader.ids[table].values()) for table in ('abilities', 'types')}
+
+    users = min(max(rows // 100, 50), 100_000)
+    with pool.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO users (user_id, username, email, password) VALUES (%s, %s, %s, %s);",
+            [(u, f"player{u}", f"player{u}@bench.local", 'bench') for u in range(1, users + 1)])
+        cursor.executemany(
+            "INSERT INTO user_profiles (user_id, display_name, role_id) VALUES (%s, %s, 3);",
+            [(u, f"Player {u}") for u in range(1, users + 1)])
+        favorites = [(u, rng.choice(pokemon_ids)) for u in range(1, users + 1)]
+        cursor.executemany("INSERT INTO user_favorite_pokemon (user_id, pokemon_id) VALUES (%s, %s);", favorites)
+        counts = {}
+        for _, pokemon_id in favorites:
+            counts[pokemon_id] = counts.get(pokemon_id, 0) + 1
+        cursor.executemany("INSERT INTO pokemon_favorites_count (pokemon_id, favorite_count) VALUES (%s, %s);",
+                           list(counts.items()))
+        cursor.execute("SELECT mode_id, mode_name FROM game_modes;")
+        modes = {r["mode_name"]: r["mode_id"] for r in cursor.fetchall()}
+
+    tables = list(GUESS_INSERTS)
+    now = datetime.now().replace(microsecond=0)
+    done = 0
+    while done < rows:
+        n = min(chunk, rows - done)
+        general = []
+        by_table = {}
+        for i in range(n):
+            table = tables[(done + i) % len(tables)]
+            user = rng.randint(1, users)
+            p1, p2 = rng.sample(pokemon_ids, 2)
+            ok = rng.random() < 0.5
+            score = rng.choice((10, 20, 50, 100)) if ok else 0
+            created = now - timedelta(seconds=rng.randint(0, 90 * 24 * 3600))
+            insert, build = GUESS_INSERTS[table]
+            by_table.setdefault(table, []).append((*build(rng, ids, user, p1, p2, ok, score), created))
+            general.append((user, modes[table[len('leaderboard_'):]], score, int(ok), int(not ok), created))
+        with pool.cursor() as cursor:
+            for table, params in by_table.items():
+                cursor.executemany(GUESS_INSERTS[table][0], params)
+            cursor.executemany(
+                "INSERT INTO leaderboard_general (user_id, mode_id, score, correct, incorrect, created_at) "
+                "VALUES (%s, %s, %s, %s, %s, %s);", general)
+        done += n
+        print(f"\r  seeded {done:,}/{rows:,} rounds", end='', flush=True)
+    print()
+
+    with pool.cursor() as cursor:
+        recompute_totals(cursor)
+        recompute_period_totals(cursor)
+        # marks the database as finished, a seed that died halfway gets redone
+        cursor.execute("CREATE TABLE IF NOT EXISTS bench_meta (seeded_rows BIGINT NOT NULL);")
+        cursor.execute("INSERT INTO bench_meta (seeded_rows) VALUES (%s);", (rows,))
+
+def seeded_rows(pool):
+    with pool.cursor() as cursor:
+        try:
+            cursor.execute("SELECT seeded_rows FROM bench_meta;")
+        except Exception:
+            return None
+        row = cursor.fetchone()
+    return row["seeded_rows"] if row else None
+
+
+# --------------------------------------------------------------------
+# MEASURING
+# --------------------------------------------------------------------
+
+# nearest-rank percentile of an already sorted list
+def percentile(ordered, pct):
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+def summarize(seconds):
+    ordered = sorted(seconds)
+    total = sum(ordered)
+    return {
+        'iterations': len(ordered),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 4),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 4),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 4),
+        'mean_ms': round(total / len(ordered) * 1000, 4),
+        'ops_per_sec': round(len(ordered) / total, 1) if total else None,
+    }
+
+# times fn() `iterations` times after `warmup` untimed calls, setup() runs untimed before each
+def measure(fn, iterations, warmup=5, setup=None):
+    timings = []
+    for i in range(warmup + iterations):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        if i >= warmup:
+            timings.append(elapsed)
+    return summarize(timings)
+
+# runs every hot path through project.py against whatever database the environment points at
+def run_hot_paths(iterations, warmup=5, only=None):
+    import builtins
+    import contextlib
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        import project
+
+    rng = random.Random(7)
+    names = [p['name'] for p in project.pokedex.entries]
+    user_id = 1
+
+    def typo(name):
+        i = rng.randrange(len(name))
+        return name[:i] + name[i + 1:] if len(name) > 4 else name
+
+    # scripted player: one round, a guess that is sometimes right, then quit / go back
+    def answer(prompt=''):
+        prompt = prompt.lower()
+        if 'again' in prompt:
+            return 'n'
+        if '1 or 2' in prompt:
+            return rng.choice('12')
+        if 'yes/no' in prompt:
+            return rng.choice(('yes', 'no'))
+        if 'name' in prompt:
+            return rng.choice(names)
+        return ''
+
+    paths = {
+        'search_exact': (lambda: project.search_pokemon(rng.choice(names)), None),
+        'search_typo': (lambda: project.search_pokemon(typo(rng.choice(names))), None),
+    }
+    for path, fn_name in GAME_PATHS.items():
+        game = getattr(project, fn_name)
+        # the round isn't over until it's saved, so the flush is part of it
+        paths[path] = (lambda game=game: (game(user_id), project.result_writer.flush()), None)
+    for path, fn_name in LEADERBOARD_PATHS.items():
+        # cache cleared before every run, this measures the query and not the cache
+        paths[path] = (getattr(project, fn_name), project.leaderboard_cache.clear)
+
+    results = {}
+    real_input = builtins.input
+    builtins.input = answer
+    try:
+        for path, (fn, setup) in paths.items():
+            if only and path not in only:
+                continue
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                results[path] = measure(fn, iterations, warmup, setup)
+            print(f"  {path:<24} p95 {results[path]['p95_ms']:>9.3f} ms", file=sys.stderr)
+    finally:
+        builtins.input = real_input
+    return results
+
+
+# --------------------------------------------------------------------
+# STARTUP
+# --------------------------------------------------------------------
+
+# seconds from launching command until marker shows up on its stdout
+def time_to_output(command, marker, env=None):
+    started = time.perf_counter()
+    proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, env=env)
+    seen = b''
+    try:
+        while marker not in seen:
+            chunk = os.read(proc.stdout.fileno(), 4096)
+            if not chunk:
+                raise RuntimeError(f"{' '.join(command)} exited before printing {marker!r}")
+            seen += chunk
+        return time.perf_counter() - started
+    finally:
+        proc.kill()
+        proc.wait()
+
+# cold start of project.py up to its first prompt, next to a bare interpreter doing nothing,
+# the difference is what the app itself costs (imports, module setup, the welcome screen)
+def startup_time(runs=10):
+    project = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'project.py')
+    env = dict(os.environ, PYTHONUNBUFFERED='1')
+    app = [time_to_output([sys.executable, project], b'Enter your choice here:', env) for _ in range(runs)]
+    bare = [time_to_output([sys.executable, '-c', 'print("ready")'], b'ready', env) for _ in range(runs)]
+    app_ms = percentile(sorted(app), 50) * 1000
+    bare_ms = percentile(sorted(bare), 50) * 1000
+    return {'runs': runs, 'app_p50_ms': round(app_ms, 1), 'interpreter_p50_ms': round(bare_ms, 1),
+            'overhead_ms': round(app_ms - bare_ms, 1)}
+
+
+# --------------------------------------------------------------------
+# BASELINE
+# --------------------------------------------------------------------
+
+# paths whose p95 got more than `tolerance` slower than the baseline (and by at least
+# min_delta_ms, so a few microseconds of noise on a fast path doesn't count)
+def regressions(current, baseline, tolerance=0.25, min_delta_ms=0.5):
+    found = []
+    for scale, paths in current.items():
+        for path, stats in paths.items():
+            before = baseline.get(scale, {}).get(path)
+            if not before:
+                continue
+            delta = stats['p95_ms'] - before['p95_ms']
+            if stats['p95_ms'] > before['p95_ms'] * (1 + tolerance) and delta >= min_delta_ms:
+                found.append((scale, path, before['p95_ms'], stats['p95_ms']))
+    return found
+
+def report(results, baseline):
+    from tabulate import tabulate
+
+    table = []
+    for scale, paths in results.items():
+        for path, s in paths.items():
+            before = baseline.get(scale, {}).get(path)
+            change = f"{(s['p95_ms'] / before['p95_ms'] - 1) * 100:+.0f}%" if before and before['p95_ms'] else "-"
+            table.append([scale, path, s['p50_ms'], s['p95_ms'], s['p99_ms'], s['ops_per_sec'], change])
+    headers = ["ROWS", "PATH", "P50 MS", "P95 MS", "P99 MS", "OPS/S", "P95 VS BASELINE"]
+    print(tabulate(table, headers=headers, tablefmt="grid"))
+
+
+# --------------------------------------------------------------------
+# CLI
+# --------------------------------------------------------------------
+
+# benchmarks one scale in a fresh interpreter, project.py sets itself up at import
+# so every scale needs its own process pointed at its own database
+def run_scale(rows, args):
+    env = dict(os.environ)
+    if args.backend == 'sqlite':
+        os.makedirs(args.data_dir, exist_ok=True)
+        env['POKEQUIZ_DB_BACKEND'] = 'sqlite'
+        env['POKEQUIZ_SQLITE_PATH'] = os.path.join(args.data_dir, f"pokequiz_{label(rows)}.db")
+    else:
+        env['POKEQUIZ_DB_BACKEND'] = 'mysql'
+
+    out = os.path.join(args.data_dir, f".bench_{label(rows)}.json")
+    command = [sys.executable, os.path.abspath(__file__), '--worker', str(rows), out,
+               '--iterations', str(args.iterations), '--warmup', str(args.warmup)]
+    for path in args.only or ():
+        command += ['--only', path]
+    subprocess.run(command, env=env, check=True)
+    with open(out) as f:
+        results = json.load(f)
+    os.remove(out)
+    return results
+
+# what the child process does: seed if needed, then measure
+def worker(rows, out, args):
+    from storage import open_pool
+
+    pool = open_pool(pool_size=1)
+    have = seeded_rows(pool)
+    if have is None:
+        print(f"Seeding {rows:,} rounds (only happens once per database)...", file=sys.stderr)
+        seed(pool, rows)
+    elif have != rows:
+        raise SystemExit(f"This database was seeded with {have:,} rows, not {rows:,}")
+
+    print(f"Benchmarking {label(rows)} rows...", file=sys.stderr)
+    results = run_hot_paths(args.iterations, args.warmup, args.only)
+    with open(out, 'w') as f:
+        json.dump(results, f)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PokeQuiz's search, game round and leaderboard paths.")
+    parser.add_argument("--rows", nargs="+", default=["10k"],
+                        help="leaderboard rows to seed, one benchmark per size (e.g. 10k 1m 10m)")
+    parser.add_argument("--iterations", type=int, default=200, help="timed runs per path")
+    parser.add_argument("--warmup", type=int, default=5, help="untimed runs per path first")
+    parser.add_argument("--only", action="append", help="just this path (repeatable)")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite",
+                        help="sqlite files in --data-dir (default), or the configured MySQL scratch database")
+    parser.add_argument("--data-dir", default="bench_data", help="where the seeded SQLite databases live")
+    parser.add_argument("--out", default="bench_results.json", help="where to save this run")
+    parser.add_argument("--baseline", default="bench_baseline.json", help="results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="how much slower p95 may get (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5,
+                        help="and by how many ms at least before it counts, sub-ms paths are noisy")
+    parser.add_argument("--startup", action="store_true", help="measure cold start to the first prompt instead")
+    parser.add_argument("--startup-budget-ms", type=float,
+                        default=float(os.environ.get('POKEQUIZ_STARTUP_BUDGET_MS', '150')),
+                        help="how much slower than a bare interpreter startup may be")
+    parser.add_argument("--worker", nargs=2, metavar=("ROWS", "OUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        timing = startup_time()
+        print(f"First prompt after {timing['app_p50_ms']:.1f} ms, bare interpreter {timing['interpreter_p50_ms']:.1f} ms, "
+              f"app overhead {timing['overhead_ms']:.1f} ms (budget {args.startup_budget_ms:.0f} ms)")
+        if timing['overhead_ms'] > args.startup_budget_ms:
+            print("OVER BUDGET, something slow is running at import again")
+            return 1
+        return 0
+
+    known = SEARCH_PATHS + list(GAME_PATHS) + list(LEADERBOARD_PATHS)
+    unknown = [p for p in args.only or () if p not in known]
+    if unknown:
+        parser.error(f"unknown path(s): {', '.join(unknown)} (choose from {', '.join(known)})")
+
+    if args.worker:
+        return worker(int(args.worker[0]), args.worker[1], args)
+
+    sizes = [parse_rows(r) for r in args.rows]
+    if args.backend == 'mysql' and len(sizes) > 1:
+        parser.error("--backend mysql benchmarks the one configured database, give a single --rows")
+
+    results = {label(rows): run_scale(rows, args) for rows in sizes}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f).get('results', {})
+
+    run = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'backend': args.backend,
+        'iterations': args.iterations,
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(run, f, indent=2)
+    report(results, baseline)
+    print(f"Saved to {args.out}")
+
+    if args.save_baseline:
+        # keeps the other scales already in the baseline, replaces the ones just measured
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                stored = json.load(f)
+            stored.setdefault('results', {}).update(results)
+            stored.update({k: v for k, v in run.items() if k != 'results'})
+            run = stored
+        with open(args.baseline, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    slower = regressions(results, baseline, args.tolerance, args.min_delta_ms)
+    for scale, path, before, after in slower:
+        print(f"REGRESSION {scale} {path}: p95 {before:.3f} ms -> {after:.3f} ms")
+    if not baseline:
+        print(f"No baseline at {args.baseline} yet, run with --save-baseline to record one.")
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# breeding.py
+# Who can breed with whom, worked out from the egg groups in the pokedex snapshot.
+# Two pokemon can breed when they share an egg group, except:
+#   Undiscovered (legendaries, babies...) can't breed with anything, not even Ditto
+#   Ditto is an egg group of its own and breeds with everything that isn't Undiscovered
+#   (or another Ditto)
+# Gender isn't in the pokedex, so genderless pokemon count like everybody else.
+#
+# Built once: the members of every egg group, and for every pair of groups the first
+# pokemon that is in both (the "bridge" a chain crosses over on). "Compatible with X"
+# is then a union of member lists, and the shortest breeding chain from X to Y is a
+# BFS over the ~13 egg groups instead of over the 1000+ pokemon.
+
+from collections import deque
+
+
+UNDISCOVERED = 'Undiscovered'
+DITTO = 'Ditto'
+
+
+class BreedingGraph:
+
+    def __init__(self, entries):
+        self.groups = {}     # pokemon_id -> the egg group names it breeds through
+        self.dittos = []     # pokemon in the Ditto group
+        self.breeders = []   # everybody else that can breed, in dex order
+        members = {}
+        links = {}
+
+        for e in entries:
+            names = tuple(g for g in (e["egg_group1"], e["egg_group2"]) if g)
+            if not names or UNDISCOVERED in names:
+                continue
+            if DITTO in names:
+                self.dittos.append(e)
+                continue
+            self.groups[e["pokemon_id"]] = names
+            self.breeders.append(e)
+            for group in names:
+                members.setdefault(group, []).append(e)
+            # entries come in dex order, so the bridge is the lowest dex number in both groups
+            if len(names) == 2:
+                a, b = names
+                links.setdefault(a, {}).setdefault(b, e)
+                links.setdefault(b, {}).setdefault(a, e)
+
+        self.ditto_ids = frozenset(e["pokemon_id"] for e in self.dittos)
+        self.members = {group: tuple(found) for group, found in members.items()}
+        self.links = links
+
+    def can_breed(self, entry):
+        return entry["pokemon_id"] in self.groups or self.is_ditto(entry)
+
+    def is_ditto(self, entry):
+        return entry["pokemon_id"] in self.ditto_ids
+
+    # everything entry can breed with (itself left out), in dex order
+    def partners(self, entry):
+        if self.is_ditto(entry):
+            return list(self.breeders)
+        groups = self.groups.get(entry["pokemon_id"])
+        if not groups:
+            return []
+
+        found = {}
+        for group in groups:
+            for e in self.members[group]:
+                found[e["pokemon_id"]] = e
+        found.pop(entry["pokemon_id"], None)
+        for e in self.dittos:
+            found[e["pokemon_id"]] = e
+        return [found[pokemon_id] for pokemon_id in sorted(found)]
+
+    # the shortest list of pokemon from start to end where each one can breed with the next,
+    # None when there is no way there. Ditto is only ever an end of the chain, it can breed
+    # with anyone but passes nothing on, so a chain through it is no use to anybody
+    def chain(self, start, end):
+        if not self.can_breed(start) or not self.can_breed(end):
+            return None
+        if start["pokemon_id"] == end["pokemon_id"]:
+            return [start]
+        if self.is_ditto(start) and self.is_ditto(end):
+            return None
+        if self.is_ditto(start) or self.is_ditto(end):
+            return [start, end]
+
+        targets = set(self.groups[end["pokemon_id"]])
+        # group -> (group we came from, bridge pokemon), the start groups come from nowhere
+        came_from = {group: None for group in self.groups[start["pokemon_id"]]}
+        queue = deque(came_from)
+        while queue:
+            group = queue.popleft()
+            if group in targets:
+                bridges = []
+                while came_from[group] is not None:
+                    group, bridge = came_from[group]
+                    bridges.append(bridge)
+                return [start] + bridges[::-1] + [end]
+            for next_group, bridge in self.links.get(group, {}).items():
+                if next_group not in came_from:
+                    came_from[next_group] = (group, bridge)
+                    queue.append(next_group)
+        return None
@@ -0,0 +1,67 @@
+# cache.py
+# Small in-process cache for query results (the leaderboards).
+# Entries live for ttl seconds or until something invalidates them, and when a
+# lot of players ask for the same missing entry at once only one of them runs
+# the query, the rest wait for it and reuse its result.
+
+import os
+import threading
+import time
+
+
+DEFAULT_TTL = float(os.environ.get('POKEQUIZ_CACHE_TTL', '30'))
+
+
+class ResultCache:
+
+    def __init__(self, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        # name -> {params: (expires_at, value)}
+        self.entries = {}
+        # (name, params) -> Event that is set once the running load is done
+        self.loading = {}
+        # bumped on every invalidate so a load that started before it doesn't get stored
+        self.generations = {}
+
+    # returns the cached value for (name, params), or runs load() to get it
+    def get(self, name, load, params=()):
+        key = (name, params)
+        while True:
+            with self.lock:
+                entry = self.entries.get(name, {}).get(params)
+                if entry and entry[0] > self.clock():
+                    return entry[1]
+                waiter = self.loading.get(key)
+                if waiter is None:
+                    # nobody is loading it, so we do
+                    waiter = self.loading[key] = threading.Event()
+                    generation = self.generations.get(name, 0)
+                    break
+            # someone else is already running the query, wait and look again
+            waiter.wait()
+
+        try:
+            value = load()
+            with self.lock:
+                if self.generations.get(name, 0) == generation:
+                    self.entries.setdefault(name, {})[params] = (self.clock() + self.ttl, value)
+            return value
+        finally:
+            with self.lock:
+                del self.loading[key]
+            waiter.set()
+
+    # drops every entry for the given names, whatever their params
+    def invalidate(self, *names):
+        with self.lock:
+            for name in names:
+                self.entries.pop(name, None)
+                self.generations[name] = self.generations.get(name, 0) + 1
+
+    def clear(self):
+        with self.lock:
+            for name in self.entries:
+                self.generations[name] = self.generations.get(name, 0) + 1
+            self.entries.clear()
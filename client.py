@@ -0,0 +1,247 @@
+# client.py
+# Terminal client for server.py. Knows nothing about the database or the game rules,
+# it sends one JSON line per request and prints what comes back.
+#
+# python client.py                          -> 127.0.0.1:7878
+# python client.py --host quiz.local --port 9000
+# python client.py --unix /tmp/pokequiz.sock
+
+import argparse
+import getpass
+import json
+import socket
+import sys
+
+from server import HOST, PORT
+
+
+# the server said no, the message is meant for the player
+class ServerError(Exception):
+    pass
+
+
+class QuizClient:
+
+    def __init__(self, host=HOST, port=PORT, unix=None, timeout=30):
+        if unix:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(unix)
+        else:
+            self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.file = self.sock.makefile('rwb')
+        self.next_id = 1
+
+    # one request, one reply, raises ServerError when the reply isn't ok
+    def call(self, op, **args):
+        request = dict(args, op=op, id=self.next_id)
+        self.next_id += 1
+        self.file.write(json.dumps(request).encode('utf-8') + b'\n')
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("The server closed the connection.")
+        reply = json.loads(line)
+        if not reply.get('ok'):
+            raise ServerError(reply.get('error') or "Request failed.")
+        return reply
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+# --------------------------------------------------------------------
+# TERMINAL FRONT END
+# --------------------------------------------------------------------
+
+def tabulate(*args, **kwargs):
+    from tabulate import tabulate as make_table
+    return make_table(*args, **kwargs)
+
+def login(client):
+    print("\n===== Log In =====")
+    while True:
+        identity = input("Username or email (or 'back' to cancel): ").strip()
+        if identity.lower() in ('back', 'b'):
+            return None
+        if not identity:
+            print("Please enter a username or email.")
+            continue
+        try:
+            user = client.call('login', identifier=identity, password=getpass.getpass("Password: "))['user']
+        except ServerError as e:
+            print(e)
+            continue
+        print(f"Logged in as {user['username']} (role: {user.get('role_name') or 'Unknown'})")
+        return user
+
+# same loop as project.play_quiz, the server does the rest
+def play(client, mode):
+    try:
+        reply = client.call('play', mode=mode)
+    except ServerError as e:
+        print(e)
+        return
+    print(f"\n=== {reply['title']} ===")
+
+    while True:
+        question = reply['question']
+        print("\n" + question["prompt"])
+        if "stats" in question:
+            print(tabulate(list(question["stats"].items()), headers=["Stat", "Value"], tablefmt="grid"))
+
+        # asks again until the server takes the answer
+        while True:
+            try:
+                result = client.call('answer', answer=input(question["ask"]))['result']
+                break
+            except ServerError as e:
+                print(e)
+
+        print("\n" + result["message"])
+        print("\nScore this round:", result["score"])
+
+        again = input("\nPlay again? (y/n): ").strip().lower()
+        if again not in ("y", "yes"):
+            client.call('stop')
+            print("\nExiting game!")
+            return
+        try:
+            reply = client.call('next')
+        except ServerError as e:
+            print(e)
+            client.call('stop')
+            return
+
+def quiz_menu(client):
+    modes = client.call('modes')['modes']
+    while True:
+        print("\n===== QUIZ MENU =====")
+        for i, m in enumerate(modes, 1):
+            print(f"{i}.] {m['mode_name']} - {m['description']}")
+        print(f"{len(modes) + 1}.] Back")
+        choice = input("Option: ").strip()
+        if not choice.isdigit() or not 1 <= int(choice) <= len(modes):
+            return
+        play(client, modes[int(choice) - 1]['mode_name'])
+
+def leaderboard_menu(client):
+    print("\n===== LEADERBOARDS =====")
+    print("1.] All Time")
+    print("2.] Today")
+    print("3.] This Week")
+    print("4.] This Month")
+    print("5.] My Ranking")
+    choice = input("Option: ").strip()
+    boards = {"1": "general", "2": "day", "3": "week", "4": "month"}
+
+    if choice == "5":
+        standing = client.call('ranking')['standing']
+        if not standing:
+            print("You haven't played any rounds yet!")
+            return
+        overall = standing['overall']
+        table = [["Overall", f"#{overall['rank']} of {overall['players']}", f"{overall['percentile']:.1f}%"]]
+        table += [[name, f"#{s['rank']} of {s['players']}", f"{s['percentile']:.1f}%"] for name, s in standing['modes']]
+        print(tabulate(table, headers=["Board", "Rank", "Ahead of"], tablefmt="grid"))
+        rows = standing['around']
+    elif choice in boards:
+        rows = client.call('leaderboard', board=boards[choice])['rows']
+        for i, r in enumerate(rows, 1):
+            r.setdefault('rank', i)
+    else:
+        print("Invalid option.")
+        return
+
+    if not rows:
+        print("No leaderboard entries yet.")
+        return
+    table = [[r["rank"], r["username"], r["total_games"], r["total_score"]] for r in rows]
+    print(tabulate(table, headers=["RANK", "USERNAME", "TOTAL GAMES", "TOTAL SCORE"], tablefmt="grid"))
+
+def search(client):
+    name = input("Pokémon name: ").strip()
+    reply = client.call('search', name=name)
+    pokemon = reply['pokemon']
+    if not pokemon:
+        suggestions = reply.get('suggestions')
+        print(f"No Pokémon named '{name}'." + (f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""))
+        return
+    print(tabulate([[key, value] for key, value in pokemon.items()], tablefmt="grid"))
+
+def breeding_table(rows):
+    table = [[r['pokemon_id'], r['poke_name'], r['egg_group1'] or "N/A", r['egg_group2'] or "N/A"] for r in rows]
+    return tabulate(table, headers=["ID", "Name", "Egg Group 1", "Egg Group 2"], tablefmt="grid")
+
+def breeding(client):
+    print("\n===== BREEDING =====")
+    print("1.] Breeding Partners")
+    print("2.] Breeding Chain")
+    choice = input("Option: ").strip()
+    try:
+        if choice == "1":
+            reply = client.call('partners', name=input("Pokémon name: ").strip())
+            if not reply['partners']:
+                print(f"{reply['pokemon']} can't breed (Undiscovered egg group).")
+                return
+            print(f"{reply['pokemon']} can breed with {len(reply['partners'])} Pokémon:")
+            print(breeding_table(reply['partners']))
+        elif choice == "2":
+            chain = client.call('chain', start=input("From Pokémon: ").strip(), end=input("To Pokémon: ").strip())['chain']
+            if not chain:
+                print("There is no breeding chain between them.")
+                return
+            print(f"{len(chain) - 1} breeding(s): " + " -> ".join(r['poke_name'] for r in chain))
+            print(breeding_table(chain))
+        else:
+            print("Invalid option.")
+    except ServerError as e:
+        print(e)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play PokeQuiz on a server.py server.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", help="connect to this Unix socket instead of TCP")
+    args = parser.parse_args(argv)
+
+    try:
+        client = QuizClient(args.host, args.port, args.unix)
+    except OSError as e:
+        print(f"Could not connect to the server: {e}")
+        return 1
+
+    try:
+        if not login(client):
+            return 0
+        while True:
+            print("\n===== MAIN MENU =====")
+            print("1.] Play")
+            print("2.] Leaderboards")
+            print("3.] Search Pokémon")
+            print("4.] Breeding")
+            print("5.] Quit")
+            choice = input("Option: ").strip()
+            if choice == "1":
+                quiz_menu(client)
+            elif choice == "2":
+                leaderboard_menu(client)
+            elif choice == "3":
+                search(client)
+            elif choice == "4":
+                breeding(client)
+            elif choice == "5" or choice.lower().startswith("q"):
+                return 0
+            else:
+                print("Invalid option.")
+    except (ConnectionError, OSError) as e:
+        print(f"Lost the connection to the server: {e}")
+        return 1
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# database.py
+# Pooled MySQL connections for the app.
+# Every operation checks a connection out, uses it, and hands it back,
+# so there is no single global connection that can go stale or be shared.
+
+import os
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import pooling
+
+
+# connection settings, can be overridden with environment variables
+DB_CONFIG = {
+    'host': os.environ.get('POKEQUIZ_DB_HOST', 'localhost'),
+    'user': os.environ.get('POKEQUIZ_DB_USER', 'root'),
+    'password': os.environ.get('POKEQUIZ_DB_PASSWORD', 'LOL'),
+    'database': os.environ.get('POKEQUIZ_DB_NAME', 'project'),
+}
+
+POOL_SIZE = int(os.environ.get('POKEQUIZ_POOL_SIZE', '5'))
+
+
+class ConnectionPool:
+
+    def __init__(self, pool_size=POOL_SIZE, retries=5, backoff=0.2, max_backoff=5.0, **config):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.config = config or dict(DB_CONFIG)
+        self.pool = self._with_backoff(self._create_pool)
+
+    # retries fn with exponential backoff, for when MySQL is restarting or the pool is busy
+    def _with_backoff(self, fn):
+        delay = self.backoff
+        for attempt in range(self.retries):
+            try:
+                return fn()
+            except (mysql.connector.InterfaceError, mysql.connector.OperationalError, pooling.PoolError):
+                if attempt == self.retries - 1:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+
+    def _create_pool(self):
+        return pooling.MySQLConnectionPool(
+            pool_name='pokequiz',
+            pool_size=self.pool_size,
+            pool_reset_session=True,
+            **self.config
+        )
+
+    # checks out a connection and pings it first, a connection that sat idle
+    # too long gets reconnected here instead of blowing up in the middle of a query
+    def _checkout(self):
+        conn = self.pool.get_connection()
+        try:
+            conn.ping(reconnect=True, attempts=1, delay=0)
+        except mysql.connector.Error:
+            conn.close()
+            raise mysql.connector.InterfaceError("Lost connection to MySQL")
+        return conn
+
+    def get_connection(self):
+        return self._with_backoff(self._checkout)
+
+    # borrow a connection for one operation, it goes back to the pool when done
+    @contextmanager
+    def connection(self):
+        conn = self.get_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # borrow a dictionary cursor for one operation
+    # commits if the block finishes, rolls back and re-raises if it doesn't
+    @contextmanager
+    def cursor(self):
+        with self.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
@@ -0,0 +1,120 @@
+# export.py
+# Streams the leaderboard history, comments and feedback out to CSV or JSONL.
+# Rows come off an unbuffered cursor in fetchmany chunks and get written as they
+# arrive, so memory stays flat whether a table has a hundred rows or a hundred million.
+#
+# python export.py                                   -> every table, CSV, into ./exports
+# python export.py leaderboard_general --format jsonl --gzip
+# python export.py pokemon_comments --out /tmp/dump --chunk-size 5000
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+
+
+# everything that can be exported, and the column each one is streamed in order of
+EXPORT_TABLES = {
+    'leaderboard_general': 'entry_id',
+    'leaderboard_guess_stats': 'stats_id',
+    'leaderboard_guess_weight': 'weight_id',
+    'leaderboard_guess_dexnum': 'guess_id',
+    'leaderboard_guess_ability': 'ability_guess_id',
+    'leaderboard_guess_egg_group': 'egg_guess_id',
+    'leaderboard_guess_type': 'type_guess_id',
+    'leaderboard_guess_species': 'species_guess_id',
+    'pokemon_comments': 'comment_id',
+    'user_feedback': 'feedback_id',
+}
+
+FORMATS = ('csv', 'jsonl')
+
+
+# turns the odd types mysql hands back into something CSV/JSON can hold
+def plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', errors='replace')
+    return value
+
+def open_output(path, compress):
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+# streams one table into out, returns how many rows were written
+def export_table(pool, table, out, fmt='csv', chunk_size=1000):
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Can't export {table!r}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}")
+
+    written = 0
+    with pool.connection() as conn:
+        # plain tuples off an unbuffered cursor, the server sends rows as we ask for them
+        cursor = conn.cursor(buffered=False)
+        try:
+            cursor.execute(f"SELECT * FROM {table} ORDER BY {EXPORT_TABLES[table]};")
+            columns = list(cursor.column_names)
+
+            if fmt == 'csv':
+                writer = csv.writer(out)
+                writer.writerow(columns)
+
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                if fmt == 'csv':
+                    writer.writerows([plain(v) for v in row] for row in rows)
+                else:
+                    out.writelines(
+                        json.dumps(dict(zip(columns, map(plain, row))), ensure_ascii=False) + '\n'
+                        for row in rows
+                    )
+                written += len(rows)
+        finally:
+            cursor.close()
+    return written
+
+# exports each table to out_dir/<table>.<fmt>[.gz], returns {table: rows}
+def export_tables(pool, tables, out_dir, fmt='csv', compress=False, chunk_size=1000):
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    for table in tables:
+        path = os.path.join(out_dir, f"{table}.{fmt}" + (".gz" if compress else ""))
+        with open_output(path, compress) as out:
+            counts[table] = export_table(pool, table, out, fmt, chunk_size)
+        print(f"{table}: {counts[table]} rows -> {path}")
+    return counts
+
+
+def main(argv=None):
+    from storage import open_pool
+
+    parser = argparse.ArgumentParser(description="Stream PokeQuiz history out to CSV or JSONL.")
+    parser.add_argument("tables", nargs="*",
+                        help="tables to export (default: all of them): " + ", ".join(EXPORT_TABLES))
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--gzip", action="store_true", help="gzip the output files")
+    parser.add_argument("--out", default="exports", help="directory to write into")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows per fetchmany")
+    args = parser.parse_args(argv)
+    unknown = [t for t in args.tables if t not in EXPORT_TABLES]
+    if unknown:
+        parser.error(f"can't export: {', '.join(unknown)}")
+
+    tables = args.tables or list(EXPORT_TABLES)
+    export_tables(open_pool(pool_size=1), tables, args.out, args.format, args.gzip, args.chunk_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
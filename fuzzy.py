@@ -0,0 +1,127 @@
+# fuzzy.py
+# Typo-tolerant name matching.
+# Names get folded first (accents, case, spaces and punctuation dropped) so
+# "Flabebe" finds "Flabébé" and "mr mime" finds "Mr. Mime" for free, and anything
+# still not found goes through a symmetric delete index that only compares
+# against names that can possibly be within the allowed edit distance.
+
+import unicodedata
+
+
+# symbols NFKD doesn't turn into letters
+SPECIAL_CHARS = {'♀': 'f', '♂': 'm'}
+
+# folds a name down to the letters and digits that matter for matching
+def fold(name):
+    if not name:
+        return ''
+    name = ''.join(SPECIAL_CHARS.get(ch, ch) for ch in str(name))
+    name = unicodedata.normalize('NFKD', name)
+    return ''.join(ch for ch in name.lower() if ch.isalnum())
+
+# levenshtein distance, gives up early and returns limit + 1 once it can't be <= limit
+def edit_distance(a, b, limit=None):
+    if limit is None:
+        limit = max(len(a), len(b))
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) < len(b):
+        a, b = b, a
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+# every string you can get by deleting up to max_deletes characters from key
+def deletes(key, max_deletes):
+    found = {key}
+    frontier = {key}
+    for _ in range(max_deletes):
+        frontier = {k[:i] + k[i + 1:] for k in frontier for i in range(len(k))}
+        found |= frontier
+    return found
+
+
+class DeleteIndex:
+
+    # symmetric delete index: two strings within d edits always share a string you get
+    # by deleting at most d characters from each, so a lookup is a handful of dict hits
+    # plus an edit_distance check on the few candidates instead of a scan of every name
+    def __init__(self, max_distance=2):
+        self.max_distance = max_distance
+        self.variants = {}
+
+    def add(self, key):
+        for variant in deletes(key, self.max_distance):
+            self.variants.setdefault(variant, set()).add(key)
+
+    # every (distance, key) within max_distance of key
+    def search(self, key, max_distance):
+        max_distance = min(max_distance, self.max_distance)
+        candidates = set()
+        for variant in deletes(key, max_distance):
+            candidates |= self.variants.get(variant, set())
+
+        found = []
+        for candidate in candidates:
+            d = edit_distance(key, candidate, max_distance)
+            if d <= max_distance:
+                found.append((d, candidate))
+        return found
+
+
+class NameMatcher:
+
+    # items is (name, value) pairs, the first value for a folded name wins
+    def __init__(self, items):
+        self.exact = {}
+        for name, value in items:
+            key = fold(name)
+            if key and key not in self.exact:
+                self.exact[key] = value
+
+        self.index = DeleteIndex()
+        for key in self.exact:
+            self.index.add(key)
+
+    # how many typos a name of this length can have, short names have to be spelled right
+    # or "mew" would happily match "muk"
+    @staticmethod
+    def allowed_distance(key, max_distance):
+        return min(max_distance, len(key) // 4)
+
+    # best match within max_distance edits, None if there isn't one or if two
+    # different names are equally close (better to say wrong than guess for the player)
+    def match(self, name, max_distance=0):
+        key = fold(name)
+        if not key:
+            return None
+        if key in self.exact:
+            return self.exact[key]
+
+        limit = self.allowed_distance(key, max_distance)
+        if limit <= 0:
+            return None
+        found = sorted(self.index.search(key, limit))
+        if not found or (len(found) > 1 and found[0][0] == found[1][0]):
+            return None
+        return self.exact[found[0][1]]
+
+    # closest few names for a "did you mean", nearest first
+    def suggest(self, name, limit=3, max_distance=2):
+        key = fold(name)
+        if not key:
+            return []
+        found = sorted(self.index.search(key, min(max_distance, max(1, len(key) // 3))))
+        return [self.exact[k] for _, k in found[:limit]]
@@ -0,0 +1,35 @@
+# lazy.py
+# Stand-in for something that is slow to make (a database pool, the pokedex
+# snapshot) so a module can name it at import time but only build it the first
+# time somebody actually uses it. That's what lets project.py import, and show
+# its first prompt, without connecting to anything.
+
+import threading
+
+
+class Lazy:
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    # builds it once, if the factory raises nothing is kept and the next use tries again
+    def value(self):
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self._value = self._factory()
+                    self._ready = True
+        return self._value
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def __getattr__(self, name):
+        return getattr(self.value(), name)
+
+    def __len__(self):
+        return len(self.value())
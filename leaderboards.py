@@ -0,0 +1,375 @@
+# leaderboards.py
+# Running totals for the leaderboards.
+# Instead of GROUP BY over every round ever played, leaderboard_totals and
+# leaderboard_mode_totals keep one row per user (and per user per mode) that
+# gets bumped in the same transaction that saves the rounds.
+# leaderboard_period_totals does the same per day, week and month, which is
+# what the daily/weekly/monthly (and custom range) leaderboards read.
+#
+# python leaderboards.py verify   -> checks the totals against leaderboard_general
+# python leaderboards.py rebuild  -> recomputes the totals from leaderboard_general
+
+import argparse
+from datetime import date, timedelta
+
+
+TOTALS_UPSERT = """
+    INSERT INTO leaderboard_totals (
+        user_id, total_games, total_score, correct, incorrect
+    )
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        total_games = total_games + VALUES(total_games),
+        total_score = total_score + VALUES(total_score),
+        correct = correct + VALUES(correct),
+        incorrect = incorrect + VALUES(incorrect);
+"""
+
+MODE_TOTALS_UPSERT = """
+    INSERT INTO leaderboard_mode_totals (
+        user_id, mode_id, total_games, total_score, correct, incorrect
+    )
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        total_games = total_games + VALUES(total_games),
+        total_score = total_score + VALUES(total_score),
+        correct = correct + VALUES(correct),
+        incorrect = incorrect + VALUES(incorrect);
+"""
+
+
+PERIOD_TOTALS_UPSERT = """
+    INSERT INTO leaderboard_period_totals (
+        period, period_start, mode_id, user_id, total_games, total_score, correct, incorrect
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        total_games = total_games + VALUES(total_games),
+        total_score = total_score + VALUES(total_score),
+        correct = correct + VALUES(correct),
+        incorrect = incorrect + VALUES(incorrect);
+"""
+
+# bucket sizes, weeks start on monday
+PERIODS = ('day', 'week', 'month')
+
+# first day of the bucket that day falls in
+def period_start(period, day):
+    if period == 'day':
+        return day
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    raise ValueError(f"Unknown period {period!r}")
+
+# the fewest buckets that exactly cover first..last (both included),
+# whole months and whole weeks where they fit and single days for the rest
+def range_buckets(first, last):
+    buckets = []
+    day = first
+    while day <= last:
+        next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+        if day.day == 1 and next_month - timedelta(days=1) <= last:
+            buckets.append(('month', day))
+            day = next_month
+        elif day.weekday() == 0 and day + timedelta(days=6) <= last:
+            buckets.append(('week', day))
+            day += timedelta(days=7)
+        else:
+            buckets.append(('day', day))
+            day += timedelta(days=1)
+    return buckets
+
+
+# adds a batch of leaderboard_general rows (user_id, mode_id, score, correct, incorrect)
+# to the totals, meant to run inside the same transaction that inserts those rows
+# day is the date the rounds count for in the period buckets (today by default)
+def update_totals(cursor, general_rows, day=None):
+    per_user = {}
+    per_mode = {}
+    for user_id, mode_id, score, correct, incorrect in general_rows:
+        for totals, key in ((per_user, user_id), (per_mode, (user_id, mode_id))):
+            t = totals.setdefault(key, [0, 0, 0, 0])
+            t[0] += 1
+            t[1] += score
+            t[2] += correct
+            t[3] += incorrect
+
+    # sorted so two batches always lock the rows in the same order
+    if per_mode:
+        cursor.executemany(MODE_TOTALS_UPSERT, [
+            (user_id, mode_id, *t) for (user_id, mode_id), t in sorted(per_mode.items())
+        ])
+    if per_user:
+        cursor.executemany(TOTALS_UPSERT, [
+            (user_id, *t) for user_id, t in sorted(per_user.items())
+        ])
+    if per_mode:
+        day = day or date.today()
+        cursor.executemany(PERIOD_TOTALS_UPSERT, [
+            (period, period_start(period, day), mode_id, user_id, *t)
+            for period in PERIODS
+            for (user_id, mode_id), t in sorted(per_mode.items(), key=lambda kv: (kv[0][1], kv[0][0]))
+        ])
+
+
+# recomputes all the totals tables from the raw history in one transaction
+def rebuild_totals(pool):
+    with pool.cursor() as cursor:
+        users = recompute_totals(cursor)
+        recompute_period_totals(cursor)
+        return users
+
+
+# does the actual rebuild on a cursor the caller owns, the migrations use this too
+# (the period buckets are separate, migration 002 runs before their table exists)
+def recompute_totals(cursor):
+    cursor.execute("DELETE FROM leaderboard_mode_totals;")
+    cursor.execute("""
+        INSERT INTO leaderboard_mode_totals (
+            user_id, mode_id, total_games, total_score, correct, incorrect
+        )
+        SELECT
+            user_id,
+            mode_id,
+            COUNT(entry_id),
+            COALESCE(SUM(score), 0),
+            COALESCE(SUM(correct), 0),
+            COALESCE(SUM(incorrect), 0)
+        FROM leaderboard_general
+        GROUP BY user_id, mode_id;
+    """)
+
+    # the per-user totals are just the per-mode totals added up
+    cursor.execute("DELETE FROM leaderboard_totals;")
+    cursor.execute("""
+        INSERT INTO leaderboard_totals (
+            user_id, total_games, total_score, correct, incorrect
+        )
+        SELECT
+            user_id,
+            SUM(total_games),
+            SUM(total_score),
+            SUM(correct),
+            SUM(incorrect)
+        FROM leaderboard_mode_totals
+        GROUP BY user_id;
+    """)
+
+    cursor.execute("SELECT COUNT(*) AS users FROM leaderboard_totals;")
+    return cursor.fetchone()["users"]
+
+
+# rebuilds the day/week/month buckets from leaderboard_general
+def recompute_period_totals(cursor):
+    cursor.execute("DELETE FROM leaderboard_period_totals;")
+    cursor.execute("""
+        INSERT INTO leaderboard_period_totals (
+            period, period_start, mode_id, user_id, total_games, total_score, correct, incorrect
+        )
+        SELECT 'day', DATE(created_at), mode_id, user_id,
+               COUNT(entry_id), COALESCE(SUM(score), 0), COALESCE(SUM(correct), 0), COALESCE(SUM(incorrect), 0)
+        FROM leaderboard_general
+        GROUP BY DATE(created_at), mode_id, user_id;
+    """)
+    # weeks and months are just their days added up
+    for period, start in (
+        ('week', "period_start - INTERVAL WEEKDAY(period_start) DAY"),
+        ('month', "period_start - INTERVAL (DAYOFMONTH(period_start) - 1) DAY"),
+    ):
+        cursor.execute(f"""
+            INSERT INTO leaderboard_period_totals (
+                period, period_start, mode_id, user_id, total_games, total_score, correct, incorrect
+            )
+            SELECT '{period}', {start}, mode_id, user_id,
+                   SUM(total_games), SUM(total_score), SUM(correct), SUM(incorrect)
+            FROM leaderboard_period_totals
+            WHERE period = 'day'
+            GROUP BY {start}, mode_id, user_id;
+        """)
+
+
+# top players between first and last (dates, both included), for one mode or all of them
+# reads the rollup buckets covering the range, never the raw rounds
+def window_leaderboard(cursor, first, last, mode_id=None, limit=10):
+    buckets = range_buckets(first, last)
+    if not buckets:
+        return []
+
+    # a single bucket for a single mode is already one row per player,
+    # so it comes straight off idx_period_rank in order
+    if len(buckets) == 1 and mode_id is not None:
+        period, start = buckets[0]
+        cursor.execute("""
+            SELECT
+                pt.user_id,
+                u.username,
+                pt.total_games,
+                pt.total_score
+            FROM leaderboard_period_totals pt
+            JOIN users u ON pt.user_id = u.user_id
+            WHERE pt.period = %s AND pt.period_start = %s AND pt.mode_id = %s
+            ORDER BY pt.total_score DESC, pt.total_games DESC
+            LIMIT %s;
+        """, (period, start, mode_id, limit))
+        return cursor.fetchall()
+
+    where = " OR ".join(["(pt.period = %s AND pt.period_start = %s)"] * len(buckets))
+    params = [value for bucket in buckets for value in bucket]
+    if mode_id is not None:
+        where = f"({where}) AND pt.mode_id = %s"
+        params.append(mode_id)
+    cursor.execute(f"""
+        SELECT
+            pt.user_id,
+            u.username,
+            SUM(pt.total_games) AS total_games,
+            SUM(pt.total_score) AS total_score
+        FROM leaderboard_period_totals pt
+        JOIN users u ON pt.user_id = u.user_id
+        WHERE {where}
+        GROUP BY pt.user_id, u.username
+        ORDER BY total_score DESC, total_games DESC
+        LIMIT %s;
+    """, (*params, limit))
+    return cursor.fetchall()
+
+
+# compares the stored totals with a fresh GROUP BY, returns the rows that don't match
+def verify_totals(pool):
+    query = """
+        SELECT
+            h.user_id,
+            h.mode_id,
+            h.total_games AS expected_games,
+            h.total_score AS expected_score,
+            h.correct AS expected_correct,
+            h.incorrect AS expected_incorrect,
+            t.total_games AS stored_games,
+            t.total_score AS stored_score,
+            t.correct AS stored_correct,
+            t.incorrect AS stored_incorrect
+        FROM (
+            SELECT
+                user_id,
+                mode_id,
+                COUNT(entry_id) AS total_games,
+                COALESCE(SUM(score), 0) AS total_score,
+                COALESCE(SUM(correct), 0) AS correct,
+                COALESCE(SUM(incorrect), 0) AS incorrect
+            FROM leaderboard_general
+            GROUP BY user_id, mode_id
+        ) h
+        LEFT JOIN leaderboard_mode_totals t
+            ON t.user_id = h.user_id AND t.mode_id = h.mode_id
+        WHERE t.user_id IS NULL
+           OR t.total_games <> h.total_games
+           OR t.total_score <> h.total_score
+           OR t.correct <> h.correct
+           OR t.incorrect <> h.incorrect;
+    """
+    with pool.cursor() as cursor:
+        cursor.execute(query)
+        mismatched = cursor.fetchall()
+
+        # per-user totals have to match the per-mode totals they are made of
+        cursor.execute("""
+            SELECT
+                m.user_id,
+                NULL AS mode_id,
+                m.total_games AS expected_games,
+                m.total_score AS expected_score,
+                m.correct AS expected_correct,
+                m.incorrect AS expected_incorrect,
+                t.total_games AS stored_games,
+                t.total_score AS stored_score,
+                t.correct AS stored_correct,
+                t.incorrect AS stored_incorrect
+            FROM (
+                SELECT
+                    user_id,
+                    SUM(total_games) AS total_games,
+                    SUM(total_score) AS total_score,
+                    SUM(correct) AS correct,
+                    SUM(incorrect) AS incorrect
+                FROM leaderboard_mode_totals
+                GROUP BY user_id
+            ) m
+            LEFT JOIN leaderboard_totals t ON t.user_id = m.user_id
+            WHERE t.user_id IS NULL
+               OR t.total_games <> m.total_games
+               OR t.total_score <> m.total_score
+               OR t.correct <> m.correct
+               OR t.incorrect <> m.incorrect;
+        """)
+        mismatched += cursor.fetchall()
+
+        # and the day buckets have to add up to the per-mode totals too
+        cursor.execute("""
+            SELECT
+                m.user_id,
+                m.mode_id,
+                m.total_games AS expected_games,
+                m.total_score AS expected_score,
+                m.correct AS expected_correct,
+                m.incorrect AS expected_incorrect,
+                d.total_games AS stored_games,
+                d.total_score AS stored_score,
+                d.correct AS stored_correct,
+                d.incorrect AS stored_incorrect
+            FROM leaderboard_mode_totals m
+            LEFT JOIN (
+                SELECT
+                    user_id,
+                    mode_id,
+                    SUM(total_games) AS total_games,
+                    SUM(total_score) AS total_score,
+                    SUM(correct) AS correct,
+                    SUM(incorrect) AS incorrect
+                FROM leaderboard_period_totals
+                WHERE period = 'day'
+                GROUP BY user_id, mode_id
+            ) d ON d.user_id = m.user_id AND d.mode_id = m.mode_id
+            WHERE d.user_id IS NULL
+               OR d.total_games <> m.total_games
+               OR d.total_score <> m.total_score
+               OR d.correct <> m.correct
+               OR d.incorrect <> m.incorrect;
+        """)
+        mismatched += cursor.fetchall()
+
+    return mismatched
+
+
+def main():
+    from storage import open_pool
+
+    parser = argparse.ArgumentParser(description="Check or rebuild the leaderboard totals.")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    args = parser.parse_args()
+
+    pool = open_pool()
+    if args.command == "rebuild":
+        users = rebuild_totals(pool)
+        print(f"Rebuilt leaderboard totals for {users} users.")
+        return 0
+
+    mismatched = verify_totals(pool)
+    if not mismatched:
+        print("Leaderboard totals match the round history.")
+        return 0
+
+    print(f"{len(mismatched)} leaderboard totals do not match the round history:")
+    for r in mismatched:
+        print(f"  user {r['user_id']} mode {r['mode_id'] or 'ALL'}: "
+              f"stored {r['stored_games']} games / {r['stored_score']} score / "
+              f"{r['stored_correct']} right / {r['stored_incorrect']} wrong, "
+              f"expected {r['expected_games']} games / {r['expected_score']} score / "
+              f"{r['expected_correct']} right / {r['expected_incorrect']} wrong")
+    print("Run 'python leaderboards.py rebuild' to fix them.")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
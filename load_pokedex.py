@@ -0,0 +1,257 @@
+# load_pokedex.py
+# Loads the Kaggle pokemon CSV straight into the pokemon tables.
+# Replaces filling pokemon_data_staging by hand and running the INSERT...SELECTs
+# in project.sql. The CSV is read a batch at a time, lookup ids (types, abilities,
+# growth rates, special groups, egg groups) are resolved from in-memory maps, and
+# every batch is one transaction of executemany upserts. Running it again just
+# updates whatever changed, so it is safe to run on every deploy.
+#
+# python load_pokedex.py pokemon.csv
+# python load_pokedex.py pokemon.csv --batch-size 200
+
+import argparse
+import csv
+import sys
+import time
+from itertools import islice
+
+
+# lookup table -> (id column, name column), and the CSV columns that point at it
+LOOKUPS = {
+    'types': ('type_id', 'type_name', ('type1', 'type2')),
+    'abilities': ('ability_id', 'ability_name', ('ability1', 'ability2', 'hidden_ability')),
+    'growth_rates': ('growth_rate_id', 'growth_rate_name', ('growth_rate',)),
+    'special_groups': ('special_group_id', 'special_group_name', ('special_group',)),
+    'egg_groups': ('egg_group_id', 'egg_group_name', ('egg_group1', 'egg_group2')),
+}
+
+POKEMON_UPSERT = """
+    INSERT INTO pokemon (
+        pokemon_id, name, generation, species, height, weight,
+        base_exp, catch_rate, base_friendship, egg_cycles,
+        growth_rate_id, special_group_id
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        name = VALUES(name),
+        generation = VALUES(generation),
+        species = VALUES(species),
+        height = VALUES(height),
+        weight = VALUES(weight),
+        base_exp = VALUES(base_exp),
+        catch_rate = VALUES(catch_rate),
+        base_friendship = VALUES(base_friendship),
+        egg_cycles = VALUES(egg_cycles),
+        growth_rate_id = VALUES(growth_rate_id),
+        special_group_id = VALUES(special_group_id);
+"""
+
+STATS_UPSERT = """
+    INSERT INTO pokemon_stats (
+        pokemon_id, hp, attack, defense, sp_atk, sp_def, speed, total, ev_yield
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        hp = VALUES(hp),
+        attack = VALUES(attack),
+        defense = VALUES(defense),
+        sp_atk = VALUES(sp_atk),
+        sp_def = VALUES(sp_def),
+        speed = VALUES(speed),
+        total = VALUES(total),
+        ev_yield = VALUES(ev_yield);
+"""
+
+TYPES_UPSERT = """
+    INSERT INTO pokemon_types (pokemon_id, slot1_type, slot2_type)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        slot1_type = VALUES(slot1_type),
+        slot2_type = VALUES(slot2_type);
+"""
+
+ABILITIES_UPSERT = """
+    INSERT INTO pokemon_abilities (pokemon_id, ability1_id, ability2_id, hidden_ability_id)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        ability1_id = VALUES(ability1_id),
+        ability2_id = VALUES(ability2_id),
+        hidden_ability_id = VALUES(hidden_ability_id);
+"""
+
+EGG_GROUPS_UPSERT = """
+    INSERT INTO pokemon_egg_groups (pokemon_id, egg_group1_id, egg_group2_id)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        egg_group1_id = VALUES(egg_group1_id),
+        egg_group2_id = VALUES(egg_group2_id);
+"""
+
+
+# the CSV has blanks for "none", these turn them into NULLs the way the CASTs/TRIMs did
+def text(value):
+    value = (value or '').strip()
+    return value or None
+
+def whole(value):
+    value = text(value)
+    return int(float(value)) if value is not None else None
+
+def decimal(value):
+    value = text(value)
+    return round(float(value), 1) if value is not None else None
+
+# lookup names are unique regardless of case in MySQL ("Human-like" is "Human-Like"),
+# so the in-memory maps are keyed the same way
+def fold(name):
+    return name.casefold() if name else None
+
+
+class PokedexLoader:
+
+    def __init__(self, cursor_source, batch_size=500):
+        # cursor_source() gives a `with` block that yields a cursor and commits at the end,
+        # pool.cursor in the app
+        self.cursor_source = cursor_source
+        self.batch_size = batch_size
+        # lookup table -> {fold(name): id}
+        self.ids = {table: {} for table in LOOKUPS}
+        self.counts = {'pokemon': 0, 'pokemon_stats': 0, 'pokemon_types': 0,
+                       'pokemon_abilities': 0, 'pokemon_egg_groups': 0}
+
+    # reads every lookup table once, on a rerun nothing new needs inserting after this
+    def load_lookups(self):
+        with self.cursor_source() as cursor:
+            for table, (id_col, name_col, _) in LOOKUPS.items():
+                cursor.execute(f"SELECT {id_col} AS id, {name_col} AS name FROM {table};")
+                self.ids[table] = {fold(r["name"]): r["id"] for r in cursor.fetchall()}
+
+    # adds lookup names this batch uses that we haven't seen yet, then reads their ids back
+    def _resolve_lookups(self, cursor, records):
+        for table, (id_col, name_col, columns) in LOOKUPS.items():
+            known = self.ids[table]
+            # one spelling per name, whichever the batch used first
+            new = {}
+            for r in records:
+                for c in columns:
+                    if r[c] and fold(r[c]) not in known:
+                        new.setdefault(fold(r[c]), r[c])
+            new = sorted(new.values())
+            if not new:
+                continue
+            cursor.executemany(f"INSERT IGNORE INTO {table} ({name_col}) VALUES (%s);", [(n,) for n in new])
+            cursor.execute(
+                f"SELECT {id_col} AS id, {name_col} AS name FROM {table} "
+                f"WHERE {name_col} IN ({', '.join(['%s'] * len(new))});",
+                tuple(new)
+            )
+            known.update({fold(r["name"]): r["id"] for r in cursor.fetchall()})
+
+    @staticmethod
+    def parse(row):
+        return {
+            'pokemon_id': whole(row.get('dexnum')),
+            'name': text(row.get('name')),
+            'generation': whole(row.get('generation')),
+            'species': text(row.get('species')),
+            'height': decimal(row.get('height')),
+            'weight': decimal(row.get('weight')),
+            'base_exp': whole(row.get('base_exp')),
+            'catch_rate': whole(row.get('catch_rate')),
+            'base_friendship': whole(row.get('base_friendship')),
+            'egg_cycles': whole(row.get('egg_cycles')),
+            'growth_rate': text(row.get('growth_rate')),
+            'special_group': text(row.get('special_group')),
+            'hp': whole(row.get('hp')),
+            'attack': whole(row.get('attack')),
+            'defense': whole(row.get('defense')),
+            'sp_atk': whole(row.get('sp_atk')),
+            'sp_def': whole(row.get('sp_def')),
+            'speed': whole(row.get('speed')),
+            'total': whole(row.get('total')),
+            'ev_yield': text(row.get('ev_yield')),
+            'type1': text(row.get('type1')),
+            'type2': text(row.get('type2')),
+            'ability1': text(row.get('ability1')),
+            'ability2': text(row.get('ability2')),
+            'hidden_ability': text(row.get('hidden_ability')),
+            'egg_group1': text(row.get('egg_group1')),
+            'egg_group2': text(row.get('egg_group2')),
+        }
+
+    # one batch = one transaction, parents (pokemon) before the tables that point at them
+    def load_batch(self, records):
+        with self.cursor_source() as cursor:
+            self._resolve_lookups(cursor, records)
+            types, abilities = self.ids['types'], self.ids['abilities']
+            growth, special = self.ids['growth_rates'], self.ids['special_groups']
+            egg_groups = self.ids['egg_groups']
+
+            pokemon = [(
+                r['pokemon_id'], r['name'], r['generation'], r['species'], r['height'], r['weight'],
+                r['base_exp'], r['catch_rate'], r['base_friendship'], r['egg_cycles'],
+                growth.get(fold(r['growth_rate'])), special.get(fold(r['special_group']))
+            ) for r in records]
+            stats = [(
+                r['pokemon_id'], r['hp'], r['attack'], r['defense'], r['sp_atk'],
+                r['sp_def'], r['speed'], r['total'], r['ev_yield']
+            ) for r in records]
+            # same rules as the old joins: no first type / ability / egg group means no row
+            typing = [
+                (r['pokemon_id'], types[fold(r['type1'])], types.get(fold(r['type2'])))
+                for r in records if r['type1']
+            ]
+            ability_rows = [
+                (r['pokemon_id'], abilities[fold(r['ability1'])], abilities.get(fold(r['ability2'])),
+                 abilities.get(fold(r['hidden_ability'])))
+                for r in records if r['ability1']
+            ]
+            egg_group_rows = [
+                (r['pokemon_id'], egg_groups[fold(r['egg_group1'])], egg_groups.get(fold(r['egg_group2'])))
+                for r in records if r['egg_group1']
+            ]
+
+            for table, query, rows in (
+                ('pokemon', POKEMON_UPSERT, pokemon),
+                ('pokemon_stats', STATS_UPSERT, stats),
+                ('pokemon_types', TYPES_UPSERT, typing),
+                ('pokemon_abilities', ABILITIES_UPSERT, ability_rows),
+                ('pokemon_egg_groups', EGG_GROUPS_UPSERT, egg_group_rows),
+            ):
+                if rows:
+                    cursor.executemany(query, rows)
+                    self.counts[table] += len(rows)
+
+    # streams the CSV through load_batch, batch_size rows at a time
+    def load_csv(self, path):
+        self.load_lookups()
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            records = (self.parse(row) for row in csv.DictReader(f))
+            records = (r for r in records if r['pokemon_id'] is not None and r['name'])
+            while True:
+                batch = list(islice(records, self.batch_size))
+                if not batch:
+                    break
+                self.load_batch(batch)
+        return self.counts
+
+
+def main(argv=None):
+    from storage import open_pool
+
+    parser = argparse.ArgumentParser(description="Load the Kaggle pokemon CSV into the pokemon tables.")
+    parser.add_argument("csv_path", help="path to the Kaggle pokemon CSV")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per transaction")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    loader = PokedexLoader(open_pool(pool_size=1).cursor, args.batch_size)
+    counts = loader.load_csv(args.csv_path)
+    for table, n in counts.items():
+        print(f"{table}: {n} rows")
+    print(f"Loaded in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,682 @@
+# migrate.py
+# Versioned schema migrations for PokeQuiz.
+# Every migration runs once, in order, and is written so running it again is safe
+# (CREATE TABLE IF NOT EXISTS, INSERT IGNORE, indexes only created if missing).
+# Applied versions are tracked in the schema_migrations table.
+#
+# python migrate.py                 -> applies every pending migration
+# python migrate.py status          -> shows which migrations are applied
+# python migrate.py check-queries   -> EXPLAINs every query in project.py and fails on
+#                                      full table scans / filesorts on large tables
+
+import argparse
+import ast
+import re
+import sys
+
+from leaderboards import recompute_period_totals, recompute_totals
+
+
+# --------------------------------------------------------------------
+# MIGRATION HELPERS
+# --------------------------------------------------------------------
+
+# MySQL has no CREATE INDEX IF NOT EXISTS, so look it up first
+def ensure_index(cursor, table, index_name, columns, unique=False):
+    cursor.execute("""
+        SELECT COUNT(*) AS found
+        FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s;
+    """, (table, index_name))
+    if cursor.fetchone()["found"]:
+        return False
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    cursor.execute(f"CREATE {kind} {index_name} ON {table} ({columns});")
+    return True
+
+# same idea for columns, ALTER TABLE ADD COLUMN IF NOT EXISTS is MariaDB only
+def ensure_column(cursor, table, column, definition):
+    cursor.execute("""
+        SELECT COUNT(*) AS found
+        FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s;
+    """, (table, column))
+    if cursor.fetchone()["found"]:
+        return False
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition};")
+    return True
+
+
+# --------------------------------------------------------------------
+# MIGRATIONS
+# --------------------------------------------------------------------
+
+# 1. the base schema from project.sql, put in dependency order
+# (user_roles before users, the broken second user_roles table dropped,
+# sessions.user_id made BIGINT so the foreign key to users actually works)
+def migration_001_base_schema(cursor):
+    statements = [
+        """
+        CREATE TABLE IF NOT EXISTS user_roles (
+            role_id INT AUTO_INCREMENT PRIMARY KEY,
+            role_name VARCHAR(50) UNIQUE NOT NULL
+        );
+        """,
+        "INSERT IGNORE INTO user_roles (role_name) VALUES ('Admin'), ('Mod'), ('Normal User');",
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(50) NOT NULL UNIQUE,
+            email VARCHAR(100) NOT NULL UNIQUE,
+            password VARCHAR(255) NOT NULL,
+            role_id INT NOT NULL DEFAULT 3,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_login TIMESTAMP NULL DEFAULT NULL,
+            status ENUM('active', 'inactive', 'banned') DEFAULT 'active',
+            CONSTRAINT fk_user_role FOREIGN KEY (role_id) REFERENCES user_roles(role_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS user_profiles (
+            profile_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT NOT NULL UNIQUE,
+            display_name VARCHAR(100) NOT NULL,
+            role_id INT NOT NULL,
+            bio TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            CONSTRAINT fk_profile_user FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+            CONSTRAINT fk_profile_role FOREIGN KEY (role_id) REFERENCES user_roles(role_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            session_token VARCHAR(255) NOT NULL UNIQUE,
+            login_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            logout_time TIMESTAMP NULL,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS growth_rates (
+            growth_rate_id INT AUTO_INCREMENT PRIMARY KEY,
+            growth_rate_name VARCHAR(50) NOT NULL UNIQUE
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS special_groups (
+            special_group_id INT AUTO_INCREMENT PRIMARY KEY,
+            special_group_name VARCHAR(50) NOT NULL UNIQUE
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pokemon (
+            pokemon_id INT PRIMARY KEY,
+            name VARCHAR(50) NOT NULL,
+            generation INT,
+            species VARCHAR(50),
+            height DOUBLE,
+            weight DOUBLE,
+            base_exp INT,
+            catch_rate INT,
+            base_friendship INT,
+            egg_cycles INT,
+            growth_rate_id INT,
+            special_group_id INT,
+            FOREIGN KEY (growth_rate_id) REFERENCES growth_rates(growth_rate_id),
+            FOREIGN KEY (special_group_id) REFERENCES special_groups(special_group_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pokemon_stats (
+            pokemon_id INT PRIMARY KEY,
+            hp INT,
+            attack INT,
+            defense INT,
+            sp_atk INT,
+            sp_def INT,
+            speed INT,
+            total INT,
+            ev_yield VARCHAR(50),
+            FOREIGN KEY (pokemon_id) REFERENCES pokemon(pokemon_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS types (
+            type_id INT AUTO_INCREMENT PRIMARY KEY,
+            type_name VARCHAR(50) UNIQUE NOT NULL
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pokemon_types (
+            pokemon_id INT NOT NULL PRIMARY KEY,
+            slot1_type INT NOT NULL,
+            slot2_type INT DEFAULT NULL,
+            FOREIGN KEY (pokemon_id) REFERENCES pokemon(pokemon_id),
+            FOREIGN KEY (slot1_type) REFERENCES types(type_id),
+            FOREIGN KEY (slot2_type) REFERENCES types(type_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS abilities (
+            ability_id INT AUTO_INCREMENT PRIMARY KEY,
+            ability_name VARCHAR(100) UNIQUE NOT NULL
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pokemon_abilities (
+            pokemon_id INT PRIMARY KEY,
+            ability1_id INT NOT NULL,
+            ability2_id INT,
+            hidden_ability_id INT,
+            FOREIGN KEY (pokemon_id) REFERENCES pokemon(pokemon_id),
+            FOREIGN KEY (ability1_id) REFERENCES abilities(ability_id),
+            FOREIGN KEY (ability2_id) REFERENCES abilities(ability_id),
+            FOREIGN KEY (hidden_ability_id) REFERENCES abilities(ability_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS egg_groups (
+            egg_group_id INT AUTO_INCREMENT PRIMARY KEY,
+            egg_group_name VARCHAR(50) UNIQUE NOT NULL
+        );
+        """,
+        """
+        INSERT IGNORE INTO egg_groups (egg_group_name) VALUES
+        ('Amorphous'), ('Bug'), ('Ditto'), ('Dragon'), ('Fairy'), ('Field'), ('Flying'), ('Grass'),
+        ('Human-Like'), ('Mineral'), ('Monster'), ('Undiscovered'), ('Water 1'), ('Water 2'), ('Water 3');
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pokemon_egg_groups (
+            pokemon_id INT PRIMARY KEY,
+            egg_group1_id INT NOT NULL,
+            egg_group2_id INT NULL,
+            FOREIGN KEY (pokemon_id) REFERENCES pokemon(pokemon_id),
+            FOREIGN KEY (egg_group1_id) REFERENCES egg_groups(egg_group_id),
+            FOREIGN KEY (egg_group2_id) REFERENCES egg_groups(egg_group_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS game_modes (
+            mode_id INT AUTO_INCREMENT PRIMARY KEY,
+            mode_name VARCHAR(50) UNIQUE NOT NULL,
+            description TEXT
+        );
+        """,
+        """
+        INSERT IGNORE INTO game_modes (mode_name, description) VALUES
+        ('guess_stats', 'Identify a Pokémon from its stats'),
+        ('guess_weight', 'Choose which Pokémon weighs more'),
+        ('guess_dexnum', 'Guess the Pokémon based on its Pokédex number'),
+        ('guess_ability', 'Guess a Pokémon that has the shown ability'),
+        ('guess_egg_group', 'Guess whether two Pokémon share an egg group'),
+        ('guess_type', 'Guess a Pokémon that matches the given type'),
+        ('guess_species', 'Guess a Pokémon that matches the given species');
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard_general (
+            entry_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            mode_id INT NOT NULL,
+            score INT NOT NULL,
+            correct INT DEFAULT 0,
+            incorrect INT DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (mode_id) REFERENCES game_modes(mode_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard_guess_stats (
+            stats_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            pokemon_id INT NOT NULL,
+            is_correct BOOLEAN NOT NULL,
+            score INT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (pokemon_id) REFERENCES pokemon(pokemon_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard_guess_weight (
+            weight_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            pokemon1_id INT NOT NULL,
+            pokemon2_id INT NOT NULL,
+            user_choice_id INT NOT NULL,
+            correct_pokemon_id INT NOT NULL,
+            is_correct BOOLEAN NOT NULL,
+            score INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (pokemon1_id) REFERENCES pokemon(pokemon_id),
+            FOREIGN KEY (pokemon2_id) REFERENCES pokemon(pokemon_id),
+            FOREIGN KEY (user_choice_id) REFERENCES pokemon(pokemon_id),
+            FOREIGN KEY (correct_pokemon_id) REFERENCES pokemon(pokemon_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard_guess_dexnum (
+            guess_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            shown_dex INT NOT NULL,
+            user_choice_id INT NOT NULL,
+            correct_pokemon_id INT NOT NULL,
+            is_correct BOOLEAN NOT NULL,
+            score INT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (user_choice_id) REFERENCES pokemon(pokemon_id),
+            FOREIGN KEY (correct_pokemon_id) REFERENCES pokemon(pokemon_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard_guess_ability (
+            ability_guess_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            ability_id INT NOT NULL,
+            guessed_pokemon_id INT NOT NULL,
+            is_correct BOOLEAN NOT NULL,
+            score INT DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (ability_id) REFERENCES abilities(ability_id),
+            FOREIGN KEY (guessed_pokemon_id) REFERENCES pokemon(pokemon_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard_guess_egg_group (
+            egg_guess_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            pokemon1_id INT NOT NULL,
+            pokemon2_id INT NOT NULL,
+            share_egg_group BOOLEAN NOT NULL,
+            user_answer BOOLEAN NOT NULL,
+            is_correct BOOLEAN NOT NULL,
+            score INT DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (pokemon1_id) REFERENCES pokemon(pokemon_id),
+            FOREIGN KEY (pokemon2_id) REFERENCES pokemon(pokemon_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard_guess_type (
+            type_guess_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            type1_id INT NOT NULL,
+            type2_id INT,
+            guessed_pokemon_id INT NOT NULL,
+            is_correct BOOLEAN NOT NULL,
+            score INT DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (type1_id) REFERENCES types(type_id),
+            FOREIGN KEY (type2_id) REFERENCES types(type_id),
+            FOREIGN KEY (guessed_pokemon_id) REFERENCES pokemon(pokemon_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard_guess_species (
+            species_guess_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            given_species VARCHAR(50) NOT NULL,
+            guessed_pokemon_id INT NOT NULL,
+            is_correct BOOLEAN NOT NULL,
+            score INT DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (guessed_pokemon_id) REFERENCES pokemon(pokemon_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pokemon_favorites_count (
+            pokemon_id INT PRIMARY KEY,
+            favorite_count INT NOT NULL DEFAULT 0,
+            FOREIGN KEY (pokemon_id) REFERENCES pokemon(pokemon_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS user_favorite_pokemon (
+            user_id BIGINT NOT NULL,
+            pokemon_id INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, pokemon_id),
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (pokemon_id) REFERENCES pokemon(pokemon_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pokemon_comments (
+            comment_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            pokemon_id INT NOT NULL,
+            comment VARCHAR(255) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (pokemon_id) REFERENCES pokemon(pokemon_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS user_feedback (
+            feedback_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            feedback VARCHAR(255) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        );
+        """,
+    ]
+    for statement in statements:
+        cursor.execute(statement)
+
+# 2. running leaderboard totals, backfilled from whatever history already exists
+def migration_002_leaderboard_totals(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard_totals (
+            user_id BIGINT PRIMARY KEY,
+            total_games INT NOT NULL DEFAULT 0,
+            total_score BIGINT NOT NULL DEFAULT 0,
+            correct INT NOT NULL DEFAULT 0,
+            incorrect INT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_totals_rank (total_score, total_games),
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        );
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard_mode_totals (
+            user_id BIGINT NOT NULL,
+            mode_id INT NOT NULL,
+            total_games INT NOT NULL DEFAULT 0,
+            total_score BIGINT NOT NULL DEFAULT 0,
+            correct INT NOT NULL DEFAULT 0,
+            incorrect INT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, mode_id),
+            INDEX idx_mode_totals_rank (mode_id, total_score, total_games),
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (mode_id) REFERENCES game_modes(mode_id)
+        );
+    """)
+    recompute_totals(cursor)
+
+# 3. indexes for the columns the app actually filters and sorts on
+def migration_003_hot_path_indexes(cursor):
+    # the per-mode leaderboards are ORDER BY score DESC, created_at DESC LIMIT 10
+    for table in (
+        'leaderboard_guess_weight', 'leaderboard_guess_stats', 'leaderboard_guess_species',
+        'leaderboard_guess_egg_group', 'leaderboard_guess_dexnum', 'leaderboard_guess_ability',
+        'leaderboard_guess_type',
+    ):
+        ensure_index(cursor, table, f'idx_{table[len("leaderboard_"):]}_score', 'score, created_at')
+    # the stats leaderboard is sorted by date only
+    ensure_index(cursor, 'leaderboard_guess_stats', 'idx_guess_stats_created', 'created_at')
+
+    ensure_index(cursor, 'leaderboard_general', 'idx_general_user_mode', 'user_id, mode_id')
+    ensure_index(cursor, 'leaderboard_general', 'idx_general_created', 'created_at')
+
+    # comments are listed newest first per pokemon and per user
+    ensure_index(cursor, 'pokemon_comments', 'idx_comments_pokemon', 'pokemon_id, created_at')
+    ensure_index(cursor, 'pokemon_comments', 'idx_comments_user', 'user_id, created_at')
+
+    ensure_index(cursor, 'user_favorite_pokemon', 'idx_favorite_pokemon', 'pokemon_id')
+    ensure_index(cursor, 'pokemon_favorites_count', 'idx_favorites_count', 'favorite_count')
+    ensure_index(cursor, 'user_feedback', 'idx_feedback_user', 'user_id, created_at')
+
+# 4. indexed case-insensitive names, LOWER(name) = LOWER(%s) can't use an index
+# so the normalized key is stored in a generated column and that gets the index
+# (names.name_key builds the same key on the python side)
+def migration_004_name_keys(cursor):
+    ensure_column(cursor, 'pokemon', 'name_key',
+                  "VARCHAR(50) GENERATED ALWAYS AS (LOWER(TRIM(name))) STORED")
+    ensure_index(cursor, 'pokemon', 'uq_pokemon_name_key', 'name_key', unique=True)
+
+    ensure_column(cursor, 'user_profiles', 'display_name_key',
+                  "VARCHAR(100) GENERATED ALWAYS AS (LOWER(TRIM(display_name))) STORED")
+    ensure_index(cursor, 'user_profiles', 'uq_profiles_display_name_key', 'display_name_key', unique=True)
+
+
+# 5. day/week/month rollups for the time-windowed leaderboards, backfilled from the history
+def migration_005_period_totals(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard_period_totals (
+            period ENUM('day', 'week', 'month') NOT NULL,
+            period_start DATE NOT NULL,
+            mode_id INT NOT NULL,
+            user_id BIGINT NOT NULL,
+            total_games INT NOT NULL DEFAULT 0,
+            total_score BIGINT NOT NULL DEFAULT 0,
+            correct INT NOT NULL DEFAULT 0,
+            incorrect INT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (period, period_start, mode_id, user_id),
+            INDEX idx_period_rank (period, period_start, mode_id, total_score, total_games),
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (mode_id) REFERENCES game_modes(mode_id)
+        );
+    """)
+    recompute_period_totals(cursor)
+
+# 6. the pre-generated question bank and each player's place in it
+# (empty until python question_bank.py generate fills it)
+def migration_006_question_bank(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS question_answer_sets (
+            answer_key CHAR(16) PRIMARY KEY,
+            answers TEXT NOT NULL
+        );
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS question_bank (
+            mode_id INT NOT NULL,
+            seq INT NOT NULL,
+            pokemon1_id INT NOT NULL,
+            pokemon2_id INT NULL,
+            detail_id INT NULL,
+            answer_key CHAR(16) NOT NULL,
+            difficulty TINYINT NOT NULL,
+            PRIMARY KEY (mode_id, seq),
+            FOREIGN KEY (mode_id) REFERENCES game_modes(mode_id)
+        );
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS question_bank_cursors (
+            user_id BIGINT NOT NULL,
+            mode_id INT NOT NULL,
+            next_seq BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, mode_id),
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (mode_id) REFERENCES game_modes(mode_id)
+        );
+    """)
+
+
+# 7. which bank question a round was, so a disputed score can be looked up with
+# python question_bank.py show <mode> <bank_seq>
+def migration_007_round_bank_seq(cursor):
+    ensure_column(cursor, 'leaderboard_general', 'bank_seq', "BIGINT NULL AFTER incorrect")
+
+# 8. which questions each mode is serving, so a regenerate can switch over in one statement
+# (a bank from before this is served as it is, 0 .. MAX(seq))
+def migration_008_question_bank_modes(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS question_bank_modes (
+            mode_id INT PRIMARY KEY,
+            first_seq INT NOT NULL,
+            size INT NOT NULL,
+            FOREIGN KEY (mode_id) REFERENCES game_modes(mode_id)
+        );
+    """)
+    cursor.execute("""
+        INSERT IGNORE INTO question_bank_modes (mode_id, first_seq, size)
+        SELECT mode_id, 0, MAX(seq) + 1
+        FROM question_bank
+        GROUP BY mode_id;
+    """)
+
+
+# every migration in the order it has to run, never renumber or reorder these
+MIGRATIONS = [
+    (1, 'base_schema', migration_001_base_schema),
+    (2, 'leaderboard_totals', migration_002_leaderboard_totals),
+    (3, 'hot_path_indexes', migration_003_hot_path_indexes),
+    (4, 'name_keys', migration_004_name_keys),
+    (5, 'period_totals', migration_005_period_totals),
+    (6, 'question_bank', migration_006_question_bank),
+    (7, 'round_bank_seq', migration_007_round_bank_seq),
+    (8, 'question_bank_modes', migration_008_question_bank_modes),
+]
+
+
+# --------------------------------------------------------------------
+# RUNNER
+# --------------------------------------------------------------------
+
+def applied_versions(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    cursor.execute("SELECT version FROM schema_migrations;")
+    return {r["version"] for r in cursor.fetchall()}
+
+# applies every migration that hasn't been applied yet, returns the versions it ran
+def migrate(pool, target=None):
+    ran = []
+    with pool.cursor() as cursor:
+        done = applied_versions(cursor)
+
+    for version, name, fn in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        print(f"Applying migration {version:03d} {name}...")
+        # DDL commits on its own in MySQL, that's why every migration has to be rerunnable
+        with pool.cursor() as cursor:
+            fn(cursor)
+            cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s);", (version, name))
+        ran.append(version)
+    return ran
+
+def print_status(pool):
+    with pool.cursor() as cursor:
+        done = applied_versions(cursor)
+    for version, name, _ in MIGRATIONS:
+        print(f"  [{'x' if version in done else ' '}] {version:03d} {name}")
+
+
+# --------------------------------------------------------------------
+# EXPLAIN CHECK
+# --------------------------------------------------------------------
+
+# tables that grow with the number of players, a scan on these is always a problem
+# (the pokedex tables are capped at ~1000 rows so scanning them is fine)
+GROWING_TABLES = {
+    'users', 'user_profiles', 'sessions', 'user_favorite_pokemon', 'pokemon_comments', 'user_feedback',
+}
+
+def is_large_table(table, rows, min_rows):
+    if table.startswith('leaderboard_') or table in GROWING_TABLES:
+        return True
+    return (rows or 0) >= min_rows
+
+# pulls every SELECT/UPDATE/DELETE string literal out of a python file
+# returns (function name, line number, sql)
+def find_queries(path):
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+
+    found = {}
+    for top in tree.body:
+        owner = top.name if isinstance(top, (ast.FunctionDef, ast.ClassDef)) else '<module>'
+        for node in ast.walk(top):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                sql = ' '.join(node.value.split())
+                if re.match(r'(SELECT|UPDATE|DELETE)\s', sql):
+                    found[(node.lineno, node.col_offset)] = (owner, node.lineno, sql)
+    return [found[k] for k in sorted(found)]
+
+# swaps the %s placeholders for something EXPLAIN can run, LIMIT needs a number
+# and everything else gets a string so string columns can still use their indexes
+def fill_placeholders(sql):
+    sql = re.sub(r'\b(LIMIT|OFFSET)\s+%s', r'\1 10', sql, flags=re.IGNORECASE)
+    return sql.replace('%s', "'1'")
+
+# EXPLAINs one query, returns a list of problems (empty means it's fine)
+def explain_query(cursor, sql, min_rows):
+    cursor.execute("EXPLAIN " + fill_placeholders(sql).rstrip(';'))
+    problems = []
+    for row in cursor.fetchall():
+        table = row.get('table') or ''
+        rows = row.get('rows')
+        extra = row.get('Extra') or ''
+        if table.startswith('<') or not is_large_table(table, rows, min_rows):
+            continue
+        if row.get('type') == 'ALL':
+            problems.append(f"full table scan on {table} (~{rows} rows)")
+        if 'Using filesort' in extra:
+            problems.append(f"filesort on {table} (~{rows} rows)")
+    return problems
+
+def check_queries(pool, paths, min_rows=10000):
+    failures = 0
+    with pool.cursor() as cursor:
+        for path in paths:
+            for owner, lineno, sql in find_queries(path):
+                try:
+                    problems = explain_query(cursor, sql, min_rows)
+                except Exception as e:
+                    problems = [f"EXPLAIN failed: {e}"]
+                status = "FAIL" if problems else "ok"
+                print(f"{status:4} {path}:{lineno} {owner}")
+                for p in problems:
+                    print(f"       - {p}")
+                failures += bool(problems)
+
+    if failures:
+        print(f"\n{failures} queries need an index (or a rewrite).")
+    else:
+        print("\nNo full scans or filesorts on large tables.")
+    return failures
+
+
+def main(argv=None):
+    from storage import BACKEND
+
+    parser = argparse.ArgumentParser(description="PokeQuiz schema migrations.")
+    sub = parser.add_subparsers(dest="command")
+    up = sub.add_parser("up", help="apply pending migrations (the default)")
+    up.add_argument("--target", type=int, help="stop after this version")
+    sub.add_parser("status", help="list migrations and whether they are applied")
+    check = sub.add_parser("check-queries", help="EXPLAIN every query and fail on scans/filesorts")
+    check.add_argument("paths", nargs="*", default=["project.py"])
+    check.add_argument("--min-rows", type=int, default=10000,
+                       help="row estimate that makes any other table count as large")
+    args = parser.parse_args(argv)
+
+    # the migrations and EXPLAIN checks are MySQL's, storage.py sets up SQLite databases itself
+    if BACKEND == 'sqlite':
+        print("SQLite databases get their schema from storage.py when they are opened, nothing to migrate.")
+        return 0
+
+    from database import ConnectionPool
+    pool = ConnectionPool(pool_size=1)
+    if args.command == "status":
+        print_status(pool)
+        return 0
+    if args.command == "check-queries":
+        return 1 if check_queries(pool, args.paths, args.min_rows) else 0
+
+    ran = migrate(pool, getattr(args, "target", None))
+    print(f"Applied {len(ran)} migration(s)." if ran else "Schema is up to date.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
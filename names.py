@@ -0,0 +1,53 @@
+# names.py
+# One place for looking things up by name.
+# pokemon.name_key and user_profiles.display_name_key are generated columns
+# holding LOWER(TRIM(name)) with a unique index on them, so a lookup is an
+# index seek on the key instead of LOWER() on every row of the table.
+# name_key() has to build the exact same key in python.
+
+
+# same normalization as the generated columns in migrate.py
+def name_key(name):
+    if name is None:
+        return ''
+    return str(name).strip(' ').lower()
+
+
+POKEMON_BY_NAME = """
+    SELECT pokemon_id, name
+    FROM pokemon
+    WHERE name_key = %s
+    LIMIT 1;
+"""
+
+PROFILES_BY_NAME = """
+    SELECT
+        up.user_id,
+        up.display_name,
+        ur.role_name AS role,
+        up.bio,
+        up.created_at,
+        up.updated_at
+    FROM user_profiles up
+    LEFT JOIN user_roles ur
+        ON up.role_id = ur.role_id
+    WHERE up.display_name_key = %s;
+"""
+
+
+# pokemon lookup against the database, for code that runs without a Pokedex snapshot
+# (the app itself uses Pokedex.find, which is keyed with name_key too)
+def find_pokemon(cursor, name):
+    key = name_key(name)
+    if not key:
+        return None
+    cursor.execute(POKEMON_BY_NAME, (key,))
+    return cursor.fetchone()
+
+# profiles with the given display name, case-insensitive
+def find_profiles(cursor, display_name):
+    key = name_key(display_name)
+    if not key:
+        return []
+    cursor.execute(PROFILES_BY_NAME, (key,))
+    return cursor.fetchall()
@@ -0,0 +1,66 @@
+# pagination.py
+# Keyset (seek) pagination.
+# OFFSET reads and throws away every row before the page, so page 500 costs 500
+# pages worth of work. Here every page starts right after the last row of the
+# page before it (WHERE sort key < last key), so with an index on the sort
+# columns page 500 costs the same as page 1.
+
+
+class Keyset:
+
+    # query is SELECT ... FROM ... JOIN ... without WHERE / ORDER BY / LIMIT
+    # order is [(sql column, row key)], sorted DESC, the last one has to be unique (the id)
+    # where/params is an optional filter like ("pc.pokemon_id = %s", (25,))
+    def __init__(self, query, order, where=None, params=(), page_size=10):
+        self.query = query.strip().rstrip(';')
+        self.order = order
+        self.where = where
+        self.params = tuple(params)
+        self.page_size = page_size
+
+    # the sort key of a row, what gets passed back as after/before
+    def key(self, row):
+        return tuple(row[k] for _, k in self.order)
+
+    # "comes after key" for op '<' and "comes before key" for op '>', written out
+    # as a < x OR (a = x AND b < y) ... because MySQL only uses the index for that form
+    def _seek(self, key, op):
+        columns = [c for c, _ in self.order]
+        clauses = []
+        params = []
+        for i, column in enumerate(columns):
+            parts = [f"{c} = %s" for c in columns[:i]] + [f"{column} {op} %s"]
+            clauses.append("(" + " AND ".join(parts) + ")")
+            params.extend(key[:i + 1])
+        return "(" + " OR ".join(clauses) + ")", params
+
+    # the page after `after` or before `before` (first page if neither)
+    # returns (rows, more) where more means there is at least one more page that way
+    def page(self, cursor, after=None, before=None):
+        conditions = []
+        params = list(self.params)
+        if self.where:
+            conditions.append(self.where)
+
+        backwards = before is not None
+        key = before if backwards else after
+        if key is not None:
+            seek, seek_params = self._seek(key, '>' if backwards else '<')
+            conditions.append(seek)
+            params.extend(seek_params)
+
+        direction = "ASC" if backwards else "DESC"
+        sql = self.query
+        if conditions:
+            sql += "\n        WHERE " + " AND ".join(conditions)
+        sql += "\n        ORDER BY " + ", ".join(f"{c} {direction}" for c, _ in self.order)
+        sql += "\n        LIMIT %s;"
+
+        # one extra row tells us if there is another page without a COUNT(*)
+        cursor.execute(sql, (*params, self.page_size + 1))
+        rows = cursor.fetchall()
+        more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+        return rows, more
@@ -0,0 +1,136 @@
+# pairs.py
+# Precomputed pair tables for the two games that show two pokemon.
+# Two random pokemon almost always make an easy weight question (a 1000 kg one
+# against a 0.1 kg one) and an egg group question whose answer is "no", so the
+# games draw from these instead. Both are built once from the pokedex snapshot,
+# and every draw after that is constant time.
+
+from bisect import bisect_left
+
+
+# heavier / lighter at which a weight pair stops being easy, then medium
+# (quiz.WeightQuiz.difficulty grades pairs with the same numbers)
+EASY_RATIO = 4.0
+MEDIUM_RATIO = 1.5
+
+# level -> the weight ratios that count as that level, low included, high not
+WEIGHT_BANDS = {
+    1: (EASY_RATIO, None),
+    2: (MEDIUM_RATIO, EASY_RATIO),
+    3: (1.0, MEDIUM_RATIO),
+}
+
+
+class WeightPairs:
+
+    def __init__(self, entries):
+        # lightest first, so everything "between 1.5x and 4x as heavy as i" is one slice after i
+        self.entries = sorted((e for e in entries if e["weight"] and e["weight"] > 0),
+                              key=lambda e: float(e["weight"]))
+        weights = [float(e["weight"]) for e in self.entries]
+
+        # level -> (i, start, stop) for every pokemon that has a heavier partner at that level,
+        # the partners being entries[start:stop]
+        self.spans = {}
+        for level, (low, high) in WEIGHT_BANDS.items():
+            spans = []
+            for i, weight in enumerate(weights):
+                start = bisect_left(weights, weight * low, i + 1)
+                stop = bisect_left(weights, weight * high, start) if high else len(weights)
+                if start < stop:
+                    spans.append((i, start, stop))
+            self.spans[level] = spans
+
+    # two pokemon whose weights are level apart (1 easy .. 3 hard), any level when it's None
+    # comes back in a random order, empty if nothing fits
+    def draw(self, rng, level=None):
+        if level is None:
+            levels = [lv for lv, spans in self.spans.items() if spans]
+            if not levels:
+                return []
+            level = rng.choice(levels)
+        spans = self.spans.get(level)
+        if not spans:
+            return []
+
+        i, start, stop = spans[rng.randrange(len(spans))]
+        pair = [self.entries[i], self.entries[rng.randrange(start, stop)]]
+        if rng.random() < 0.5:
+            pair.reverse()
+        return pair
+
+
+# the egg groups a pokemon is in, one or two
+def egg_groups(entry):
+    return tuple(g for g in (entry["egg_group1_id"], entry["egg_group2_id"]) if g is not None)
+
+
+class EggGroupMatrix:
+
+    def __init__(self, entries):
+        self.entries = [e for e in entries if e["egg_group1_id"] is not None]
+        self.index = {e["pokemon_id"]: i for i, e in enumerate(self.entries)}
+
+        members = {}
+        for i, e in enumerate(self.entries):
+            for group in egg_groups(e):
+                members.setdefault(group, []).append(i)
+        self.members = {group: tuple(ids) for group, ids in members.items()}
+
+        # the matrix, one row per pokemon as a bitset: bit j of rows[i] is set
+        # when i and j share an egg group (about 130 KB for 1025 pokemon)
+        masks = {}
+        for group, ids in self.members.items():
+            mask = 0
+            for i in ids:
+                mask |= 1 << i
+            masks[group] = mask
+        self.rows = []
+        for e in self.entries:
+            row = 0
+            for group in egg_groups(e):
+                row |= masks[group]
+            self.rows.append(row)
+
+        # per pokemon, its groups that have somebody else in them (the ones a "yes" can come from)
+        self.shared_groups = [
+            tuple(g for g in egg_groups(e) if len(self.members[g]) > 1) for e in self.entries
+        ]
+        self.pairable = [i for i, groups in enumerate(self.shared_groups) if groups]
+
+    def __len__(self):
+        return len(self.entries)
+
+    # do the two pokemon share at least one egg group, one bit lookup
+    def compatible(self, pokemon1_id, pokemon2_id):
+        i = self.index.get(pokemon1_id)
+        j = self.index.get(pokemon2_id)
+        if i is None or j is None:
+            return False
+        return bool(self.rows[i] >> j & 1)
+
+    # two different pokemon that do (share=True) or don't share an egg group,
+    # accept(pair) can turn pairs down (the game uses it to ask for a difficulty),
+    # empty if tries draws in a row didn't find one
+    def draw(self, rng, share, accept=None, tries=50):
+        n = len(self.entries)
+        for _ in range(tries):
+            if share:
+                if not self.pairable:
+                    return []
+                i = self.pairable[rng.randrange(len(self.pairable))]
+                group = self.members[rng.choice(self.shared_groups[i])]
+                j = group[rng.randrange(len(group))]
+                if j == i:
+                    continue
+            else:
+                if n < 2:
+                    return []
+                i, j = rng.randrange(n), rng.randrange(n)
+                # most pairs don't share a group, so this hardly ever goes around again
+                if self.rows[i] >> j & 1:
+                    continue
+            pair = [self.entries[i], self.entries[j]]
+            if accept is None or accept(pair):
+                return pair
+        return []
@@ -0,0 +1,226 @@
+# pokedex.py
+# Read-only snapshot of all the pokemon reference data.
+# The pokemon tables never change while the app is running, so we read them
+# ONCE at startup and every game/search works off of memory after that.
+
+from types import MappingProxyType
+
+from names import name_key
+from fuzzy import NameMatcher
+from pairs import WeightPairs, EggGroupMatrix
+from breeding import BreedingGraph
+
+
+# one big join so the whole pokedex comes back in a single round trip
+SNAPSHOT_QUERY = """
+    SELECT
+        p.pokemon_id,
+        p.name,
+        p.generation,
+        p.species,
+        p.height,
+        p.weight,
+
+        s.hp, s.attack, s.defense, s.sp_atk, s.sp_def, s.speed, s.total,
+
+        pt.slot1_type AS type1_id,
+        pt.slot2_type AS type2_id,
+        t1.type_name AS type1,
+        t2.type_name AS type2,
+
+        pa.ability1_id,
+        pa.ability2_id,
+        pa.hidden_ability_id,
+        a1.ability_name AS ability1,
+        a2.ability_name AS ability2,
+        ah.ability_name AS hidden_ability,
+
+        peg.egg_group1_id,
+        peg.egg_group2_id,
+        eg1.egg_group_name AS egg_group1,
+        eg2.egg_group_name AS egg_group2
+
+    FROM pokemon p
+    LEFT JOIN pokemon_stats s ON p.pokemon_id = s.pokemon_id
+
+    LEFT JOIN pokemon_types pt ON p.pokemon_id = pt.pokemon_id
+    LEFT JOIN types t1 ON pt.slot1_type = t1.type_id
+    LEFT JOIN types t2 ON pt.slot2_type = t2.type_id
+
+    LEFT JOIN pokemon_abilities pa ON p.pokemon_id = pa.pokemon_id
+    LEFT JOIN abilities a1 ON pa.ability1_id = a1.ability_id
+    LEFT JOIN abilities a2 ON pa.ability2_id = a2.ability_id
+    LEFT JOIN abilities ah ON pa.hidden_ability_id = ah.ability_id
+
+    LEFT JOIN pokemon_egg_groups peg ON p.pokemon_id = peg.pokemon_id
+    LEFT JOIN egg_groups eg1 ON peg.egg_group1_id = eg1.egg_group_id
+    LEFT JOIN egg_groups eg2 ON peg.egg_group2_id = eg2.egg_group_id
+
+    ORDER BY p.pokemon_id;
+"""
+
+MODES_QUERY = """
+    SELECT mode_id, mode_name, description
+    FROM game_modes
+    ORDER BY mode_id;
+"""
+
+
+class Pokedex:
+
+    def __init__(self, rows, mode_rows=()):
+        # every entry is a read-only dict so nobody can change the snapshot by accident
+        self.entries = tuple(MappingProxyType(dict(r)) for r in rows)
+        self.by_id = {e["pokemon_id"]: e for e in self.entries}
+
+        # name_key -> entry, the same key as the pokemon.name_key column
+        self.by_name = {}
+        for e in self.entries:
+            if e["name"]:
+                self.by_name.setdefault(name_key(e["name"]), e)
+
+        # game modes are reference data too, mode_name -> row
+        self.modes = tuple(MappingProxyType(dict(r)) for r in mode_rows)
+        self.modes_by_name = {m["mode_name"]: m for m in self.modes}
+
+        # the pool each game draws from, matches the JOINs the games used to do
+        self.with_stats = tuple(e for e in self.entries if e["hp"] is not None)
+        self.with_species = tuple(e for e in self.entries if e["species"])
+        self.with_types = tuple(e for e in self.entries if e["type1_id"] is not None)
+        self.with_abilities = tuple(e for e in self.entries if e["ability1_id"] is not None)
+        self.with_egg_groups = tuple(e for e in self.entries if e["egg_group1_id"] is not None)
+
+        # answer indexes, built once so checking a guess is just "is the id in the set"
+        by_ability = {}
+        for e in self.with_abilities:
+            for ability_id in {e["ability1_id"], e["ability2_id"], e["hidden_ability_id"]}:
+                if ability_id is not None:
+                    by_ability.setdefault(ability_id, set()).add(e["pokemon_id"])
+
+        # by_type is "has this type in either slot", by_type_pair is the exact
+        # unordered typing so Grass/Poison and Poison/Grass are the same key
+        by_type = {}
+        by_type_pair = {}
+        for e in self.with_types:
+            typing = frozenset(t for t in (e["type1_id"], e["type2_id"]) if t is not None)
+            by_type_pair.setdefault(typing, set()).add(e["pokemon_id"])
+            for type_id in typing:
+                by_type.setdefault(type_id, set()).add(e["pokemon_id"])
+
+        by_species = {}
+        for e in self.with_species:
+            by_species.setdefault(e["species"].lower(), set()).add(e["pokemon_id"])
+
+        by_egg_group = {}
+        for e in self.with_egg_groups:
+            for egg_group_id in (e["egg_group1_id"], e["egg_group2_id"]):
+                if egg_group_id is not None:
+                    by_egg_group.setdefault(egg_group_id, set()).add(e["pokemon_id"])
+
+        by_stats = {}
+        for e in self.with_stats:
+            by_stats.setdefault(stat_line(e), set()).add(e["pokemon_id"])
+
+        # frozen so the indexes stay read-only like the rest of the snapshot
+        self.by_ability = {k: frozenset(v) for k, v in by_ability.items()}
+        self.by_type = {k: frozenset(v) for k, v in by_type.items()}
+        self.by_type_pair = {k: frozenset(v) for k, v in by_type_pair.items()}
+        self.by_species = {k: frozenset(v) for k, v in by_species.items()}
+        self.by_egg_group = {k: frozenset(v) for k, v in by_egg_group.items()}
+        self.by_stats = {k: frozenset(v) for k, v in by_stats.items()}
+
+        self._matcher = None
+        self._weight_pairs = None
+        self._egg_matrix = None
+        self._breeding = None
+
+    # loads the whole snapshot, one query for the pokedex and one for the game modes
+    @classmethod
+    def load(cls, cursor):
+        cursor.execute(SNAPSHOT_QUERY)
+        rows = cursor.fetchall()
+        cursor.execute(MODES_QUERY)
+        mode_rows = cursor.fetchall()
+        return cls(rows, mode_rows)
+
+    def __len__(self):
+        return len(self.entries)
+
+    # gets a pokemon by its id / dex number
+    def get(self, pokemon_id):
+        return self.by_id.get(pokemon_id)
+
+    # case-insensitive name lookup, returns None if there is no match
+    def find(self, name):
+        if not name:
+            return None
+        return self.by_name.get(name_key(name))
+
+    # the fuzzy index is only built the first time someone needs it
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            self._matcher = NameMatcher((e["name"], e) for e in self.entries if e["name"])
+        return self._matcher
+
+    # the pair tables for the weight and egg group games (pairs.py), built on first use too
+    @property
+    def weight_pairs(self):
+        if self._weight_pairs is None:
+            self._weight_pairs = WeightPairs(self.entries)
+        return self._weight_pairs
+
+    @property
+    def egg_matrix(self):
+        if self._egg_matrix is None:
+            self._egg_matrix = EggGroupMatrix(self.entries)
+        return self._egg_matrix
+
+    # who can breed with whom (breeding.py)
+    @property
+    def breeding(self):
+        if self._breeding is None:
+            self._breeding = BreedingGraph(self.entries)
+        return self._breeding
+
+    # like find but forgives accents/punctuation, and up to max_distance typos
+    # on longer names, returns None when nothing (or more than one thing) is that close
+    def match(self, name, max_distance=0):
+        return self.find(name) or self.matcher.match(name, max_distance)
+
+    # a few close names for "did you mean ..."
+    def suggest(self, name, limit=3):
+        return self.matcher.suggest(name, limit)
+
+    # gets the mode_id for a game mode name like 'guess_weight'
+    def mode_id(self, mode_name):
+        mode = self.modes_by_name.get(mode_name)
+        return mode["mode_id"] if mode else None
+
+    # ids of every pokemon that has the ability in any of its three slots
+    def ability_answers(self, ability_id):
+        return self.by_ability.get(ability_id, frozenset())
+
+    # ids of every pokemon with the typing, dual types match in either slot order
+    # and a single type matches any pokemon that has it in either slot
+    def type_answers(self, type1_id, type2_id=None):
+        if type2_id:
+            return self.by_type_pair.get(frozenset((type1_id, type2_id)), frozenset())
+        return self.by_type.get(type1_id, frozenset())
+
+    # ids of every pokemon with the same species, case-insensitive
+    def species_answers(self, species):
+        return self.by_species.get(species.lower(), frozenset())
+
+    # ids of every pokemon in the egg group
+    def egg_group_answers(self, egg_group_id):
+        return self.by_egg_group.get(egg_group_id, frozenset())
+
+    # ids of every pokemon with exactly the same six base stats as this one
+    def stat_answers(self, entry):
+        return self.by_stats.get(stat_line(entry), frozenset())
+
+
+# the six base stats as a tuple, total is left out since it follows from the rest
+def stat_line(entry):
+    return (entry["hp"], entry["attack"], entry["defense"], entry["sp_atk"], entry["sp_def"], entry["speed"])
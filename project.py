@@ -1,21 +1,88 @@
 # project.py
 # Main file for a Pokemon based Quiz!
 
-import mysql.connector
+import atexit
 import getpass
-import random
+import threading
 from datetime import datetime, timedelta # for date manipulations
-from tabulate import tabulate # makes the table pretty
-
-
-# connects to MySQLs
-conn = mysql.connector.connect(
-    host='localhost',
-    user='root',
-    password='LOL',
-    database='project'
-)
-cursor = conn.cursor(dictionary=True)
+from lazy import Lazy # builds the pool/pokedex on first use instead of at import
+from pokedex import Pokedex # in-memory snapshot of the pokemon tables
+from sampler import Sampler # random question picking without ORDER BY RAND()
+from quiz import ENGINES, InvalidAnswer # the games themselves, without input()/print()
+from question_bank import QuestionBank, ENABLED as QUESTION_BANK_ENABLED # pre-generated questions
+from storage import open_pool, db_errors # mysql or sqlite, whichever is configured
+from results import ResultWriter # saves quiz rounds in batches
+from names import find_profiles # indexed name lookups
+from cache import ResultCache # leaderboard results until something changes
+from scoreboard import Scoreboard # in-memory rankings for "My Ranking"
+from leaderboards import window_leaderboard # daily/weekly/monthly boards
+from pagination import Keyset # page through comments and leaderboards
+
+
+# makes the table pretty, imported the first time a table gets printed so startup doesn't pay for it
+def tabulate(*args, **kwargs):
+    from tabulate import tabulate as make_table
+    return make_table(*args, **kwargs)
+
+# nothing below connects when the module is imported, the pool, the pokedex and the
+# scoreboards are built the first time something uses them (see warm_up)
+
+# connects to the database (MySQL unless POKEQUIZ_DB_BACKEND=sqlite),
+# every function borrows a connection from the pool when it needs one
+db_pool = Lazy(open_pool)
+
+# loads all the pokemon reference data once, the games and searches read from this
+def load_pokedex():
+    with db_pool.cursor() as cursor:
+        return Pokedex.load(cursor)
+
+pokedex = Lazy(load_pokedex)
+
+# the ranked scoreboards start from the saved totals, then follow new rounds
+def load_scoreboard():
+    board = Scoreboard()
+    with db_pool.cursor() as cursor:
+        board.seed(cursor)
+    return board
+
+scoreboard = Lazy(load_scoreboard)
+
+# leaderboard rows are cached until a new round or favorite changes them (or the TTL runs out)
+leaderboard_cache = ResultCache()
+
+# a saved batch of rounds moves people on the scoreboards and makes the
+# general board and the boards for those modes stale
+def rounds_saved(general_rows):
+    scoreboard.add_rounds(general_rows)
+    mode_ids = {r[1] for r in general_rows}
+    names = ['general', 'window'] + [m["mode_name"] for m in pokedex.modes if m["mode_id"] in mode_ids]
+    leaderboard_cache.invalidate(*names)
+
+# quiz rounds get queued here and saved in batches, anything left is saved when the app exits
+def start_result_writer():
+    writer = ResultWriter(db_pool, on_commit=rounds_saved)
+    atexit.register(writer.close)
+    return writer
+
+result_writer = Lazy(start_result_writer)
+
+# pre-generated questions, only used with POKEQUIZ_QUESTION_BANK=1
+def open_question_bank():
+    return QuestionBank(db_pool)
+
+question_bank = Lazy(open_question_bank)
+
+# builds everything up front, main runs this in the background while the player
+# is still reading the welcome screen so the first game doesn't wait on it
+def warm_up():
+    try:
+        for thing in (db_pool, pokedex, scoreboard, result_writer):
+            thing.value()
+        # the fuzzy name index takes a moment to build, without this the first guess pays for it
+        pokedex.matcher
+    except Exception:
+        # no database yet, the first thing that needs one will try again and show the error
+        pass
 
 # --------------------------------------------------------------------
 # USER INFOMATION AND AUTHENTICATION
@@ -39,26 +106,26 @@ def authenticate_user(identifier, password):
     WHERE u.username = %s OR u.email = %s
     LIMIT 1;
     """
-    cursor.execute(query, (identifier, identifier))
-    row = cursor.fetchone()
-    if not row:
-        return None
+    with db_pool.cursor() as cursor:
+        cursor.execute(query, (identifier, identifier))
+        row = cursor.fetchone()
+        if not row:
+            return None
 
-    # Checks to make sure password matches
-    stored = row.get('password') if isinstance(row, dict) else row[3]
-    if stored is None:
-        return None
+        # Checks to make sure password matches
+        stored = row.get('password') if isinstance(row, dict) else row[3]
+        if stored is None:
+            return None
 
-    # In a real app, would hash and salt the passwords
-    if stored != password:
-        return None
+        # In a real app, would hash and salt the passwords
+        if stored != password:
+            return None
 
-    # Updates last_login
-    try:
-        cursor.execute("UPDATE users SET last_login = NOW() WHERE user_id = %s;", (row.get('user_id'),))
-        conn.commit()
-    except Exception:
-        pass
+        # Updates last_login
+        try:
+            cursor.execute("UPDATE users SET last_login = NOW() WHERE user_id = %s;", (row.get('user_id'),))
+        except Exception:
+            pass
 
     # Builds returned user dict
     return {
@@ -119,28 +186,27 @@ def register_prompt():
         role_id = 3
 
         try:
-            cursor.execute(
-                "INSERT INTO users (username, email, password, role_id) VALUES (%s, %s, %s, %s);",
-                (username, email, pwd, role_id)
-            )
-            conn.commit()
-            new_user_id = cursor.lastrowid
-
-            # creates a basic profile row using the username as display_name
-            cursor.execute(
-                "INSERT INTO user_profiles (user_id, display_name, role_id) VALUES (%s, %s, %s);",
-                (new_user_id, username, role_id)
-            )
-            conn.commit()
+            # user and profile go in together, if either fails neither is kept
+            with db_pool.cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO users (username, email, password, role_id) VALUES (%s, %s, %s, %s);",
+                    (username, email, pwd, role_id)
+                )
+                new_user_id = cursor.lastrowid
+
+                # creates a basic profile row using the username as display_name
+                cursor.execute(
+                    "INSERT INTO user_profiles (user_id, display_name, role_id) VALUES (%s, %s, %s);",
+                    (new_user_id, username, role_id)
+                )
 
             print(f"User '{username}' registered successfully. You may now log in.")
             return True
 
-        except mysql.connector.Error as e:
-            conn.rollback()
+        except db_errors() as e:
             # makes sure to catch duplicate entry errors
             msg = str(e)
-            if 'Duplicate' in msg or 'duplicate' in msg or 'ER_DUP_ENTRY' in msg:
+            if 'Duplicate' in msg or 'duplicate' in msg or 'ER_DUP_ENTRY' in msg or 'UNIQUE constraint' in msg:
                 if 'username' in msg:
                     print("That username is already taken. Choose a different username.")
                 elif 'email' in msg:
@@ -176,14 +242,13 @@ def edit_account():
                 continue
             try:
                 # Changes the email
-                cursor.execute("UPDATE users SET email = %s WHERE user_id = %s;", (new, current_user['user_id']))
-                conn.commit()
+                with db_pool.cursor() as cursor:
+                    cursor.execute("UPDATE users SET email = %s WHERE user_id = %s;", (new, current_user['user_id']))
                 current_user['email'] = new
                 print("Email updated.")
-            except mysql.connector.Error as e:
-                conn.rollback()
+            except db_errors() as e:
                 msg = str(e).lower()
-                if "duplicate" in msg or "er_dup" in msg:
+                if "duplicate" in msg or "er_dup" in msg or "unique constraint" in msg:
                     print("Email already registered.")
                 else:
                     print("Update failed:", e)
@@ -193,13 +258,13 @@ def edit_account():
             if isinstance(new, str) and new.lower() in ("back", "b"):
                 continue
             # update or insert as needed
-            cursor.execute("UPDATE user_profiles SET bio = %s WHERE user_id = %s;", (new, current_user['user_id']))
-            if cursor.rowcount == 0:
-                cursor.execute(
-                    "INSERT INTO user_profiles (user_id, display_name, role_id, bio) VALUES (%s, %s, %s, %s);",
-                    (current_user['user_id'], current_user.get('username'), current_user.get('role_id', 3), new)
-                )
-            conn.commit()
+            with db_pool.cursor() as cursor:
+                cursor.execute("UPDATE user_profiles SET bio = %s WHERE user_id = %s;", (new, current_user['user_id']))
+                if cursor.rowcount == 0:
+                    cursor.execute(
+                        "INSERT INTO user_profiles (user_id, display_name, role_id, bio) VALUES (%s, %s, %s, %s);",
+                        (current_user['user_id'], current_user.get('username'), current_user.get('role_id', 3), new)
+                    )
             print("Bio updated.")
 
         else:
@@ -207,22 +272,8 @@ def edit_account():
 
 # searches for profiles
 def search_profiles(display_name):
-    display_name = display_name.strip()
-    query = """
-    SELECT
-        up.user_id,
-        up.display_name,
-        ur.role_name AS role,
-        up.bio,
-        up.created_at,
-        up.updated_at
-    FROM user_profiles up
-    LEFT JOIN user_roles ur
-        ON up.role_id = ur.role_id
-    WHERE LOWER(up.display_name) = LOWER(%s);
-    """
-    cursor.execute(query, (display_name,))
-    rows = cursor.fetchall()
+    with db_pool.cursor() as cursor:
+        rows = find_profiles(cursor, display_name)
 
     return rows
 
@@ -234,8 +285,9 @@ def view_own_profile():
 
     try:
         # get display_name for the current user
-        cursor.execute("SELECT display_name FROM user_profiles WHERE user_id = %s LIMIT 1;", (current_user['user_id'],))
-        dn_row = cursor.fetchone()
+        with db_pool.cursor() as cursor:
+            cursor.execute("SELECT display_name FROM user_profiles WHERE user_id = %s LIMIT 1;", (current_user['user_id'],))
+            dn_row = cursor.fetchone()
         display_name = None
         if dn_row:
             display_name = dn_row.get('display_name') if isinstance(dn_row, dict) else dn_row[0]
@@ -253,22 +305,22 @@ def view_own_profile():
 
         print("\n===== YOUR PROFILE =====")
         print(tabulate(rows, headers=headers, tablefmt="grid"))
-    except mysql.connector.Error as e:
+    except db_errors() as e:
         print("Failed to load profile:", e)
 
 # sets and edits user favorite pokemon
-def set_favorite_pokemon(current_user, cursor, conn):
+def set_favorite_pokemon(current_user):
     while True:
         # displays current favorite pokemon first, if they have none then say so
         # limit one because there should only be one favorite per user
-        cursor.execute("SELECT pokemon_id FROM user_favorite_pokemon WHERE user_id = %s LIMIT 1;", (current_user['user_id'],))
-        row = cursor.fetchone()
+        with db_pool.cursor() as cursor:
+            cursor.execute("SELECT pokemon_id FROM user_favorite_pokemon WHERE user_id = %s LIMIT 1;", (current_user['user_id'],))
+            row = cursor.fetchone()
         current_fav_id = row.get('pokemon_id') if row else None
         
         # get the name of the current favorite pokemon
         if current_fav_id:
-            cursor.execute("SELECT name FROM pokemon WHERE pokemon_id = %s;", (current_fav_id,))
-            fav_row = cursor.fetchone()
+            fav_row = pokedex.get(current_fav_id)
             current_fav_name = fav_row.get('name') if fav_row else "Unknown"
             print(f"Current favorite Pokemon: {current_fav_name}")
         else:
@@ -279,49 +331,47 @@ def set_favorite_pokemon(current_user, cursor, conn):
         if new.lower() in ("back", "b") or not new:
             return
                 
+        # Check if the pokemon exists
+        poke_row = pokedex.find(new)
+        if not poke_row:
+            print(f"Pokemon '{new}' not found in database.")
+            continue
+
+        new_pokemon_id = poke_row.get('pokemon_id')
+
         try:
-            # Check if the pokemon exists
-            cursor.execute("SELECT pokemon_id FROM pokemon WHERE LOWER(name) = LOWER(%s) LIMIT 1;", (new,))
-            poke_row = cursor.fetchone()
+            with db_pool.cursor() as cursor:
+                # Removes old favorite if exists and one wasnt set yet 
+                if current_fav_id and current_fav_id != new_pokemon_id:
+                    cursor.execute("DELETE FROM user_favorite_pokemon WHERE user_id = %s;", (current_user['user_id'],))
+                    # Decrement old pokemon's favorite count
+                    cursor.execute("UPDATE pokemon_favorites_count SET favorite_count = favorite_count - 1 WHERE pokemon_id = %s;", (current_fav_id,))
                     
-            if not poke_row:
-                print(f"Pokemon '{new}' not found in database.")
-                continue
-                    
-            new_pokemon_id = poke_row.get('pokemon_id')
-                    
-            # Removes old favorite if exists and one wasnt set yet 
-            if current_fav_id and current_fav_id != new_pokemon_id:
-                cursor.execute("DELETE FROM user_favorite_pokemon WHERE user_id = %s;", (current_user['user_id'],))
-                # Decrement old pokemon's favorite count
-                cursor.execute("UPDATE pokemon_favorites_count SET favorite_count = favorite_count - 1 WHERE pokemon_id = %s;", (current_fav_id,))
-                conn.commit()
+                # Checks if new favorite already exists for this user, It shouldn't but just in case
+                cursor.execute("SELECT pokemon_id FROM user_favorite_pokemon WHERE user_id = %s AND pokemon_id = %s;", (current_user['user_id'], new_pokemon_id))
+                existing = cursor.fetchone()
                     
-            # Checks if new favorite already exists for this user, It shouldn't but just in case
-            cursor.execute("SELECT pokemon_id FROM user_favorite_pokemon WHERE user_id = %s AND pokemon_id = %s;", (current_user['user_id'], new_pokemon_id))
-            existing = cursor.fetchone()
-                    
-            # Inserts new favorite if it doesn't already exist
+                # Inserts new favorite if it doesn't already exist
+                if not existing:
+                    # Insert new favorite
+                    cursor.execute("INSERT INTO user_favorite_pokemon (user_id, pokemon_id) VALUES (%s, %s);", (current_user['user_id'], new_pokemon_id))
+                    # Increment new pokemon's favorite count
+                    cursor.execute("INSERT INTO pokemon_favorites_count (pokemon_id, favorite_count) VALUES (%s, 1) ON DUPLICATE KEY UPDATE favorite_count = favorite_count + 1;", (new_pokemon_id,))
+
             if not existing:
-                # Insert new favorite
-                cursor.execute("INSERT INTO user_favorite_pokemon (user_id, pokemon_id) VALUES (%s, %s);", (current_user['user_id'], new_pokemon_id))
-                # Increment new pokemon's favorite count
-                cursor.execute("INSERT INTO pokemon_favorites_count (pokemon_id, favorite_count) VALUES (%s, 1) ON DUPLICATE KEY UPDATE favorite_count = favorite_count + 1;", (new_pokemon_id,))
-                conn.commit()
+                leaderboard_cache.invalidate('favorites')
                 print("Favorite Pokemon updated.")
-                return
             else:
                 # incase of duplicate
                 print("This Pokemon is already your favorite.")
-                return
+            return
                         
-        except mysql.connector.Error as e:
-            conn.rollback()
+        except db_errors() as e:
             print("Update failed:", e)
             return
 
 # allows user to submit feedback
-def submit_feedback(user_id, cursor, db):
+def submit_feedback(user_id):
     print("\n=== SUBMIT FEEDBACK ===")
     # can only be 250 characters max for feedback
     feedback = input("Enter your feedback (or 'back' to cancel): ").strip()
@@ -334,11 +384,11 @@ def submit_feedback(user_id, cursor, db):
         print("Feedback must be 250 characters or less.")
         return
 
-    cursor.execute("""
-        INSERT INTO user_feedback (user_id, feedback)
-        VALUES (%s, %s);
-    """, (user_id, feedback))
-    db.commit()
+    with db_pool.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO user_feedback (user_id, feedback)
+            VALUES (%s, %s);
+        """, (user_id, feedback))
     print("Thank you for your feedback!")
 
 # --------------------------------------------------------------------
@@ -347,941 +397,348 @@ def submit_feedback(user_id, cursor, db):
 
 # basic search function for any pokemon. Returns: ID, Name, Types, Abilities
 def search_pokemon(pokemon_name):
-    pokemon_name = pokemon_name.strip()
+    entry = pokedex.match(pokemon_name)
+    if not entry:
+        return []
+
+    return [{
+        'pokemon_id': entry['pokemon_id'],
+        'poke_name': entry['name'],
+        'type1': entry['type1'],
+        'type2': entry['type2'],
+        'ability1': entry['ability1'],
+        'ability2': entry['ability2'],
+        'hidden_ability': entry['hidden_ability'],
+    }]
 
-    query = """
-    SELECT 
-        p.pokemon_id,
-        p.name AS poke_name,
-
-        t1.type_name AS type1,
-        t2.type_name AS type2,
-
-        a1.ability_name AS ability1,
-        a2.ability_name AS ability2,
-        ah.ability_name AS hidden_ability
-
-    FROM pokemon p
-
-    LEFT JOIN pokemon_types pt 
-        ON p.pokemon_id = pt.pokemon_id
-    LEFT JOIN types t1 
-        ON pt.slot1_type = t1.type_id
-    LEFT JOIN types t2 
-        ON pt.slot2_type = t2.type_id
-
-    LEFT JOIN pokemon_abilities pa
-        ON p.pokemon_id = pa.pokemon_id
-    LEFT JOIN abilities a1 
-        ON pa.ability1_id = a1.ability_id
-    LEFT JOIN abilities a2 
-        ON pa.ability2_id = a2.ability_id
-    LEFT JOIN abilities ah 
-        ON pa.hidden_ability_id = ah.ability_id
-
-    WHERE LOWER(p.name) = LOWER(%s);
-    """
+# search the pokemon base stats
+def search_pokemon_stats(pokemon_name):
+    entry = pokedex.match(pokemon_name)
+    if not entry:
+        return []
 
-    cursor.execute(query, (pokemon_name,))
-    results = cursor.fetchall()
+    row = {'pokemon_id': entry['pokemon_id'], 'poke_name': entry['name']}
+    for stat in ('hp', 'attack', 'defense', 'sp_atk', 'sp_def', 'speed', 'total'):
+        row[stat] = entry[stat]
+    return [row]
 
-    return results
+def breeding_row(entry):
+    return {
+        'pokemon_id': entry['pokemon_id'],
+        'poke_name': entry['name'],
+        'egg_group1': entry['egg_group1'],
+        'egg_group2': entry['egg_group2'],
+    }
 
-# search the pokemon base stats
-def search_pokemon_stats(pokemon_name):
-    pokemon_name = pokemon_name.strip()
-    query = """
-    SELECT
-        p.pokemon_id,
-        p.name AS poke_name,
-        ps.hp,
-        ps.attack,
-        ps.defense,
-        ps.sp_atk,
-        ps.sp_def,
-        ps.speed,
-        ps.total
-    FROM pokemon p
-    LEFT JOIN pokemon_stats ps
-        ON p.pokemon_id = ps.pokemon_id
-    WHERE LOWER(p.name) = LOWER(%s);
-    """
-    cursor.execute(query, (pokemon_name,))
-    return cursor.fetchall()
+# every pokemon that can breed with this one, from the breeding graph in the pokedex
+# None when there is no such pokemon, [] when it can't breed at all (Undiscovered)
+def search_breeding_partners(pokemon_name):
+    entry = pokedex.match(pokemon_name)
+    if not entry:
+        return None
+    return [breeding_row(e) for e in pokedex.breeding.partners(entry)]
+
+# the fewest breedings that get from one pokemon to the other, both ends included
+# None when either name isn't a pokemon, [] when there is no chain between them
+def search_breeding_chain(from_name, to_name):
+    start, end = pokedex.match(from_name), pokedex.match(to_name)
+    if not start or not end:
+        return None
+    chain = pokedex.breeding.chain(start, end)
+    return [breeding_row(e) for e in chain] if chain else []
 
 # --------------------------------------------------------------------
 # POKEMON QUIZ FUNCTIONS
 # --------------------------------------------------------------------
 
+# each player gets their own sampler so they don't see repeats until they have seen every pokemon
+session_samplers = {}
+
+def get_sampler(user_id):
+    if user_id not in session_samplers:
+        session_samplers[user_id] = Sampler(pokedex)
+    return session_samplers[user_id]
+
 # view all gamemodes
 def view_gamemodes():
-    query = """
-    SELECT
-        mode_id AS id,
-        mode_name AS name,
-        description
-    FROM game_modes
-    ORDER BY mode_id;
-    """
-    cursor.execute(query)
-    rows = cursor.fetchall()
-
     headers = ["ID", "Name", "Description"]
     table = [
         [
-            r.get('id'),
-            r.get('name'),
-            r.get('description') or ""
+            m.get('mode_id'),
+            m.get('mode_name'),
+            m.get('description') or ""
         ]
-        for r in rows
+        for m in pokedex.modes
     ]
 
     print("\nAvailable Gamemodes:")
     print(tabulate(table, headers=headers, tablefmt="grid"))
 
-# the guess weight game
-def guess_weight_game(user_id, cursor, db):
-    print("\n===== WHICH POKEMON WEIGHS MORE? =====")
-
-    # for the leaderboard_general
-    cursor.execute("""
-        SELECT mode_id 
-        FROM game_modes
-        WHERE mode_name = 'guess_weight';
-    """)
-    mode_data = cursor.fetchone()
-    mode_id = mode_data["mode_id"] if mode_data else None
+# plays one of the quiz engines at the terminal, the rules live in quiz.py
+def play_quiz(mode_name, user_id):
+    bank = question_bank if QUESTION_BANK_ENABLED else None
+    engine = ENGINES[mode_name](user_id, pokedex.value(), get_sampler(user_id), result_writer, bank=bank)
+    print(engine.title)
+    refill = None
 
     # starts the game loop
     while True:
-        # gets two random pokemon from mysql
-        query = """
-            SELECT pokemon_id, name, weight
-            FROM pokemon
-            ORDER BY RAND()
-            LIMIT 2;
-        """
-        cursor.execute(query)
-        pokemon = cursor.fetchall()
-
-        p1 = pokemon[0]
-        p2 = pokemon[1]
-
-        print("\nChoose which one is heavier:")
-        print("1.", p1["name"])
-        print("2.", p2["name"])
-
-        # user input
-        while True:
-            choice = input("Your choice (1 or 2): ").strip()
-            if choice in ("1", "2"):
-                break
-            print("Invalid choice. Please enter 1 or 2.")
-
-        if choice == "1":
-            user_choice = p1
-        else:
-            user_choice = p2
-
-        # determines the correct Pokémon
-        correct_pokemon = p1 if p1["weight"] > p2["weight"] else p2
+        if refill is not None:
+            refill.join()
+        question = engine.next_question()
 
-        is_correct = (user_choice["pokemon_id"] == correct_pokemon["pokemon_id"])
-
-        if is_correct:
-            print("\nCorrect! The heavier Pokémon is:", correct_pokemon["name"])
-            score = 100
-        else:
-            print("\nWrong! The heavier Pokémon is:", correct_pokemon["name"])
-            score = 0
-
-        # puts it in the leaderboard_guess_weight
-        insert_weight_query = """
-            INSERT INTO leaderboard_guess_weight (
-                user_id,
-                pokemon1_id,
-                pokemon2_id,
-                user_choice_id,
-                correct_pokemon_id,
-                is_correct,
-                score
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s);
-        """
-
-        cursor.execute(insert_weight_query, (
-            user_id,
-            p1["pokemon_id"],
-            p2["pokemon_id"],
-            user_choice["pokemon_id"],
-            correct_pokemon["pokemon_id"],
-            is_correct,
-            score
-        ))
-        db.commit()
-
-        # puts it in the overall leaderboard
-        if mode_id is not None:
-            cursor.execute("""
-                INSERT INTO leaderboard_general (
-                    user_id, mode_id, score, correct, incorrect
-                )
-                VALUES (%s, %s, %s, %s, %s);
-            """, (
-                user_id,
-                mode_id,
-                score,
-                1 if is_correct else 0,
-                0 if is_correct else 1
-            ))
-            db.commit()
-
-        # play again loop
-        again = input("\nPlay again? (y/n): ").strip().lower()
-        if again not in ("y", "yes"):
-            print("\nExiting weight guessing game!")
+        if question is None:
+            print(engine.empty_message)
             break
 
-# the stat guessing game
-def guess_stats_game(user_id, cursor, db):
-    print("\n=== Guess the Pokémon From Its Stats ===")
-
-    cursor.execute("""
-        SELECT mode_id
-        FROM game_modes
-        WHERE mode_name = 'guess_stats';
-    """)
-    mode_row = cursor.fetchone()
-    mode_id = mode_row["mode_id"] if mode_row else None
-
-    # starts loop
-    while True:
-
-        # gets a random Pokémon and its stats
-        query = """
-            SELECT 
-                p.pokemon_id,
-                p.name,
-                s.hp, s.attack, s.defense, s.sp_atk, s.sp_def, s.speed, s.total
-            FROM pokemon p
-            JOIN pokemon_stats s ON p.pokemon_id = s.pokemon_id
-            ORDER BY RAND()
-            LIMIT 1;
-        """
-        cursor.execute(query)
-        row = cursor.fetchone()
-
-        pokemon_id = row["pokemon_id"]
-        pokemon_name = row["name"]
-
-        # displays stats to player
-        print("\nHere are the stats of a Pokémon:")
-        stat_table = [
-            ["HP", row["hp"]],
-            ["Attack", row["attack"]],
-            ["Defense", row["defense"]],
-            ["Sp. Atk", row["sp_atk"]],
-            ["Sp. Def", row["sp_def"]],
-            ["Speed", row["speed"]],
-            ["Total", row["total"]],
-        ]
-
-        print(tabulate(stat_table, headers=["Stat", "Value"], tablefmt="grid"))
-
-        # playee guess
-        guess = input("\nYour guess (Pokémon name): ").strip()
-
-        is_correct = (guess.lower() == pokemon_name.lower())
+        print("\n" + question["prompt"])
+        if "stats" in question:
+            print(tabulate(list(question["stats"].items()), headers=["Stat", "Value"], tablefmt="grid"))
 
-        # scores
-        if is_correct:
-            print(f"\n Correct! The Pokémon was {pokemon_name}!")
-            score = 600
-        else:
-            print(f"\n Wrong! The Pokémon was {pokemon_name}.")
-            score = 0
-
-        # puts it in the stat leaderboard
-        cursor.execute("""
-            INSERT INTO leaderboard_guess_stats (
-                user_id,
-                pokemon_id,
-                is_correct,
-                score
-            )
-            VALUES (%s, %s, %s, %s);
-        """, (user_id, pokemon_id, is_correct, score))
-
-        db.commit()
-
-        # puts it in general leaderboard
-        if mode_id:
-            insert_general = """
-                INSERT INTO leaderboard_general (
-                    user_id, mode_id, score, correct, incorrect
-                )
-                VALUES (%s, %s, %s, %s, %s);
-            """
+        # asks again until the answer is one the game can check
+        while True:
+            try:
+                result = engine.submit(input(question["ask"]))
+                break
+            except InvalidAnswer as e:
+                print(e)
 
-            cursor.execute(insert_general, (
-                user_id,
-                mode_id,
-                score,
-                1 if is_correct else 0,
-                0 if is_correct else 1
-            ))
-            db.commit()
+        print("\n" + result["message"])
+        print("\nScore this round:", result["score"])
 
-        print("\nScore this round:", score)
+        # the next bank question gets read from the database while they look at the result
+        if engine.bank is not None:
+            refill = threading.Thread(target=engine.fill, name='quiz-refill', daemon=True)
+            refill.start()
 
-        # game loop
+        # play again loop
         again = input("\nPlay again? (y/n): ").strip().lower()
         if again not in ("y", "yes"):
-            print("\nExiting stat guessing game!")
-            break
-
-# the species guessing game
-def guess_species_game(user_id, cursor, db):
-    print("\n=== Guess the Pokémon from Species ===")
-
-    cursor.execute("""
-        SELECT mode_id
-        FROM game_modes
-        WHERE mode_name = 'guess_species';
-    """)
-    mode_row = cursor.fetchone()
-    mode_id = mode_row["mode_id"] if mode_row else None
-
-    # starts loop
-    while True:
-        # gets a random Pokémon and its species
-        query = """
-            SELECT 
-                p.pokemon_id,
-                p.name,
-                p.species
-            FROM pokemon p
-            WHERE p.species IS NOT NULL AND p.species <> ''
-            ORDER BY RAND()
-            LIMIT 1;
-        """
-        cursor.execute(query)
-        row = cursor.fetchone()
-
-        if not row:
-            print("No valid Pokémon species found in database.")
+            print(f"\nExiting {engine.label} guessing game!")
+            try:
+                result_writer.flush()
+            except db_errors() as e:
+                # they stay queued, the writer keeps trying in the background
+                print(f"Could not save your rounds yet: {e}")
             break
 
-        given_species = row["species"]
-        correct_pokemon_id = row["pokemon_id"]
-
-        # Get all valid pokemon for this species (for checking)
-        query_valid = """
-            SELECT pokemon_id, name
-            FROM pokemon
-            WHERE LOWER(species) = LOWER(%s);
-        """
-        cursor.execute(query_valid, (given_species,))
-        valid_pokemon = cursor.fetchall()
-        valid_ids = {p["pokemon_id"] for p in valid_pokemon}
-        valid_names = {p["name"].lower() for p in valid_pokemon}
-
-        # displays species to player
-        print(f"\nSpecies: {given_species}")
-        print("Name any Pokémon that belongs to this species.")
-
-        # player guess
-        guess = input("\nYour guess (Pokémon name): ").strip()
-
-        # check if guess matches any valid pokemon for this species
-        is_correct = (guess.lower() in valid_names)
-
-        # Get the guessed pokemon_id for recording
-        guessed_pokemon_id = None
-        if is_correct:
-            for p in valid_pokemon:
-                if p["name"].lower() == guess.lower():
-                    guessed_pokemon_id = p["pokemon_id"]
-                    break
-        else:
-            # Try to find the pokemon they guessed (even if wrong)
-            cursor.execute("SELECT pokemon_id FROM pokemon WHERE LOWER(name) = LOWER(%s) LIMIT 1;", (guess,))
-            wrong_row = cursor.fetchone()
-            if wrong_row:
-                guessed_pokemon_id = wrong_row["pokemon_id"]
-            else:
-                guessed_pokemon_id = correct_pokemon_id  # fallback
+# the guess weight game
+def guess_weight_game(user_id):
+    play_quiz('guess_weight', user_id)
 
-        # scores
-        if is_correct:
-            print(f"\nCorrect! {guess.title()} belongs to the species '{given_species}'!")
-            score = 200
-        else:
-            # show one correct answer
-            correct_name = valid_pokemon[0]["name"]
-            print(f"\nWrong! A correct answer is: {correct_name} (species: {given_species})")
-            score = 0
+# the stat guessing game
+def guess_stats_game(user_id):
+    play_quiz('guess_stats', user_id)
 
-        # puts it in the species leaderboard
-        cursor.execute("""
-            INSERT INTO leaderboard_guess_species (
-                user_id,
-                given_species,
-                guessed_pokemon_id,
-                is_correct,
-                score
-            )
-            VALUES (%s, %s, %s, %s, %s);
-        """, (user_id, given_species, guessed_pokemon_id, is_correct, score))
-
-        db.commit()
-
-        # puts it in general leaderboard
-        if mode_id:
-            insert_general = """
-                INSERT INTO leaderboard_general (
-                    user_id, mode_id, score, correct, incorrect
-                )
-                VALUES (%s, %s, %s, %s, %s);
-            """
-            cursor.execute(insert_general, (
-                user_id,
-                mode_id,
-                score,
-                1 if is_correct else 0,
-                0 if is_correct else 1
-            ))
-            db.commit()
-
-        print("\nScore this round:", score)
-
-        # game loop
-        again = input("\nPlay again? (y/n): ").strip().lower()
-        if again not in ("y", "yes"):
-            print("\nExiting species guessing game!")
-            break
+# the species guessing game
+def guess_species_game(user_id):
+    play_quiz('guess_species', user_id)
 
 # the egg group guessing game
-def guess_egg_group_game(user_id, cursor, db):
-    print("\n=== Guess if Pokémon Share an Egg Group ===")
-
-    # Load mode_id from game_modes table
-    cursor.execute("""
-        SELECT mode_id
-        FROM game_modes
-        WHERE mode_name = 'guess_egg_group';
-    """)
-    mode_row = cursor.fetchone()
-    mode_id = mode_row["mode_id"] if mode_row else None
-
-    # starts loop
-    while True:
-        # gets two random Pokémon with egg group data
-        query = """
-            SELECT 
-                p.pokemon_id,
-                p.name,
-                peg.egg_group1_id,
-                peg.egg_group2_id
-            FROM pokemon p
-            JOIN pokemon_egg_groups peg ON p.pokemon_id = peg.pokemon_id
-            ORDER BY RAND()
-            LIMIT 2;
-        """
-        cursor.execute(query)
-        rows = cursor.fetchall()
-
-        if len(rows) < 2:
-            print("Not enough Pokémon with egg group data found.")
-            break
-
-        p1 = rows[0]
-        p2 = rows[1]
-
-        # Get egg group sets for both pokemon
-        p1_groups = {p1["egg_group1_id"]}
-        if p1["egg_group2_id"]:
-            p1_groups.add(p1["egg_group2_id"])
-
-        p2_groups = {p2["egg_group1_id"]}
-        if p2["egg_group2_id"]:
-            p2_groups.add(p2["egg_group2_id"])
-
-        # Check if they share any egg group
-        share_egg_group = bool(p1_groups & p2_groups)
-
-        # Display to player
-        print(f"\nPokémon 1: {p1['name']}")
-        print(f"Pokémon 2: {p2['name']}")
-        print("\nDo these two Pokémon share at least one egg group?")
-
-        # Player guess
-        while True:
-            guess = input("Your answer (yes/no): ").strip().lower()
-            if guess in ("yes", "y", "no", "n"):
-                break
-            print("Please enter 'yes' or 'no'.")
-
-        user_answer = (guess in ("yes", "y"))
-        is_correct = (user_answer == share_egg_group)
-
-        # scores
-        if is_correct:
-            print(f"\nCorrect! They {'share' if share_egg_group else 'do not share'} an egg group.")
-            score = 100
-        else:
-            print(f"\nWrong! They {'share' if share_egg_group else 'do not share'} an egg group.")
-            score = 0
-
-        # puts it in the egg group leaderboard
-        cursor.execute("""
-            INSERT INTO leaderboard_guess_egg_group (
-                user_id,
-                pokemon1_id,
-                pokemon2_id,
-                share_egg_group,
-                user_answer,
-                is_correct,
-                score
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s);
-        """, (user_id, p1["pokemon_id"], p2["pokemon_id"], share_egg_group, user_answer, is_correct, score))
-
-        db.commit()
-
-        # puts it in general leaderboard
-        if mode_id:
-            insert_general = """
-                INSERT INTO leaderboard_general (
-                    user_id, mode_id, score, correct, incorrect
-                )
-                VALUES (%s, %s, %s, %s, %s);
-            """
-            cursor.execute(insert_general, (
-                user_id,
-                mode_id,
-                score,
-                1 if is_correct else 0,
-                0 if is_correct else 1
-            ))
-            db.commit()
-
-        print("\nScore this round:", score)
-
-        # game loop
-        again = input("\nPlay again? (y/n): ").strip().lower()
-        if again not in ("y", "yes"):
-            print("\nExiting egg group guessing game!")
-            break
+def guess_egg_group_game(user_id):
+    play_quiz('guess_egg_group', user_id)
 
 # the dex number guessing game
-def guess_dexnum_game(user_id, cursor, db):
-    print("\n=== Guess the Pokémon from Dex Number ===")
-
-    # Load mode_id from game_modes table
-    cursor.execute("""
-        SELECT mode_id
-        FROM game_modes
-        WHERE mode_name = 'guess_dexnum';
-    """)
-    mode_row = cursor.fetchone()
-    mode_id = mode_row["mode_id"] if mode_row else None
-
-    # starts loop
-    while True:
-        # gets a random Pokémon with its dex number
-        query = """
-            SELECT 
-                p.pokemon_id,
-                p.name
-            FROM pokemon p
-            WHERE p.pokemon_id IS NOT NULL
-            ORDER BY RAND()
-            LIMIT 1;
-        """
-        cursor.execute(query)
-        row = cursor.fetchone()
-
-        if not row:
-            print("No valid Pokémon with dex numbers found in database.")
-            break
+def guess_dexnum_game(user_id):
+    play_quiz('guess_dexnum', user_id)
 
-        dex_number = row["pokemon_id"]
-        correct_pokemon_id = row["pokemon_id"]
-        correct_pokemon_name = row["name"]
+# the ability guessing game
+def guess_ability_game(user_id):
+    play_quiz('guess_ability', user_id)
 
-        # displays dex number to player
-        print(f"\nDex Number: #{dex_number}")
-        print("Name the Pokémon that has this dex number.")
+# the type guessing game
+def guess_type_game(user_id):
+    play_quiz('guess_type', user_id)
 
-        # player guess
-        guess = input("\nYour guess (Pokémon name): ").strip()
+# --------------------------------------------------------------------
+# LEADERBOARD FUNCTIONS
+# --------------------------------------------------------------------
 
-        # check if guess matches the correct pokemon
-        is_correct = (guess.lower() == correct_pokemon_name.lower())
+# shows where the player ranks overall and in every mode they played,
+# plus the five players above and below them overall
+def my_standing(user_id):
+    # flush first so the rounds they just played count
+    try:
+        result_writer.flush()
+    except db_errors():
+        # still queued, the standing just won't have them yet
+        pass
 
-        # Get the guessed pokemon_id for recording
-        guessed_pokemon_id = None
-        if is_correct:
-            guessed_pokemon_id = correct_pokemon_id
-        else:
-            # Try to find the pokemon they guessed (even if wrong)
-            cursor.execute("SELECT pokemon_id FROM pokemon WHERE LOWER(name) = LOWER(%s) LIMIT 1;", (guess,))
-            wrong_row = cursor.fetchone()
-            if wrong_row:
-                guessed_pokemon_id = wrong_row["pokemon_id"]
-            else:
-                guessed_pokemon_id = correct_pokemon_id  # fallback
+    overall = scoreboard.standing(user_id)
+    if not overall:
+        return None
 
-        # scores
-        if is_correct:
-            print(f"\nCorrect! #{dex_number} is {correct_pokemon_name}!")
-            score = 300
-        else:
-            print(f"\nWrong! #{dex_number} is {correct_pokemon_name}.")
-            score = 0
+    modes = []
+    for mode in pokedex.modes:
+        standing = scoreboard.standing(user_id, mode["mode_id"], spread=0)
+        if standing:
+            modes.append((mode["mode_name"], standing))
+
+    # usernames for the players around them, all primary key lookups
+    ids = [r["user_id"] for r in overall['around']]
+    with db_pool.cursor() as cursor:
+        cursor.execute(
+            f"SELECT user_id, username FROM users WHERE user_id IN ({', '.join(['%s'] * len(ids))});",
+            tuple(ids)
+        )
+        usernames = {r["user_id"]: r["username"] for r in cursor.fetchall()}
+    around = [dict(r, username=usernames.get(r["user_id"], r["user_id"])) for r in overall['around']]
+
+    return {'overall': overall, 'modes': modes, 'around': around}
+
+def view_my_ranking(user_id):
+    standing = my_standing(user_id)
+    if not standing:
+        print("You haven't played any rounds yet!")
+        return
 
-        # puts it in the dex number leaderboard
-        cursor.execute("""
-            INSERT INTO leaderboard_guess_dexnum (
-                user_id,
-                shown_dex,
-                user_choice_id,
-                correct_pokemon_id,
-                is_correct,
-                score
-            )
-            VALUES (%s, %s, %s, %s, %s, %s);
-        """, (user_id, dex_number, guessed_pokemon_id, correct_pokemon_id, is_correct, score))
-
-        db.commit()
-
-        # puts it in general leaderboard
-        if mode_id:
-            insert_general = """
-                INSERT INTO leaderboard_general (
-                    user_id, mode_id, score, correct, incorrect
-                )
-                VALUES (%s, %s, %s, %s, %s);
-            """
-            cursor.execute(insert_general, (
-                user_id,
-                mode_id,
-                score,
-                1 if is_correct else 0,
-                0 if is_correct else 1
-            ))
-            db.commit()
-
-        print("\nScore this round:", score)
-
-        # game loop
-        again = input("\nPlay again? (y/n): ").strip().lower()
-        if again not in ("y", "yes"):
-            print("\nExiting dex number guessing game!")
-            break
+    overall = standing['overall']
+    table = [["Overall", f"#{overall['rank']} of {overall['players']}", f"{overall['percentile']:.1f}%"]]
+    for mode_name, s in standing['modes']:
+        table.append([mode_name, f"#{s['rank']} of {s['players']}", f"{s['percentile']:.1f}%"])
+    print(tabulate(table, headers=["Board", "Rank", "Ahead of"], tablefmt="grid"))
 
-# the ability guessing game
-def guess_ability_game(user_id, cursor, db):
-    print("\n=== Guess a Pokémon with the Given Ability ===")
-
-    cursor.execute("""
-        SELECT mode_id
-        FROM game_modes
-        WHERE mode_name = 'guess_ability';
-    """)
-    mode_row = cursor.fetchone()
-    mode_id = mode_row["mode_id"] if mode_row else None
-
-    # starts loop
-    while True:
-        # gets a random Pokémon and one of its abilities
-        query = """
-            SELECT 
-                p.pokemon_id,
-                pa.ability1_id,
-                pa.ability2_id,
-                pa.hidden_ability_id,
-                a1.ability_name,
-                a2.ability_name AS ability2_name,
-                ah.ability_name AS hidden_ability_name
-            FROM pokemon p
-            JOIN pokemon_abilities pa ON p.pokemon_id = pa.pokemon_id
-            JOIN abilities a1 ON pa.ability1_id = a1.ability_id
-            LEFT JOIN abilities a2 ON pa.ability2_id = a2.ability_id
-            LEFT JOIN abilities ah ON pa.hidden_ability_id = ah.ability_id
-            ORDER BY RAND()
-            LIMIT 1;
-        """
-        cursor.execute(query)
-        row = cursor.fetchone()
+    print("\nPlayers around you:")
+    table = [[
+        r["rank"],
+        str(r["username"]) + (" <- you" if r["user_id"] == user_id else ""),
+        r["total_games"],
+        r["total_score"]
+    ] for r in standing['around']]
+    print(tabulate(table, headers=["RANK", "USERNAME", "TOTAL GAMES", "TOTAL SCORE"], tablefmt="grid"))
+
+# asks for a date like 2024-05-01, returns None if it isn't one
+def input_date(prompt):
+    text = input(prompt).strip()
+    try:
+        return datetime.strptime(text, "%Y-%m-%d").date()
+    except ValueError:
+        print(f"'{text}' is not a date, use YYYY-MM-DD.")
+        return None
 
-        if not row:
-            print("No valid Pokémon with abilities found in database.")
-            break
+# today / this week / this month / custom range leaderboard, for every mode or just one
+# these come from the day/week/month rollups, not from the raw rounds
+def view_window_leaderboard():
+    today = datetime.now().date()
+    print("\n===== TIME WINDOW =====")
+    print("1.] Today")
+    print("2.] This Week")
+    print("3.] This Month")
+    print("4.] Custom Range")
+    choice = input("Option: ").strip()
+    if choice == "1":
+        first, last, title = today, today, "TODAY"
+    elif choice == "2":
+        first = today - timedelta(days=today.weekday())
+        last, title = first + timedelta(days=6), "THIS WEEK"
+    elif choice == "3":
+        first = today.replace(day=1)
+        last, title = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1), "THIS MONTH"
+    elif choice == "4":
+        first = input_date("From (YYYY-MM-DD): ")
+        last = input_date("To (YYYY-MM-DD): ") if first else None
+        if not first or not last:
+            return
+        if last < first:
+            first, last = last, first
+        title = f"{first} TO {last}"
+    else:
+        print("Invalid option.")
+        return
 
-        # pick a random ability from the pokemon's available abilities
-        abilities_available = []
-        if row["ability1_id"]:
-            abilities_available.append(("ability1", row["ability1_id"], row["ability_name"]))
-        if row["ability2_id"]:
-            abilities_available.append(("ability2", row["ability2_id"], row["ability2_name"]))
-        if row["hidden_ability_id"]:
-            abilities_available.append(("hidden", row["hidden_ability_id"], row["hidden_ability_name"]))
-
-        chosen = random.choice(abilities_available)
-        chosen_ability_id = chosen[1]
-        chosen_ability_name = chosen[2]
-
-        # Get all pokemon with this ability
-        query_valid = """
-            SELECT DISTINCT p.pokemon_id, p.name
-            FROM pokemon p
-            JOIN pokemon_abilities pa ON p.pokemon_id = pa.pokemon_id
-            WHERE pa.ability1_id = %s OR pa.ability2_id = %s OR pa.hidden_ability_id = %s;
-        """
-        cursor.execute(query_valid, (chosen_ability_id, chosen_ability_id, chosen_ability_id))
-        valid_pokemon = cursor.fetchall()
-        valid_names = {p["name"].lower() for p in valid_pokemon}
-        correct_pokemon_id = row["pokemon_id"]
-
-        # displays ability to player
-        print(f"\nAbility: {chosen_ability_name}")
-        print("Name any Pokémon that has this ability.")
-
-        # player guess
-        guess = input("\nYour guess (Pokémon name): ").strip()
-
-        # check if guess matches any valid pokemon with this ability
-        is_correct = (guess.lower() in valid_names)
-
-        # Get the guessed pokemon_id for recording
-        guessed_pokemon_id = None
-        if is_correct:
-            for p in valid_pokemon:
-                if p["name"].lower() == guess.lower():
-                    guessed_pokemon_id = p["pokemon_id"]
-                    break
-        else:
-            # Try to find the pokemon they guessed (even if wrong)
-            cursor.execute("SELECT pokemon_id FROM pokemon WHERE LOWER(name) = LOWER(%s) LIMIT 1;", (guess,))
-            wrong_row = cursor.fetchone()
-            if wrong_row:
-                guessed_pokemon_id = wrong_row["pokemon_id"]
-            else:
-                guessed_pokemon_id = correct_pokemon_id  # fallback
+    print("\n0.] All Modes")
+    for i, m in enumerate(pokedex.modes, 1):
+        print(f"{i}.] {m['mode_name']}")
+    mode_choice = input("Mode: ").strip()
+    if not mode_choice.isdigit() or int(mode_choice) > len(pokedex.modes):
+        print("Invalid option.")
+        return
+    mode = pokedex.modes[int(mode_choice) - 1] if int(mode_choice) else None
+    rows = window_rows(first, last, mode["mode_id"] if mode else None)
 
-        # scores
-        if is_correct:
-            print(f"\nCorrect! {guess.title()} has the ability '{chosen_ability_name}'!")
-            score = 250
-        else:
-            # show one correct answer
-            correct_name = valid_pokemon[0]["name"]
-            print(f"\nWrong! A correct answer is: {correct_name} (ability: {chosen_ability_name})")
-            score = 0
+    print(f"\n===== {title} - {mode['mode_name'].upper() if mode else 'ALL MODES'} =====")
+    if not rows:
+        print("No rounds played in this window yet.")
+        return
 
-        # puts it in the ability leaderboard
-        cursor.execute("""
-            INSERT INTO leaderboard_guess_ability (
-                user_id,
-                ability_id,
-                guessed_pokemon_id,
-                is_correct,
-                score
-            )
-            VALUES (%s, %s, %s, %s, %s);
-        """, (user_id, chosen_ability_id, guessed_pokemon_id, is_correct, score))
-
-        db.commit()
-
-        # puts it in general leaderboard
-        if mode_id:
-            insert_general = """
-                INSERT INTO leaderboard_general (
-                    user_id, mode_id, score, correct, incorrect
-                )
-                VALUES (%s, %s, %s, %s, %s);
-            """
-            cursor.execute(insert_general, (
-                user_id,
-                mode_id,
-                score,
-                1 if is_correct else 0,
-                0 if is_correct else 1
-            ))
-            db.commit()
-
-        print("\nScore this round:", score)
-
-        # game loop
-        again = input("\nPlay again? (y/n): ").strip().lower()
-        if again not in ("y", "yes"):
-            print("\nExiting ability guessing game!")
-            break
+    headers = ["RANK", "USERNAME", "TOTAL GAMES", "TOTAL SCORE"]
+    table = [[
+        i, r.get("username"), r.get("total_games", 0), r.get("total_score", 0)
+    ] for i, r in enumerate(rows, 1)]
+    print(tabulate(table, headers=headers, tablefmt="grid"))
 
-# the type guessing game
-def guess_type_game(user_id, cursor, db):
-    print("\n=== Guess a Pokémon with the Given Type(s) ===")
-
-    cursor.execute("""
-        SELECT mode_id
-        FROM game_modes
-        WHERE mode_name = 'guess_type';
-    """)
-    mode_row = cursor.fetchone()
-    mode_id = mode_row["mode_id"] if mode_row else None
-
-    # loop starts
+# top players between two dates, for one mode or (mode_id None) all of them
+def window_rows(first, last, mode_id=None):
+    def load():
+        with db_pool.cursor() as cursor:
+            return window_leaderboard(cursor, first, last, mode_id)
+    return leaderboard_cache.get('window', load, (first, last, mode_id))
+
+# yields one page of rows at a time and asks for next/prev in between,
+# leaves as soon as everything fits on one page or the player presses enter
+# cache_name puts the pages in the leaderboard cache under that name
+def browse_pages(pages, empty_message, cache_name=None):
+    after = before = None
     while True:
-        query = """
-            SELECT 
-                p.pokemon_id,
-                p.name,
-                pt.slot1_type AS type1_id,
-                pt.slot2_type AS type2_id,
-                t1.type_name AS type1_name,
-                t2.type_name AS type2_name
-            FROM pokemon p
-            JOIN pokemon_types pt ON p.pokemon_id = pt.pokemon_id
-            JOIN types t1 ON pt.slot1_type = t1.type_id
-            LEFT JOIN types t2 ON pt.slot2_type = t2.type_id
-            ORDER BY RAND()
-            LIMIT 1;
-        """
-        cursor.execute(query)
-        row = cursor.fetchone()
-
-        if not row:
-            print("No valid Pokémon with types found in database.")
-            break
+        def load():
+            with db_pool.cursor() as cursor:
+                return pages.page(cursor, after, before)
+        if cache_name:
+            rows, more = leaderboard_cache.get(cache_name, load, ('page', after, before))
+        else:
+            rows, more = load()
 
-        type1_id = row["type1_id"]
-        type2_id = row["type2_id"]
-        type1_name = row["type1_name"]
-        type2_name = row["type2_name"]
+        if not rows:
+            print(empty_message if after is None and before is None else "No more entries.")
+            return
 
-        # We basically need to build the prompt differently based on whether there's a second type
-        # Which is why we have the next two following if statements
-        if type2_id:
-            print(f"\nTypes: {type1_name} / {type2_name}")
-            print("Name any Pokémon that has BOTH of these types.")
-        else:
-            print(f"\nType: {type1_name}")
-            print("Name any Pokémon that has this type.")
-
-        # Fetchs valid Pokémon for the typing
-        if type2_id:
-            cursor.execute("""
-                SELECT p.pokemon_id, p.name
-                FROM pokemon p
-                JOIN pokemon_types pt ON p.pokemon_id = pt.pokemon_id
-                WHERE (pt.slot1_type = %s AND pt.slot2_type = %s)
-                   OR (pt.slot1_type = %s AND pt.slot2_type = %s);
-            """, (type1_id, type2_id, type2_id, type1_id))
-        else:
-            cursor.execute("""
-                SELECT DISTINCT p.pokemon_id, p.name
-                FROM pokemon p
-                JOIN pokemon_types pt ON p.pokemon_id = pt.pokemon_id
-                WHERE pt.slot1_type = %s OR pt.slot2_type = %s;
-            """, (type1_id, type1_id))
-
-        valid_rows = cursor.fetchall()
-        valid_names = {r["name"].lower() for r in valid_rows}
-
-        # player guess
-        guess = input("\nYour guess (Pokémon name): ").strip()
-        is_correct = (guess.lower() in valid_names)
-
-        # Gets the guessed pokemon_id for recording
-        guessed_pokemon_id = None
-        if is_correct:
-            for r in valid_rows:
-                if r["name"].lower() == guess.lower():
-                    guessed_pokemon_id = r["pokemon_id"]
-                    break
-        else:
-            cursor.execute("SELECT pokemon_id FROM pokemon WHERE LOWER(name) = LOWER(%s) LIMIT 1;", (guess,))
-            wrong_row = cursor.fetchone()
-            if wrong_row:
-                guessed_pokemon_id = wrong_row["pokemon_id"]
-            else:
-                # Fallback to a valid example so we never insert NULL incase of bad data
-                # Has to be different than the other quizzes because of dual types
-                guessed_pokemon_id = valid_rows[0]["pokemon_id"] if valid_rows else None
-
-        # Displays and sets the scores
-        if is_correct:
-            print(f"\nCorrect! {guess.title()} matches the required type(s).")
-            score = 300
+        if before is not None:
+            has_next, has_prev = True, more
         else:
-            show_name = valid_rows[0]["name"] if valid_rows else "N/A"
-            print(f"\nWrong! An example answer: {show_name}.")
-            score = 0
+            has_next, has_prev = more, after is not None
 
-        # puts it in the type leaderboard
-        cursor.execute("""
-            INSERT INTO leaderboard_guess_type (
-                user_id,
-                type1_id,
-                type2_id,
-                guessed_pokemon_id,
-                is_correct,
-                score
-            )
-            VALUES (%s, %s, %s, %s, %s, %s);
-        """, (user_id, type1_id, type2_id, guessed_pokemon_id, is_correct, score))
-        db.commit()
-
-        # puts it in general leaderboard
-        if mode_id:
-            cursor.execute("""
-                INSERT INTO leaderboard_general (
-                    user_id, mode_id, score, correct, incorrect
-                )
-                VALUES (%s, %s, %s, %s, %s);
-            """, (
-                user_id,
-                mode_id,
-                score,
-                1 if is_correct else 0,
-                0 if is_correct else 1
-            ))
-            db.commit()
-
-        print("\nScore this round:", score)
-
-        # game loop
-        again = input("\nPlay again? (y/n): ").strip().lower()
-        if again not in ("y", "yes"):
-            print("\nExiting type guessing game!")
-            break
+        yield rows
 
-# --------------------------------------------------------------------
-# LEADERBOARD FUNCTIONS
-# --------------------------------------------------------------------
+        if not has_next and not has_prev:
+            return
+        options = (["[n]ext"] if has_next else []) + (["[p]rev"] if has_prev else [])
+        choice = input(f"\n{' / '.join(options)} page, or Enter to go back: ").strip().lower()
+        if has_next and choice.startswith("n"):
+            after, before = pages.key(rows[-1]), None
+        elif has_prev and choice.startswith("p"):
+            after, before = None, pages.key(rows[0])
+        else:
+            return
 
-# All follow this function layout so I am only commenting the first one
-# They are all different leaderboards for each game mode plus the general one
-# With the last one showing the favorite pokemon leaderboard
-def view_general_leaderboard():
-    # gets the users with the highest total scores, only shows top 10
+# runs a leaderboard query through the cache, only one query per change no matter how many people look
+def cached_leaderboard(name, query, params=()):
+    def load():
+        with db_pool.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+    return leaderboard_cache.get(name, load, tuple(params))
+
+# gets the users with the highest total scores, only the top 10
+# reads the running totals so it doesn't have to add up every round ever played
+def general_leaderboard():
     query = """
         SELECT
             u.user_id,
             u.username,
-            COUNT(lg.entry_id) AS total_games,
-            COALESCE(SUM(lg.score), 0) AS total_score
-        FROM leaderboard_general lg
-        JOIN users u ON lg.user_id = u.user_id
-        GROUP BY u.user_id, u.username
-        ORDER BY total_score DESC, total_games DESC
+            lt.total_games,
+            lt.total_score
+        FROM leaderboard_totals lt
+        JOIN users u ON lt.user_id = u.user_id
+        ORDER BY lt.total_score DESC, lt.total_games DESC
         LIMIT 10;
     """
+    return cached_leaderboard('general', query)
 
-    cursor.execute(query)
-    rows = cursor.fetchall()
+# All follow this function layout so I am only commenting the first one
+# They are all different leaderboards for each game mode plus the general one
+# With the last one showing the favorite pokemon leaderboard
+def view_general_leaderboard():
+    rows = general_leaderboard()
 
     # incase there are no entries yet
     if not rows:
@@ -1319,27 +776,23 @@ def view_guess_weight_leaderboard():
         JOIN pokemon p2 ON lw.pokemon2_id = p2.pokemon_id
         JOIN pokemon pc ON lw.user_choice_id = pc.pokemon_id
         JOIN pokemon pc2 ON lw.correct_pokemon_id = pc2.pokemon_id
-        ORDER BY lw.score DESC, lw.created_at DESC
-        LIMIT 10;
     """
 
-    cursor.execute(query)
-    rows = cursor.fetchall()
-
-    if not rows:
-        print("No Guess-Weight entries recorded.")
-        return
+    # highest score first, newest first among equal scores, a page at a time
+    # (the boards below page the same way, apart from stats)
+    pages = Keyset(query, [("lw.score", "score"), ("lw.created_at", "created_at"), ("lw.weight_id", "weight_id")])
 
-    headers = ["Entry ID", "Player", "Pokémon 1", "Pokémon 2",
-               "Your Choice", "Correct Pokémon", "Correct?", "Score", "Date"]
+    for rows in browse_pages(pages, "No Guess-Weight entries recorded.", cache_name='guess_weight'):
+        headers = ["Entry ID", "Player", "Pokémon 1", "Pokémon 2",
+                   "Your Choice", "Correct Pokémon", "Correct?", "Score", "Date"]
 
-    table = [[
-        r["weight_id"], r["user"], r["pokemon1"], r["pokemon2"],
-        r["user_choice"], r["correct_choice"], "Yes" if r["is_correct"] else "No",
-        r["score"], r["created_at"]
-    ] for r in rows]
+        table = [[
+            r["weight_id"], r["user"], r["pokemon1"], r["pokemon2"],
+            r["user_choice"], r["correct_choice"], "Yes" if r["is_correct"] else "No",
+            r["score"], r["created_at"]
+        ] for r in rows]
 
-    print(tabulate(table, headers=headers, tablefmt="grid"))
+        print(tabulate(table, headers=headers, tablefmt="grid"))
 
 def view_guess_stats_leaderboard():
     query = """
@@ -1353,24 +806,19 @@ def view_guess_stats_leaderboard():
         FROM leaderboard_guess_stats ls
         JOIN user_profiles up ON ls.user_id = up.user_id
         JOIN pokemon p ON ls.pokemon_id = p.pokemon_id
-        ORDER BY ls.created_at DESC
-        LIMIT 10;
     """
 
-    cursor.execute(query)
-    rows = cursor.fetchall()
+    # this one is just newest first, score doesn't come into it
+    pages = Keyset(query, [("ls.created_at", "created_at"), ("ls.stats_id", "stats_id")])
 
-    if not rows:
-        print("No Guess-Stats entries recorded.")
-        return
-
-    headers = ["Entry ID", "Player", "Pokémon", "Correct?", "Score", "Date"]
-    table = [[
-        r["stats_id"], r["user"], r["pokemon"],
-        "Yes" if r["is_correct"] else "No", r.get("score", 0), r["created_at"]
-    ] for r in rows]
+    for rows in browse_pages(pages, "No Guess-Stats entries recorded.", cache_name='guess_stats'):
+        headers = ["Entry ID", "Player", "Pokémon", "Correct?", "Score", "Date"]
+        table = [[
+            r["stats_id"], r["user"], r["pokemon"],
+            "Yes" if r["is_correct"] else "No", r.get("score", 0), r["created_at"]
+        ] for r in rows]
 
-    print(tabulate(table, headers=headers, tablefmt="grid"))
+        print(tabulate(table, headers=headers, tablefmt="grid"))
 
 def view_guess_species_leaderboard():
     query = """
@@ -1385,24 +833,18 @@ def view_guess_species_leaderboard():
         FROM leaderboard_guess_species lgs
         JOIN user_profiles up ON lgs.user_id = up.user_id
         JOIN pokemon p ON lgs.guessed_pokemon_id = p.pokemon_id
-        ORDER BY lgs.score DESC, lgs.created_at DESC
-        LIMIT 10;
     """
 
-    cursor.execute(query)
-    rows = cursor.fetchall()
+    pages = Keyset(query, [("lgs.score", "score"), ("lgs.created_at", "created_at"), ("lgs.species_guess_id", "species_guess_id")])
 
-    if not rows:
-        print("No Guess-Species entries recorded.")
-        return
+    for rows in browse_pages(pages, "No Guess-Species entries recorded.", cache_name='guess_species'):
+        headers = ["Entry ID", "Player", "Species", "Guessed Pokémon", "Correct?", "Score", "Date"]
+        table = [[
+            r["species_guess_id"], r["user"], r["given_species"], r["guessed_pokemon"],
+            "Yes" if r["is_correct"] else "No", r.get("score", 0), r["created_at"]
+        ] for r in rows]
 
-    headers = ["Entry ID", "Player", "Species", "Guessed Pokémon", "Correct?", "Score", "Date"]
-    table = [[
-        r["species_guess_id"], r["user"], r["given_species"], r["guessed_pokemon"],
-        "Yes" if r["is_correct"] else "No", r.get("score", 0), r["created_at"]
-    ] for r in rows]
-
-    print(tabulate(table, headers=headers, tablefmt="grid"))
+        print(tabulate(table, headers=headers, tablefmt="grid"))
 
 def view_guess_egg_group_leaderboard():
     query = """
@@ -1420,27 +862,21 @@ def view_guess_egg_group_leaderboard():
         JOIN user_profiles up ON leg.user_id = up.user_id
         JOIN pokemon p1 ON leg.pokemon1_id = p1.pokemon_id
         JOIN pokemon p2 ON leg.pokemon2_id = p2.pokemon_id
-        ORDER BY leg.score DESC, leg.created_at DESC
-        LIMIT 10;
     """
 
-    cursor.execute(query)
-    rows = cursor.fetchall()
+    pages = Keyset(query, [("leg.score", "score"), ("leg.created_at", "created_at"), ("leg.egg_guess_id", "egg_guess_id")])
 
-    if not rows:
-        print("No Guess-Egg-Group entries recorded.")
-        return
-
-    headers = ["Entry ID", "Player", "Pokémon 1", "Pokémon 2", "Share Group?", "User Answer", "Correct?", "Score", "Date"]
-    table = [[
-        r["egg_guess_id"], r["user"], r["pokemon1"], r["pokemon2"],
-        "Yes" if r["actual_share"] else "No",
-        "Yes" if r["user_answer"] else "No",
-        "Yes" if r["is_correct"] else "No",
-        r.get("score", 0), r["created_at"]
-    ] for r in rows]
+    for rows in browse_pages(pages, "No Guess-Egg-Group entries recorded.", cache_name='guess_egg_group'):
+        headers = ["Entry ID", "Player", "Pokémon 1", "Pokémon 2", "Share Group?", "User Answer", "Correct?", "Score", "Date"]
+        table = [[
+            r["egg_guess_id"], r["user"], r["pokemon1"], r["pokemon2"],
+            "Yes" if r["actual_share"] else "No",
+            "Yes" if r["user_answer"] else "No",
+            "Yes" if r["is_correct"] else "No",
+            r.get("score", 0), r["created_at"]
+        ] for r in rows]
 
-    print(tabulate(table, headers=headers, tablefmt="grid"))
+        print(tabulate(table, headers=headers, tablefmt="grid"))
 
 def view_guess_dexnum_leaderboard():
     query = """
@@ -1457,24 +893,18 @@ def view_guess_dexnum_leaderboard():
         JOIN user_profiles up ON lgd.user_id = up.user_id
         JOIN pokemon pu ON lgd.user_choice_id = pu.pokemon_id
         JOIN pokemon pc ON lgd.correct_pokemon_id = pc.pokemon_id
-        ORDER BY lgd.score DESC, lgd.created_at DESC
-        LIMIT 10;
     """
 
-    cursor.execute(query)
-    rows = cursor.fetchall()
-
-    if not rows:
-        print("No Guess-Dex-Number entries recorded.")
-        return
+    pages = Keyset(query, [("lgd.score", "score"), ("lgd.created_at", "created_at"), ("lgd.guess_id", "guess_id")])
 
-    headers = ["Entry ID", "Player", "Dex #", "User Choice", "Correct Pokémon", "Correct?", "Score", "Date"]
-    table = [[
-        r["guess_id"], r["user"], r["shown_dex"], r["user_choice"], r["correct_pokemon"],
-        "Yes" if r["is_correct"] else "No", r.get("score", 0), r["created_at"]
-    ] for r in rows]
+    for rows in browse_pages(pages, "No Guess-Dex-Number entries recorded.", cache_name='guess_dexnum'):
+        headers = ["Entry ID", "Player", "Dex #", "User Choice", "Correct Pokémon", "Correct?", "Score", "Date"]
+        table = [[
+            r["guess_id"], r["user"], r["shown_dex"], r["user_choice"], r["correct_pokemon"],
+            "Yes" if r["is_correct"] else "No", r.get("score", 0), r["created_at"]
+        ] for r in rows]
 
-    print(tabulate(table, headers=headers, tablefmt="grid"))
+        print(tabulate(table, headers=headers, tablefmt="grid"))
 
 def view_guess_ability_leaderboard():
     query = """
@@ -1490,24 +920,18 @@ def view_guess_ability_leaderboard():
         JOIN user_profiles up ON lga.user_id = up.user_id
         JOIN abilities a ON lga.ability_id = a.ability_id
         JOIN pokemon p ON lga.guessed_pokemon_id = p.pokemon_id
-        ORDER BY lga.score DESC, lga.created_at DESC
-        LIMIT 10;
     """
 
-    cursor.execute(query)
-    rows = cursor.fetchall()
-
-    if not rows:
-        print("No Guess-Ability entries recorded.")
-        return
+    pages = Keyset(query, [("lga.score", "score"), ("lga.created_at", "created_at"), ("lga.ability_guess_id", "ability_guess_id")])
 
-    headers = ["Entry ID", "Player", "Ability", "Guessed Pokémon", "Correct?", "Score", "Date"]
-    table = [[
-        r["ability_guess_id"], r["user"], r["ability"], r["guessed_pokemon"],
-        "Yes" if r["is_correct"] else "No", r.get("score", 0), r["created_at"]
-    ] for r in rows]
+    for rows in browse_pages(pages, "No Guess-Ability entries recorded.", cache_name='guess_ability'):
+        headers = ["Entry ID", "Player", "Ability", "Guessed Pokémon", "Correct?", "Score", "Date"]
+        table = [[
+            r["ability_guess_id"], r["user"], r["ability"], r["guessed_pokemon"],
+            "Yes" if r["is_correct"] else "No", r.get("score", 0), r["created_at"]
+        ] for r in rows]
 
-    print(tabulate(table, headers=headers, tablefmt="grid"))
+        print(tabulate(table, headers=headers, tablefmt="grid"))
 
 def view_guess_type_leaderboard():
     query = """
@@ -1525,46 +949,41 @@ def view_guess_type_leaderboard():
         JOIN types t1 ON lgt.type1_id = t1.type_id
         LEFT JOIN types t2 ON lgt.type2_id = t2.type_id
         JOIN pokemon p ON lgt.guessed_pokemon_id = p.pokemon_id
-        ORDER BY lgt.score DESC, lgt.created_at DESC
-        LIMIT 10;
     """
 
-    cursor.execute(query)
-    rows = cursor.fetchall()
+    pages = Keyset(query, [("lgt.score", "score"), ("lgt.created_at", "created_at"), ("lgt.type_guess_id", "type_guess_id")])
 
-    if not rows:
-        print("No Guess-Type entries recorded.")
-        return
-
-    headers = ["Entry ID", "Player", "Type 1", "Type 2", "Guessed Pokémon", "Correct?", "Score", "Date"]
-    table = [[
-        r["type_guess_id"], 
-        r["user"], 
-        r["type1"], 
-        r.get("type2") or "N/A",
-        r["guessed_pokemon"],
-        "Yes" if r["is_correct"] else "No", 
-        r.get("score", 0), 
-        r["created_at"]
-    ] for r in rows]
+    for rows in browse_pages(pages, "No Guess-Type entries recorded.", cache_name='guess_type'):
+        headers = ["Entry ID", "Player", "Type 1", "Type 2", "Guessed Pokémon", "Correct?", "Score", "Date"]
+        table = [[
+            r["type_guess_id"], 
+            r["user"], 
+            r["type1"], 
+            r.get("type2") or "N/A",
+            r["guessed_pokemon"],
+            "Yes" if r["is_correct"] else "No", 
+            r.get("score", 0), 
+            r["created_at"]
+        ] for r in rows]
 
-    print(tabulate(table, headers=headers, tablefmt="grid"))
+        print(tabulate(table, headers=headers, tablefmt="grid"))
 
 def view_favorite_pokemon_leaderboard():
+    # set_favorite_pokemon keeps pokemon_favorites_count up to date,
+    # so read the counter instead of counting every favorite again
     query = """
         SELECT
             p.pokemon_id,
             p.name,
-            COUNT(ufp.user_id) AS favorite_count
-        FROM user_favorite_pokemon ufp
-        JOIN pokemon p ON ufp.pokemon_id = p.pokemon_id
-        GROUP BY p.pokemon_id, p.name
-        ORDER BY favorite_count DESC
+            pfc.favorite_count
+        FROM pokemon_favorites_count pfc
+        JOIN pokemon p ON pfc.pokemon_id = p.pokemon_id
+        WHERE pfc.favorite_count > 0
+        ORDER BY pfc.favorite_count DESC
         LIMIT 10;
     """
 
-    cursor.execute(query)
-    rows = cursor.fetchall()
+    rows = cached_leaderboard('favorites', query)
 
     if not rows:
         print("No favorite Pokémon data available.")
@@ -1624,19 +1043,19 @@ def run_quiz_menu():
             continue
 
         if choice == "2":
-            guess_stats_game(current_user['user_id'], cursor, conn)
+            guess_stats_game(current_user['user_id'])
         elif choice == "3":
-            guess_weight_game(current_user['user_id'], cursor, conn)
+            guess_weight_game(current_user['user_id'])
         elif choice == "4":
-            guess_species_game(current_user['user_id'], cursor, conn)
+            guess_species_game(current_user['user_id'])
         elif choice == "5":
-            guess_egg_group_game(current_user['user_id'], cursor, conn)
+            guess_egg_group_game(current_user['user_id'])
         elif choice == "6":
-            guess_dexnum_game(current_user['user_id'], cursor, conn)
+            guess_dexnum_game(current_user['user_id'])
         elif choice == "7":
-            guess_ability_game(current_user['user_id'], cursor, conn)
+            guess_ability_game(current_user['user_id'])
         elif choice == "8":
-            guess_type_game(current_user['user_id'], cursor, conn)
+            guess_type_game(current_user['user_id'])
         else:
             print("Invalid option.")
 
@@ -1651,9 +1070,11 @@ def leaderboards_menu():
         print("5.] View Guess Egg Group Leaderboard")
         print("6.] View Guess Dex Number Leaderboard")
         print("7.] View Guess Ability Leaderboard")
-        print("8.] Back")
+        print("8.] My Ranking")
+        print("9.] Daily / Weekly / Monthly Leaderboards")
+        print("10.] Back")
         choice = input("Option: ").strip()
-        if choice == "8" or choice.lower().startswith("b"):
+        if choice == "10" or choice.lower().startswith("b"):
             return
         if choice == "1":
             print("\n===== GENERAL LEADERBOARD =====")
@@ -1676,6 +1097,11 @@ def leaderboards_menu():
         elif choice == "7":
             print("\n===== ABILITY LEADERBOARD =====")
             view_guess_ability_leaderboard()
+        elif choice == "8":
+            print("\n===== MY RANKING =====")
+            view_my_ranking(current_user['user_id'])
+        elif choice == "9":
+            view_window_leaderboard()
         else:
             print("Invalid option.")
 
@@ -1698,22 +1124,28 @@ def run_favorites_comments_menu():
             view_favorite_pokemon_leaderboard()
         elif choice == "2":
             # lets user add a favorite pokemon, they can also do this in their profile
-            set_favorite_pokemon(current_user, cursor, conn)
+            set_favorite_pokemon(current_user)
         elif choice == "3":
             # asks what pokemon comments to view
             pokemon_name = input("Which Pokémon's comments do you want to view? (or 'back' to cancel): ").strip()
             if pokemon_name.lower() not in ("back", "b") and pokemon_name:
                 view_comments(pokemon_name)
         elif choice == "4":
-            add_comment(current_user['user_id'], cursor, conn)
+            add_comment(current_user['user_id'])
         elif choice == "5":
-            remove_comment(current_user['user_id'], cursor, conn)
+            remove_comment(current_user['user_id'])
         elif choice == "6":
-            view_comments_by_user(current_user['user_id'], cursor)
+            view_comments_by_user(current_user['user_id'])
         else:
             print("Invalid option.")
 
 # Pokemon search menu
+# prints "did you mean" for a search that found nothing
+def print_suggestions(term):
+    suggestions = pokedex.suggest(term)
+    if suggestions:
+        print(" Did you mean: " + ", ".join(s["name"] for s in suggestions) + "?")
+
 def run_pokemon_menu():
         # chooses mode once per entry to this sub-menu
     while True:
@@ -1721,10 +1153,18 @@ def run_pokemon_menu():
         print("What do you want to search?")
         print("1.] Pokemon Basic Info")
         print("2.] Pokemon Stats")
-        print("3.] Back")
+        print("3.] Breeding Partners")
+        print("4.] Breeding Chain")
+        print("5.] Back")
         mode = input("Option: ").strip()
-        if mode == "3" or mode.lower().startswith("b"):
+        if mode == "5" or mode.lower() in ("back", "b"):
             return
+        if mode == "3":
+            run_breeding_partners()
+            continue
+        if mode == "4":
+            run_breeding_chain()
+            continue
         use_stats = (mode == "2" or mode.lower().startswith("s"))
 
         while True:
@@ -1740,6 +1180,7 @@ def run_pokemon_menu():
                 results = search_pokemon_stats(term)
                 if not results:
                     print(f"\n No Pokémon stats found for '{term}'.")
+                    print_suggestions(term)
                 else:
                     headers = ["pokemon_id", "poke_name", "hp", "attack", "defense", "sp_atk", "sp_def", "speed", "total"]
                     rows = [[row.get(h) for h in headers] for row in results]
@@ -1750,6 +1191,7 @@ def run_pokemon_menu():
                 results = search_pokemon(term)
                 if not results:
                     print(f"\n No Pokémon found with the name '{term}'.")
+                    print_suggestions(term)
                 else:
                     headers = ["ID", "Name", "Type 1", "Type 2", "Ability 1", "Ability 2", "Hidden Ability"]
                     rows = []
@@ -1766,6 +1208,53 @@ def run_pokemon_menu():
                     print("\n Pokémon Found:")
                     print(tabulate(rows, headers=headers, tablefmt="grid"))
 
+def print_breeding_rows(rows):
+    table = [[r['pokemon_id'], r['poke_name'], r['egg_group1'] or "N/A", r['egg_group2'] or "N/A"] for r in rows]
+    print(tabulate(table, headers=["ID", "Name", "Egg Group 1", "Egg Group 2"], tablefmt="grid"))
+
+# "who can breed with X"
+def run_breeding_partners():
+    while True:
+        term = input("\nEnter Pokémon name (or 'back' to return): ").strip()
+        if term.lower() in ("back", "b", "menu"):
+            return
+        if term == "":
+            print("Please enter a Pokémon name or 'back'.")
+            continue
+
+        partners = search_breeding_partners(term)
+        if partners is None:
+            print(f"\n No Pokémon found with the name '{term}'.")
+            print_suggestions(term)
+        elif not partners:
+            print(f"\n {pokedex.match(term)['name']} can't breed (Undiscovered egg group).")
+        else:
+            print(f"\n {pokedex.match(term)['name']} can breed with {len(partners)} Pokémon:")
+            print_breeding_rows(partners)
+
+# shortest breeding chain from X to Y
+def run_breeding_chain():
+    while True:
+        start = input("\nFrom Pokémon (or 'back' to return): ").strip()
+        if start.lower() in ("back", "b", "menu"):
+            return
+        end = input("To Pokémon: ").strip()
+        if not start or not end:
+            print("Please enter two Pokémon names.")
+            continue
+
+        chain = search_breeding_chain(start, end)
+        if chain is None:
+            for term in (start, end):
+                if not pokedex.match(term):
+                    print(f"\n No Pokémon found with the name '{term}'.")
+                    print_suggestions(term)
+        elif not chain:
+            print(f"\n There is no breeding chain from {pokedex.match(start)['name']} to {pokedex.match(end)['name']}.")
+        else:
+            print(f"\n {len(chain) - 1} breeding(s): " + " -> ".join(r['poke_name'] for r in chain))
+            print_breeding_rows(chain)
+
 # --------------------------------------------------------------------
 # COMMENT / FAVORITES FUNCTIONS
 # --------------------------------------------------------------------
@@ -1776,16 +1265,14 @@ def view_comments(pokemon_name):
     pokemon_name = pokemon_name.strip()
     
     # First, get the pokemon_id
-    cursor.execute("SELECT pokemon_id FROM pokemon WHERE LOWER(name) = LOWER(%s) LIMIT 1;", (pokemon_name,))
-    poke_row = cursor.fetchone()
-    
+    poke_row = pokedex.find(pokemon_name)
     if not poke_row:
         print(f"Pokémon '{pokemon_name}' not found.")
         return
-    
+
     pokemon_id = poke_row.get('pokemon_id')
-    
-    # Get all comments for this pokemon
+
+    # Get the comments for this pokemon, newest first, a page at a time
     query = """
         SELECT
             pc.comment_id,
@@ -1794,30 +1281,24 @@ def view_comments(pokemon_name):
             pc.created_at
         FROM pokemon_comments pc
         JOIN user_profiles up ON pc.user_id = up.user_id
-        WHERE pc.pokemon_id = %s
-        ORDER BY pc.created_at DESC;
     """
-    
-    cursor.execute(query, (pokemon_id,))
-    rows = cursor.fetchall()
-    
-    if not rows:
-        print(f"No comments found for '{pokemon_name}'.")
-        return
-    
-    headers = ["Comment ID", "User", "Comment", "Date"]
-    table = [[
-        r["comment_id"],
-        r["user"],
-        r["comment"],
-        r["created_at"]
-    ] for r in rows]
-    
-    print(f"\n===== COMMENTS FOR {pokemon_name.upper()} =====")
-    print(tabulate(table, headers=headers, tablefmt="grid"))
+    pages = Keyset(query, [("pc.created_at", "created_at"), ("pc.comment_id", "comment_id")],
+                   where="pc.pokemon_id = %s", params=(pokemon_id,))
+
+    for rows in browse_pages(pages, f"No comments found for '{pokemon_name}'."):
+        headers = ["Comment ID", "User", "Comment", "Date"]
+        table = [[
+            r["comment_id"],
+            r["user"],
+            r["comment"],
+            r["created_at"]
+        ] for r in rows]
+
+        print(f"\n===== COMMENTS FOR {pokemon_name.upper()} =====")
+        print(tabulate(table, headers=headers, tablefmt="grid"))
 
 # Lets the user add a comment to a specific pokemon
-def add_comment(user_id, cursor, db):
+def add_comment(user_id):
     print("\n=== ADD A COMMENT ===")
     # asks what pokemon to comment on
     # then lets them add a comment that isnt longer than 250 characters
@@ -1825,9 +1306,7 @@ def add_comment(user_id, cursor, db):
     if pokemon_name.lower() in ("back", "b"):
         return
     
-    cursor.execute("SELECT pokemon_id FROM pokemon WHERE LOWER(name) = LOWER(%s) LIMIT 1;", (pokemon_name,))
-    poke_row = cursor.fetchone()
-
+    poke_row = pokedex.find(pokemon_name)
     if not poke_row:
         print(f"Pokémon '{pokemon_name}' not found.")
         return
@@ -1840,15 +1319,15 @@ def add_comment(user_id, cursor, db):
         return
     
     # adds the comment to the database
-    cursor.execute("""
-        INSERT INTO pokemon_comments (user_id, pokemon_id, comment)
-        VALUES (%s, %s, %s);
-    """, (user_id, pokemon_id, comment))
-    db.commit()
+    with db_pool.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO pokemon_comments (user_id, pokemon_id, comment)
+            VALUES (%s, %s, %s);
+        """, (user_id, pokemon_id, comment))
     print("Comment added successfully!")
 
 # Lets the user remove one of their comments by its ID
-def remove_comment(user_id, cursor, db): 
+def remove_comment(user_id): 
 
     print("\n=== REMOVE A COMMENT ===")
     # asks which comment to remove by its ID
@@ -1862,26 +1341,26 @@ def remove_comment(user_id, cursor, db):
         return
     comment_id = int(comment_id_input)
 
-    # Check if the comment exists and belongs to the user
-    cursor.execute("""
-        SELECT comment_id FROM pokemon_comments
-        WHERE comment_id = %s AND user_id = %s;
-    """, (comment_id, user_id))
-    row = cursor.fetchone()
+    with db_pool.cursor() as cursor:
+        # Check if the comment exists and belongs to the user
+        cursor.execute("""
+            SELECT comment_id FROM pokemon_comments
+            WHERE comment_id = %s AND user_id = %s;
+        """, (comment_id, user_id))
+        row = cursor.fetchone()
 
-    if not row:
-        print("Comment not found or you do not have permission to delete it.")
-        return
+        if not row:
+            print("Comment not found or you do not have permission to delete it.")
+            return
     
-    # Deletes the comment
-    cursor.execute("DELETE FROM pokemon_comments WHERE comment_id = %s;", (comment_id,))
-    db.commit()
+        # Deletes the comment
+        cursor.execute("DELETE FROM pokemon_comments WHERE comment_id = %s;", (comment_id,))
     print("Comment removed successfully!")
 
 # Lets the user view all comments they have made, mainly to get the ID for removal
-def view_comments_by_user(user_id, cursor):
+def view_comments_by_user(user_id):
     print("\n=== YOUR COMMENTS ===")
-    # gets all comments made by the user
+    # gets the comments made by the user, newest first, a page at a time
     query = """
         SELECT
             pc.comment_id,
@@ -1890,25 +1369,20 @@ def view_comments_by_user(user_id, cursor):
             pc.created_at
         FROM pokemon_comments pc
         JOIN pokemon p ON pc.pokemon_id = p.pokemon_id
-        WHERE pc.user_id = %s
-        ORDER BY pc.created_at DESC;
     """
-    cursor.execute(query, (user_id,))
-    rows = cursor.fetchall()
+    pages = Keyset(query, [("pc.created_at", "created_at"), ("pc.comment_id", "comment_id")],
+                   where="pc.user_id = %s", params=(user_id,))
 
-    if not rows:
-        print("You have not made any comments yet.")
-        return
+    for rows in browse_pages(pages, "You have not made any comments yet."):
+        headers = ["Comment ID", "Pokémon", "Comment", "Date"]
+        table = [[
+            r["comment_id"],
+            r["pokemon_name"],
+            r["comment"],
+            r["created_at"]
+        ] for r in rows]
 
-    headers = ["Comment ID", "Pokémon", "Comment", "Date"]
-    table = [[
-        r["comment_id"],
-        r["pokemon_name"],
-        r["comment"],
-        r["created_at"]
-    ] for r in rows]
-
-    print(tabulate(table, headers=headers, tablefmt="grid"))
+        print(tabulate(table, headers=headers, tablefmt="grid"))
 
 
 # --------------------------------------------------------------------
@@ -1930,6 +1404,9 @@ def main():
     print("░░█░░▄▀░░█░░░░▀██▀░░░░▀▀░▀▀░░▄▀")
     print("░█░░░█░░█░░░░░░▄▄░░░░░░░░░░░▄▀")
 
+    # connects and loads the pokedex while the player types, nothing above needed the database
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+
     while True:
             pre = input("\nEnter your choice here: ").strip()
             if pre == "1":
@@ -2017,23 +1494,12 @@ def main():
             continue
         
         elif choice == "7":
-            submit_feedback(current_user['user_id'], cursor, conn)
+            submit_feedback(current_user['user_id'])
             continue
         print("Invalid option.")
 
 
 
-# will go through main then close connection once done
+# will go through main, every connection goes back to the pool as soon as it's used
 if __name__ == "__main__":
-    try:
-        main()
-    finally:
-        # closes global connection/cursor after program ends
-        try:
-            cursor.close()
-        except Exception:
-            pass
-        try:
-            conn.close()
-        except Exception:
-            pass
\ No newline at end of file
+    main()
\ No newline at end of file
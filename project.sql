@@ -18,6 +18,10 @@ SELECT * FROM leaderboard_general;
 -- ----------------------------------------------------------------------------------
 -- CREATION OF TABLES
 -- ----------------------------------------------------------------------------------
+-- NOTE: the app schema (tables, reference rows, indexes) is versioned in migrate.py now,
+-- run 'python migrate.py' to create or upgrade a database. The pokemon data is loaded
+-- straight from the Kaggle CSV with 'python load_pokedex.py pokemon.csv', the staging
+-- table inserts below are kept for reference.
 
 -- -------------------------------------
 -- NON-POKEMON (USERS AND APP)
@@ -91,6 +95,10 @@ CREATE TABLE user_profiles (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
 
+    -- lowercase copy of display_name so profile search can use an index
+    display_name_key VARCHAR(100) GENERATED ALWAYS AS (LOWER(TRIM(display_name))) STORED,
+    UNIQUE INDEX uq_profiles_display_name_key (display_name_key),
+
     CONSTRAINT fk_profile_user
         FOREIGN KEY (user_id)
         REFERENCES users(user_id)
@@ -152,6 +160,9 @@ CREATE TABLE pokemon (
     egg_cycles INT,
     growth_rate_id INT,
     special_group_id INT,
+    -- lowercase copy of name so name lookups can use an index
+    name_key VARCHAR(50) GENERATED ALWAYS AS (LOWER(TRIM(name))) STORED,
+    UNIQUE INDEX uq_pokemon_name_key (name_key),
     FOREIGN KEY (growth_rate_id) REFERENCES growth_rates(growth_rate_id),
     FOREIGN KEY (special_group_id) REFERENCES special_groups(special_group_id)
 );
@@ -403,12 +414,108 @@ CREATE TABLE leaderboard_general (
     score INT NOT NULL,
     correct INT DEFAULT 0,
     incorrect INT DEFAULT 0,
+    bank_seq BIGINT NULL, -- question_bank seq the round was served from, NULL when drawn live
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
 
     FOREIGN KEY (user_id) REFERENCES users(user_id),
     FOREIGN KEY (mode_id) REFERENCES game_modes(mode_id)
 );
 
+-- Running totals per user, updated in the same transaction as leaderboard_general
+-- so the general leaderboard never has to GROUP BY the whole history
+-- (python leaderboards.py verify / rebuild checks or recomputes these)
+CREATE TABLE leaderboard_totals (
+    user_id BIGINT PRIMARY KEY,
+    total_games INT NOT NULL DEFAULT 0,
+    total_score BIGINT NOT NULL DEFAULT 0,
+    correct INT NOT NULL DEFAULT 0,
+    incorrect INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    INDEX idx_totals_rank (total_score, total_games),
+    FOREIGN KEY (user_id) REFERENCES users(user_id)
+);
+
+-- Same thing but per user per game mode
+CREATE TABLE leaderboard_mode_totals (
+    user_id BIGINT NOT NULL,
+    mode_id INT NOT NULL,
+    total_games INT NOT NULL DEFAULT 0,
+    total_score BIGINT NOT NULL DEFAULT 0,
+    correct INT NOT NULL DEFAULT 0,
+    incorrect INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, mode_id),
+
+    INDEX idx_mode_totals_rank (mode_id, total_score, total_games),
+    FOREIGN KEY (user_id) REFERENCES users(user_id),
+    FOREIGN KEY (mode_id) REFERENCES game_modes(mode_id)
+);
+
+-- Same again per day, week (starting monday) and month, for the time-windowed
+-- leaderboards. A custom range is read as whole months + whole weeks + single days
+CREATE TABLE leaderboard_period_totals (
+    period ENUM('day', 'week', 'month') NOT NULL,
+    period_start DATE NOT NULL,
+    mode_id INT NOT NULL,
+    user_id BIGINT NOT NULL,
+    total_games INT NOT NULL DEFAULT 0,
+    total_score BIGINT NOT NULL DEFAULT 0,
+    correct INT NOT NULL DEFAULT 0,
+    incorrect INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (period, period_start, mode_id, user_id),
+
+    INDEX idx_period_rank (period, period_start, mode_id, total_score, total_games),
+    FOREIGN KEY (user_id) REFERENCES users(user_id),
+    FOREIGN KEY (mode_id) REFERENCES game_modes(mode_id)
+);
+
+-- Pre-generated questions (python question_bank.py generate fills these).
+-- Each mode's questions are numbered in order and players read them in order,
+-- so serving one is a primary key read and any round can be looked up again later.
+-- question_bank_modes says which numbers are being served, a regenerate writes the
+-- new questions after them and then moves that row over.
+-- Answer sets repeat a lot (every Water type question has the same answers),
+-- so they are stored once and keyed by a hash of the answers
+CREATE TABLE question_answer_sets (
+    answer_key CHAR(16) PRIMARY KEY,
+    answers TEXT NOT NULL
+);
+
+CREATE TABLE question_bank (
+    mode_id INT NOT NULL,
+    seq INT NOT NULL,
+    pokemon1_id INT NOT NULL,
+    pokemon2_id INT NULL,
+    detail_id INT NULL,
+    answer_key CHAR(16) NOT NULL,
+    difficulty TINYINT NOT NULL,
+    PRIMARY KEY (mode_id, seq),
+
+    FOREIGN KEY (mode_id) REFERENCES game_modes(mode_id)
+);
+
+-- the questions each mode is serving: seq first_seq .. first_seq + size - 1
+CREATE TABLE question_bank_modes (
+    mode_id INT PRIMARY KEY,
+    first_seq INT NOT NULL,
+    size INT NOT NULL,
+
+    FOREIGN KEY (mode_id) REFERENCES game_modes(mode_id)
+);
+
+-- where each player is in each mode's questions
+CREATE TABLE question_bank_cursors (
+    user_id BIGINT NOT NULL,
+    mode_id INT NOT NULL,
+    next_seq BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, mode_id),
+
+    FOREIGN KEY (user_id) REFERENCES users(user_id),
+    FOREIGN KEY (mode_id) REFERENCES game_modes(mode_id)
+);
+
 CREATE TABLE leaderboard_guess_stats (
     stats_id BIGINT AUTO_INCREMENT PRIMARY KEY,
     user_id BIGINT NOT NULL,
@@ -0,0 +1,304 @@
+# querylog.py
+# Query instrumentation: which function ran which statement, how often, how long,
+# and how many rows it touched. Turned on with POKEQUIZ_QUERY_LOG=1, then
+# storage.open_pool wraps the pool so every cursor it hands out is timed. Turned
+# off (the default) the pool isn't wrapped at all, so it costs nothing.
+# Statements slower than POKEQUIZ_SLOW_QUERY_MS go to the slow-query log as they
+# happen, and the per-call-site totals are merged into a stats file when the app exits.
+#
+# python querylog.py                    -> call sites sorted by total time
+# python querylog.py --by count         -> sorted by how many times they ran
+# python querylog.py slow               -> the slowest entries from the slow-query log
+# python querylog.py reset              -> clears the stats file
+
+import argparse
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+
+ENABLED = os.environ.get('POKEQUIZ_QUERY_LOG', '').lower() in ('1', 'true', 'yes', 'on')
+SLOW_QUERY_MS = float(os.environ.get('POKEQUIZ_SLOW_QUERY_MS', '100'))
+STATS_PATH = os.environ.get('POKEQUIZ_QUERY_STATS', 'query_stats.json')
+SLOW_LOG_PATH = os.environ.get('POKEQUIZ_SLOW_LOG', 'slow_queries.log')
+
+# frames in these modules are plumbing, the call site is whoever called into them
+PLUMBING_MODULES = {'querylog', 'storage', 'database', 'pagination', 'cache', 'contextlib', 'threading'}
+# and these are project.py's shared helpers, the view that used them is more useful
+PLUMBING_FUNCTIONS = {'browse_pages', 'browse_pages.<locals>.load',
+                      'cached_leaderboard', 'cached_leaderboard.<locals>.load'}
+
+
+# the statement with the values taken out, so every run of the same query adds up together
+_FINGERPRINT = [
+    (re.compile(r"'(?:[^'\\]|\\.)*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(?+)"),
+    (re.compile(r"\s+"), " "),
+]
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    for pattern, replacement in _FINGERPRINT:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip().rstrip(';').strip()
+
+def call_site():
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '?')
+        if module == '__main__':
+            module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+        name = getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+        if module not in PLUMBING_MODULES and name not in PLUMBING_FUNCTIONS:
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return '?'
+
+
+class QueryStats:
+
+    def __init__(self, slow_ms=SLOW_QUERY_MS, slow_log_path=SLOW_LOG_PATH):
+        self.slow_ms = slow_ms
+        self.slow_log_path = slow_log_path
+        self.lock = threading.Lock()
+        # (call site, fingerprint) -> [count, total_ms, max_ms, rows]
+        self.sites = {}
+
+    def record(self, site, sql, elapsed_ms, rows):
+        key = (site, fingerprint(sql))
+        with self.lock:
+            entry = self.sites.get(key)
+            if entry is None:
+                entry = self.sites[key] = [0, 0.0, 0.0, 0]
+            entry[0] += 1
+            entry[1] += elapsed_ms
+            entry[2] = max(entry[2], elapsed_ms)
+            entry[3] += max(rows, 0)
+            if elapsed_ms >= self.slow_ms:
+                self._log_slow(site, key[1], sql, elapsed_ms, rows)
+
+    def _log_slow(self, site, fp, sql, elapsed_ms, rows):
+        line = json.dumps({
+            'at': datetime.now().isoformat(timespec='seconds'),
+            'site': site,
+            'ms': round(elapsed_ms, 3),
+            'rows': rows,
+            'fingerprint': fp,
+            'statement': ' '.join(sql.split()),
+        }, ensure_ascii=False)
+        with open(self.slow_log_path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+    # adds this run's numbers to the stats file, so the summary covers every run since the last reset
+    def save(self, path=STATS_PATH):
+        with self.lock:
+            if not self.sites:
+                return
+            sites, self.sites = self.sites, {}
+        stored = load_stats(path)
+        for (site, fp), (count, total, worst, rows) in sites.items():
+            entry = stored.setdefault(f"{site}\t{fp}", {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0})
+            entry['count'] += count
+            entry['total_ms'] += total
+            entry['max_ms'] = max(entry['max_ms'], worst)
+            entry['rows'] += rows
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(stored, f, indent=1, ensure_ascii=False)
+
+
+class TimedCursor:
+
+    # times execute and the fetches that follow it, one record per statement
+    # (written when the next statement starts or the cursor closes)
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._pending = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _finish(self):
+        if self._pending:
+            site, sql, elapsed, rows = self._pending
+            self._pending = None
+            if rows < 0:
+                rows = self._cursor.rowcount
+            self._stats.record(site, sql, elapsed * 1000, rows)
+
+    def _run(self, method, sql, params):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return method(sql, params)
+        finally:
+            self._pending = [call_site(), sql, time.perf_counter() - started, -1]
+
+    def execute(self, sql, params=()):
+        return self._run(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, seq_params):
+        return self._run(self._cursor.executemany, sql, seq_params)
+
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        result = method(*args)
+        if self._pending:
+            self._pending[2] += time.perf_counter() - started
+            fetched = 0 if result is None else (len(result) if isinstance(result, list) else 1)
+            self._pending[3] = max(self._pending[3], 0) + fetched
+        return result
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, size=1):
+        return self._fetch(self._cursor.fetchmany, size)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+
+class TimedConnection:
+
+    def __init__(self, conn, stats):
+        self._conn = conn
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._conn.cursor(*args, **kwargs), self._stats)
+
+
+class InstrumentedPool:
+
+    # same interface as the pool it wraps, every cursor it hands out is a TimedCursor
+    def __init__(self, pool, stats):
+        self.pool = pool
+        self.stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self.pool, name)
+
+    @contextmanager
+    def connection(self):
+        with self.pool.connection() as conn:
+            yield TimedConnection(conn, self.stats)
+
+    @contextmanager
+    def cursor(self):
+        with self.pool.cursor() as cursor:
+            timed = TimedCursor(cursor, self.stats)
+            try:
+                yield timed
+            finally:
+                timed._finish()
+
+
+# the one recorder for this process, created the first time a pool gets instrumented
+stats = None
+
+def instrument(pool):
+    global stats
+    if stats is None:
+        stats = QueryStats()
+        atexit.register(stats.save)
+    return InstrumentedPool(pool, stats)
+
+
+# --------------------------------------------------------------------
+# REPORTS
+# --------------------------------------------------------------------
+
+def load_stats(path=STATS_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def summarize(path=STATS_PATH, by='total', limit=20, per_statement=False):
+    from tabulate import tabulate
+
+    grouped = {}
+    for key, entry in load_stats(path).items():
+        site, fp = key.split('\t', 1)
+        group = grouped.setdefault((site, fp) if per_statement else site,
+                                   {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0, 'statements': 0})
+        group['count'] += entry['count']
+        group['total_ms'] += entry['total_ms']
+        group['max_ms'] = max(group['max_ms'], entry['max_ms'])
+        group['rows'] += entry['rows']
+        group['statements'] += 1
+
+    if not grouped:
+        print(f"No query stats in {path} yet, run the app with POKEQUIZ_QUERY_LOG=1 first.")
+        return []
+
+    sort_key = {'total': 'total_ms', 'count': 'count', 'max': 'max_ms'}[by]
+    ranked = sorted(grouped.items(), key=lambda g: g[1][sort_key], reverse=True)[:limit]
+    all_ms = sum(g['total_ms'] for g in grouped.values()) or 1.0
+
+    table = []
+    for key, g in ranked:
+        site = key[0] if per_statement else key
+        row = [site, g['count'], f"{g['total_ms']:.1f}", f"{g['total_ms'] / all_ms * 100:.1f}%",
+               f"{g['total_ms'] / g['count']:.3f}", f"{g['max_ms']:.3f}", g['rows']]
+        row.append(key[1][:80] if per_statement else g['statements'])
+        table.append(row)
+    headers = ["CALL SITE", "CALLS", "TOTAL MS", "SHARE", "AVG MS", "MAX MS", "ROWS",
+               "STATEMENT" if per_statement else "STATEMENTS"]
+    print(tabulate(table, headers=headers, tablefmt="grid"))
+    return ranked
+
+def show_slow(path=SLOW_LOG_PATH, limit=20):
+    from tabulate import tabulate
+
+    if not os.path.exists(path):
+        print(f"No slow queries logged in {path}.")
+        return []
+    with open(path, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    entries.sort(key=lambda e: e['ms'], reverse=True)
+    table = [[e['at'], e['site'], f"{e['ms']:.1f}", e['rows'], e['fingerprint'][:80]] for e in entries[:limit]]
+    print(tabulate(table, headers=["WHEN", "CALL SITE", "MS", "ROWS", "STATEMENT"], tablefmt="grid"))
+    return entries[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-call-site query timings and the slow-query log.")
+    parser.add_argument("command", nargs="?", default="summary", choices=("summary", "slow", "reset"))
+    parser.add_argument("--by", choices=("total", "count", "max"), default="total", help="sort order for summary")
+    parser.add_argument("--statements", action="store_true", help="one row per call site and statement")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--stats", default=STATS_PATH, help="stats file to read")
+    parser.add_argument("--slow-log", default=SLOW_LOG_PATH, help="slow-query log to read")
+    args = parser.parse_args(argv)
+
+    if args.command == "slow":
+        show_slow(args.slow_log, args.limit)
+    elif args.command == "reset":
+        if os.path.exists(args.stats):
+            os.remove(args.stats)
+        print(f"Cleared {args.stats}.")
+    else:
+        summarize(args.stats, args.by, args.limit, args.statements)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,449 @@
+# question_bank.py
+# Pre-generated quiz questions.
+# generate draws rounds with the same engines the games use (quiz.py), in parallel
+# worker processes, and bulk loads them into question_bank with their answer sets
+# and a difficulty. Players then read each mode's questions in order from their own
+# cursor, so serving a round is one primary key read instead of a live draw, and the
+# round behind any cursor position can be looked up again when a score is disputed
+# (every saved round keeps the question it was in leaderboard_general.bank_seq).
+# A regenerate writes the new questions after the live ones and then moves the mode's
+# question_bank_modes row over to them in one statement, so players never see a bank
+# that is empty or half written, and the old questions are deleted after that.
+# The games use the bank when POKEQUIZ_QUESTION_BANK=1 and it has questions for the mode.
+#
+# python question_bank.py generate --per-mode 1000000 --workers 4
+# python question_bank.py generate --per-mode 50000 --modes guess_type guess_ability
+# python question_bank.py status               -> questions per mode and difficulty
+# python question_bank.py show guess_type 1234 -> one question and its answers
+# python question_bank.py cursor 42            -> where player 42 is in every mode
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+
+from quiz import DIFFICULTIES, ENGINES
+
+
+ENABLED = os.environ.get('POKEQUIZ_QUESTION_BANK', '').lower() in ('1', 'true', 'yes', 'on')
+
+ANSWER_SET_INSERT = """
+    INSERT IGNORE INTO question_answer_sets (answer_key, answers)
+    VALUES (%s, %s);
+"""
+
+QUESTION_INSERT = """
+    INSERT INTO question_bank (
+        mode_id, seq, pokemon1_id, pokemon2_id, detail_id, answer_key, difficulty
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s);
+"""
+
+QUESTION_READ = """
+    SELECT pokemon1_id, pokemon2_id, detail_id, answer_key, difficulty
+    FROM question_bank
+    WHERE mode_id = %s AND seq = %s;
+"""
+
+# the question plus the mode's live range, so a bank regenerated since we cached it shows up
+LIVE_QUESTION_READ = """
+    SELECT
+        m.first_seq,
+        m.size,
+        q.pokemon1_id,
+        q.pokemon2_id,
+        q.detail_id,
+        q.answer_key,
+        q.difficulty
+    FROM question_bank_modes m
+    LEFT JOIN question_bank q ON q.mode_id = m.mode_id AND q.seq = %s
+    WHERE m.mode_id = %s;
+"""
+
+LIVE_RANGE_READ = """
+    SELECT first_seq, size
+    FROM question_bank_modes
+    WHERE mode_id = %s;
+"""
+
+LIVE_RANGE_UPSERT = """
+    INSERT INTO question_bank_modes (mode_id, first_seq, size)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE first_seq = VALUES(first_seq), size = VALUES(size);
+"""
+
+CURSOR_UPSERT = """
+    INSERT INTO question_bank_cursors (user_id, mode_id, next_seq)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE next_seq = VALUES(next_seq);
+"""
+
+
+# answer sets are stored as text, pokemon ids in order or "yes"/"no" for the egg group game
+def answers_text(answers):
+    return ','.join(str(a) for a in sorted(answers))
+
+def parse_answers(text):
+    return frozenset(int(a) if a.isdigit() else a for a in text.split(',') if a)
+
+# the same answers always get the same key, so regenerating never duplicates a set
+def answer_key(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+# --------------------------------------------------------------------
+# SERVING
+# --------------------------------------------------------------------
+
+class QuestionBank:
+
+    def __init__(self, pool):
+        # nothing here needs a lock, two threads filling the same entry fill it with the same thing
+        self.pool = pool
+        # mode_id -> (first_seq, size) of the questions being served, None for no bank,
+        # checked against the database on every read (see serve)
+        self.ranges = {}
+        # answer_key -> frozenset, there are only a few thousand distinct sets
+        self.answer_sets = {}
+        # (user_id, mode_id) -> how far into the mode's questions they are, the index after
+        # the last question they were shown, read from the database the first time
+        self.cursors = {}
+
+    # one primary key read per mode, then remembered
+    def live_range(self, cursor, mode_id):
+        if mode_id not in self.ranges:
+            cursor.execute(LIVE_RANGE_READ, (mode_id,))
+            row = cursor.fetchone()
+            self.ranges[mode_id] = (row["first_seq"], row["size"]) if row and row["size"] else None
+        return self.ranges[mode_id]
+
+    def answer_set(self, cursor, key):
+        if key not in self.answer_sets:
+            cursor.execute("SELECT answers FROM question_answer_sets WHERE answer_key = %s;", (key,))
+            row = cursor.fetchone()
+            self.answer_sets[key] = parse_answers(row["answers"]) if row else None
+        return self.answer_sets[key]
+
+    # a new player starts somewhere of their own in the mode instead of everyone at 0
+    def next_index(self, cursor, user_id, mode_id, size):
+        key = (user_id, mode_id)
+        if key not in self.cursors:
+            cursor.execute("""
+                SELECT next_seq
+                FROM question_bank_cursors
+                WHERE user_id = %s AND mode_id = %s;
+            """, (user_id, mode_id))
+            row = cursor.fetchone()
+            self.cursors[key] = row["next_seq"] if row else (user_id * 2654435761) % size
+        return self.cursors[key]
+
+    # the engine's next round as (round, answers, difficulty, seq),
+    # None when the bank has nothing usable for it and the engine should draw live
+    # an engine that asked for one difficulty (engine.level) skips the questions that aren't it
+    # this only reads, the cursor moves when the round is actually shown (see shown),
+    # so a round lined up ahead of time and never played comes back next session
+    # (questions skipped for their difficulty are the exception, the cursor goes past them
+    # when nothing usable turned up, or the player would read the same ones every round)
+    def serve(self, engine, tries=10):
+        if engine.user_id is None or engine.mode_id is None:
+            return None
+        mode_id = engine.mode_id
+        with self.pool.cursor() as cursor:
+            live = self.live_range(cursor, mode_id)
+            if not live:
+                return None
+            index = self.start_index(cursor, engine, live)
+            skipped = None
+
+            while tries > 0:
+                first, size = live
+                cursor.execute(LIVE_QUESTION_READ, (first + index % size, mode_id))
+                row = cursor.fetchone()
+                if not row or not row["size"]:
+                    # the mode's bank was taken away
+                    self.ranges[mode_id] = None
+                    return None
+                if (row["first_seq"], row["size"]) != live:
+                    # regenerated since we cached the range, same place in the new questions
+                    live = self.ranges[mode_id] = (row["first_seq"], row["size"])
+                    index = self.start_index(cursor, engine, live)
+                    skipped = None
+                    tries -= 1
+                    continue
+
+                tries -= 1
+                if engine.level is not None and row["difficulty"] != engine.level:
+                    skipped = first + index % size
+                    index += 1
+                    continue
+                answers = self.answer_set(cursor, row["answer_key"]) if row["answer_key"] else None
+                # a pokemon that has left the pokedex since the bank was made, skip the question
+                round = engine.from_bank(row["pokemon1_id"], row["pokemon2_id"], row["detail_id"]) if answers else None
+                if round is not None:
+                    return round, answers, row["difficulty"], first + index % size
+                index += 1
+        if skipped is not None and not any('bank_seq' in q for _, _, q in engine.upcoming):
+            self.shown(engine.user_id, mode_id, skipped)
+        return None
+
+    # after the rounds this engine already has lined up, or where the player left off
+    def start_index(self, cursor, engine, live):
+        first, size = live
+        queued = [q['bank_seq'] for _, _, q in engine.upcoming if 'bank_seq' in q]
+        if queued and first <= queued[-1] < first + size:
+            return queued[-1] - first + 1
+        return self.next_index(cursor, engine.user_id, engine.mode_id, size)
+
+    # the player is looking at question seq now, their cursor goes past it
+    def shown(self, user_id, mode_id, seq):
+        live = self.ranges.get(mode_id)
+        if not live:
+            return
+        index = (seq - live[0]) % live[1] + 1
+        with self.pool.cursor() as cursor:
+            cursor.execute(CURSOR_UPSERT, (user_id, mode_id, index))
+        self.cursors[(user_id, mode_id)] = index
+
+
+# --------------------------------------------------------------------
+# GENERATION
+# --------------------------------------------------------------------
+
+# each worker process rebuilds the pokedex from plain rows once, then draws chunks from it
+_pokedex = None
+
+def _start_worker(rows, mode_rows):
+    global _pokedex
+    from pokedex import Pokedex
+    _pokedex = Pokedex(rows, mode_rows)
+
+# count questions for one mode, the start-th one onwards, stored from seq base + start
+# seeded by the chunk so a rerun with the same seed makes the same questions no matter
+# how many workers there are
+def generate_chunk(mode, start, count, seed, base=0):
+    from sampler import Sampler
+
+    engine = ENGINES[mode](None, _pokedex, Sampler(_pokedex, random.Random(f"{seed}:{mode}:{start}")), prefetch=0)
+    rows = []
+    for seq in range(base + start, base + start + count):
+        round = engine.draw()
+        if round is None:
+            break
+        answers = engine.answers(round)
+        text = answers_text(answers)
+        rows.append((seq, *engine.bank_row(round), text, engine.difficulty(round, answers)))
+    return mode, rows
+
+# one chunk = one transaction, the answer sets it needs go in first
+def save_chunk(cursor, mode_id, rows, saved_keys):
+    new_sets = {}
+    questions = []
+    for seq, p1, p2, detail, text, difficulty in rows:
+        key = answer_key(text)
+        if key not in saved_keys:
+            new_sets[key] = text
+        questions.append((mode_id, seq, p1, p2, detail, key, difficulty))
+    if new_sets:
+        cursor.executemany(ANSWER_SET_INSERT, list(new_sets.items()))
+        saved_keys.update(new_sets)
+    cursor.executemany(QUESTION_INSERT, questions)
+
+# replaces the bank for the given modes with per_mode fresh questions each
+# the new questions go in after the live ones while those keep being served,
+# then every mode switches over at once
+def generate(pool, pokedex, modes, per_mode, workers=1, chunk_size=20000, seed=1):
+    live = {}
+    bases = {}
+    with pool.cursor() as cursor:
+        for mode in modes:
+            mode_id = pokedex.mode_id(mode)
+            cursor.execute(LIVE_RANGE_READ, (mode_id,))
+            row = cursor.fetchone()
+            live[mode] = (row["first_seq"], row["size"]) if row else None
+            # anything outside the live range is from a generate that died halfway, it never went live
+            if live[mode]:
+                first, size = live[mode]
+                cursor.execute("DELETE FROM question_bank WHERE mode_id = %s AND (seq < %s OR seq >= %s);",
+                               (mode_id, first, first + size))
+                bases[mode] = first + size
+            else:
+                cursor.execute("DELETE FROM question_bank WHERE mode_id = %s;", (mode_id,))
+                bases[mode] = 0
+        cursor.execute("SELECT answer_key FROM question_answer_sets;")
+        saved_keys = {r["answer_key"] for r in cursor.fetchall()}
+
+    jobs = [
+        (mode, start, min(chunk_size, per_mode - start), seed, bases[mode])
+        for mode in modes for start in range(0, per_mode, chunk_size)
+    ]
+
+    rows = [dict(e) for e in pokedex.entries]
+    mode_rows = [dict(m) for m in pokedex.modes]
+    counts = dict.fromkeys(modes, 0)
+
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(workers, initializer=_start_worker, initargs=(rows, mode_rows))
+        # at most two finished chunks per worker waiting to be written, so memory stays flat
+        window = workers * 2
+        chunks = (
+            chunk
+            for i in range(0, len(jobs), window)
+            for chunk in executor.map(generate_chunk, *zip(*jobs[i:i + window]))
+        )
+    else:
+        executor = None
+        _start_worker(rows, mode_rows)
+        chunks = (generate_chunk(*job) for job in jobs)
+
+    try:
+        # the workers keep drawing while this process writes the chunks they finished
+        for mode, chunk in chunks:
+            with pool.cursor() as cursor:
+                save_chunk(cursor, pokedex.mode_id(mode), chunk, saved_keys)
+            counts[mode] += len(chunk)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # the switch, one transaction for every mode (a mode that drew nothing keeps what it had)
+    done = [mode for mode in modes if counts[mode]]
+    with pool.cursor() as cursor:
+        for mode in done:
+            cursor.execute(LIVE_RANGE_UPSERT, (pokedex.mode_id(mode), bases[mode], counts[mode]))
+    # nobody is served the old questions anymore
+    for mode in done:
+        if live[mode]:
+            with pool.cursor() as cursor:
+                cursor.execute("DELETE FROM question_bank WHERE mode_id = %s AND seq < %s;",
+                               (pokedex.mode_id(mode), bases[mode]))
+    return counts
+
+
+# --------------------------------------------------------------------
+# REPORTS
+# --------------------------------------------------------------------
+
+def status(pool, pokedex):
+    from tabulate import tabulate
+
+    with pool.cursor() as cursor:
+        cursor.execute("""
+            SELECT q.mode_id, q.difficulty, COUNT(*) AS questions
+            FROM question_bank_modes m
+            JOIN question_bank q
+                ON q.mode_id = m.mode_id AND q.seq >= m.first_seq AND q.seq < m.first_seq + m.size
+            GROUP BY q.mode_id, q.difficulty;
+        """)
+        rows = cursor.fetchall()
+    if not rows:
+        print("The question bank is empty, run python question_bank.py generate first.")
+        return
+
+    by_mode = {}
+    for r in rows:
+        by_mode.setdefault(r["mode_id"], {})[r["difficulty"]] = r["questions"]
+    names = {m["mode_id"]: m["mode_name"] for m in pokedex.modes}
+    table = [
+        [names.get(mode_id, mode_id), sum(counts.values())] + [counts.get(d, 0) for d in DIFFICULTIES]
+        for mode_id, counts in sorted(by_mode.items())
+    ]
+    print(tabulate(table, headers=["MODE", "QUESTIONS"] + [d.upper() for d in DIFFICULTIES.values()], tablefmt="grid"))
+
+# prints one question the way the player saw it, plus every answer that counted
+def show(pool, pokedex, mode, seq):
+    from sampler import Sampler
+
+    engine = ENGINES[mode](None, pokedex, Sampler(pokedex), prefetch=0)
+    with pool.cursor() as cursor:
+        cursor.execute(QUESTION_READ, (engine.mode_id, seq))
+        row = cursor.fetchone()
+        if not row:
+            print(f"No question {seq} for {mode}.")
+            return None
+        cursor.execute("SELECT answers FROM question_answer_sets WHERE answer_key = %s;", (row["answer_key"],))
+        answers = parse_answers(cursor.fetchone()["answers"])
+
+    round = engine.from_bank(row["pokemon1_id"], row["pokemon2_id"], row["detail_id"])
+    if round is None:
+        print(f"Question {seq} for {mode} points at a pokemon that isn't in the pokedex anymore.")
+        return None
+    print(f"{mode} #{seq} ({DIFFICULTIES[row['difficulty']]})")
+    print(engine.show(round)["prompt"])
+    names = sorted(a if isinstance(a, str) else (pokedex.get(a) or {}).get("name", str(a)) for a in answers)
+    print(f"\nAccepted answers ({len(names)}): {', '.join(names)}")
+    return round, answers
+
+def show_cursors(pool, pokedex, user_id):
+    from tabulate import tabulate
+
+    with pool.cursor() as cursor:
+        cursor.execute("""
+            SELECT mode_id, next_seq
+            FROM question_bank_cursors
+            WHERE user_id = %s;
+        """, (user_id,))
+        rows = cursor.fetchall()
+        bank = QuestionBank(pool)
+        table = []
+        for r in rows:
+            live = bank.live_range(cursor, r["mode_id"])
+            mode = next((m["mode_name"] for m in pokedex.modes if m["mode_id"] == r["mode_id"]), r["mode_id"])
+            if not live:
+                table.append([mode, "-", "-"])
+                continue
+            # the cursor only moves when a question is shown, so the one before it is the last they saw
+            first, size = live
+            table.append([mode, first + r["next_seq"] % size, first + (r["next_seq"] - 1) % size])
+    if not table:
+        print(f"Player {user_id} hasn't been shown any bank questions.")
+        return
+    print(tabulate(table, headers=["MODE", "NEXT QUESTION", "LAST QUESTION"], tablefmt="grid"))
+
+
+def main(argv=None):
+    from pokedex import Pokedex
+    from storage import open_pool
+
+    parser = argparse.ArgumentParser(description="Generate and inspect the pre-generated question bank.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    gen = commands.add_parser("generate", help="replace the bank with freshly drawn questions")
+    gen.add_argument("--per-mode", type=int, default=100000, help="questions per game mode")
+    gen.add_argument("--modes", nargs="+", choices=sorted(ENGINES), default=list(ENGINES))
+    gen.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes drawing questions")
+    gen.add_argument("--chunk-size", type=int, default=20000, help="questions per transaction")
+    gen.add_argument("--seed", default="1", help="same seed, same bank")
+    commands.add_parser("status", help="questions per mode and difficulty")
+    one = commands.add_parser("show", help="one question and its accepted answers")
+    one.add_argument("mode", choices=sorted(ENGINES))
+    one.add_argument("seq", type=int)
+    where = commands.add_parser("cursor", help="where a player is in every mode")
+    where.add_argument("user_id", type=int)
+    args = parser.parse_args(argv)
+
+    pool = open_pool()
+    with pool.cursor() as cursor:
+        pokedex = Pokedex.load(cursor)
+
+    if args.command == "generate":
+        started = time.perf_counter()
+        counts = generate(pool, pokedex, args.modes, args.per_mode, args.workers, args.chunk_size, args.seed)
+        elapsed = time.perf_counter() - started
+        for mode, n in counts.items():
+            print(f"{mode}: {n:,} questions")
+        total = sum(counts.values())
+        print(f"Generated {total:,} questions in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f}/s)")
+    elif args.command == "status":
+        status(pool, pokedex)
+    elif args.command == "show":
+        show(pool, pokedex, args.mode, args.seq)
+    else:
+        show_cursors(pool, pokedex, args.user_id)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,702 @@
+# quiz.py
+# The seven quiz games without input() or print().
+# Each game is an engine: next_question() draws a round and hands back what to show,
+# submit(answer) checks the answer, queues the round with the result writer and hands
+# back the outcome. Both are plain dicts, so the terminal menus in project.py, a script
+# or a load test can all drive the same rules. The replay runner below plays scripted
+# sessions from a JSONL file at machine speed.
+#
+# python quiz.py sessions.jsonl                  -> plays every session, saves the rounds
+# python quiz.py sessions.jsonl --no-save        -> same, nothing gets written
+# python quiz.py sessions.jsonl --out rounds.jsonl
+# python quiz.py sessions.jsonl --bank           -> questions come from the question bank
+#
+# one session per line, seed is optional and makes the questions repeatable:
+# {"user_id": 2, "mode": "guess_weight", "seed": 7, "answers": ["1", "2", "1"]}
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+
+from pairs import EASY_RATIO, MEDIUM_RATIO
+
+
+# how many typos each game forgives in a guessed name, 0 = must be spelled right
+# (accents, capitals and punctuation never count, "flabebe" is always Flabébé)
+# short names get less slack than this, see NameMatcher.allowed_distance
+GUESS_TYPO_TOLERANCE = {
+    'guess_stats': 1,
+    'guess_species': 1,
+    'guess_dexnum': 1,
+    'guess_ability': 1,
+    'guess_type': 1,
+}
+
+# how many rounds each engine keeps ready ahead of the one being played
+PREFETCH = int(os.environ.get('POKEQUIZ_PREFETCH', '1'))
+
+# every question gets one of these, see QuizEngine.difficulty
+DIFFICULTIES = {1: 'easy', 2: 'medium', 3: 'hard'}
+
+# how often the egg group game draws a pair that does share a group
+# (two random pokemon almost never do)
+EGG_YES_RATIO = float(os.environ.get('POKEQUIZ_EGG_YES_RATIO', '0.5'))
+
+
+# a guess that can't be checked at all (not 1/2, not yes/no), the round stays open
+class InvalidAnswer(ValueError):
+    pass
+
+
+class QuizEngine:
+
+    mode = None            # game_modes.mode_name
+    title = ""             # heading the menus print
+    label = ""             # "Exiting {label} guessing game!"
+    ask = "\nYour guess (Pokémon name): "
+    empty_message = ""     # the pool had nothing to draw
+    points = 0             # score for a correct answer
+    insert = ""            # row for the game's own leaderboard
+
+    # writer is anything with record_round (results.ResultWriter), None plays without saving
+    # bank is a question_bank.QuestionBank to serve pre-generated rounds from, None draws them live
+    # level asks for one difficulty (a DIFFICULTIES key), None mixes them: the pair games draw
+    # live rounds at that level and the bank only serves questions of it
+    def __init__(self, user_id, pokedex, sampler, writer=None, prefetch=PREFETCH, bank=None, level=None):
+        self.user_id = user_id
+        self.pokedex = pokedex
+        self.sampler = sampler
+        self.writer = writer
+        self.prefetch = prefetch
+        self.bank = bank
+        self.level = level
+        self.mode_id = pokedex.mode_id(self.mode)
+        # (round, answers, question) for the open round and the ones lined up after it
+        self.current = None
+        self.upcoming = deque()
+
+    # turns what the player typed into a pokemon using the mode's typo tolerance
+    def resolve(self, guess):
+        return self.pokedex.match(guess, GUESS_TYPO_TOLERANCE.get(self.mode, 0))
+
+    # a whole round worked out ahead of time: the draw, what counts as right, and the prompt
+    # from the question bank when there is one (and it has this mode), drawn live otherwise
+    def prepare(self):
+        served = self.bank.serve(self) if self.bank is not None else None
+        if served:
+            round, answers, difficulty, seq = served
+        else:
+            round = self.draw()
+            if round is None:
+                return None
+            answers = self.answers(round)
+            difficulty, seq = self.difficulty(round, answers), None
+
+        question = {'mode': self.mode, 'ask': self.ask, 'difficulty': DIFFICULTIES[difficulty]}
+        if seq is not None:
+            question['bank_seq'] = seq
+        question.update(self.show(round))
+        return round, answers, question
+
+    # tops the queue back up to prefetch rounds, a pool that ran dry just leaves it short
+    def fill(self):
+        while len(self.upcoming) < self.prefetch:
+            prepared = self.prepare()
+            if prepared is None:
+                break
+            self.upcoming.append(prepared)
+
+    # hands out the next round, None when there is nothing to ask
+    def next_question(self):
+        self.current = self.upcoming.popleft() if self.upcoming else self.prepare()
+        if self.current is None:
+            return None
+        question = self.current[2]
+        # a bank question only counts as served once it's handed out, not when it was lined up
+        if 'bank_seq' in question:
+            self.bank.shown(self.user_id, self.mode_id, question['bank_seq'])
+        return question
+
+    # checks the answer to the open round and queues it to be saved
+    def submit(self, answer):
+        if self.current is None:
+            raise RuntimeError("no open question, call next_question first")
+
+        round, answers, question = self.current
+        outcome, params = self.check(round, answers, str(answer).strip())
+        score = self.points if outcome['correct'] else 0
+        if self.writer is not None:
+            self.writer.record_round(self.user_id, self.mode_id, score, outcome['correct'],
+                                     self.insert, (self.user_id,) + params + (outcome['correct'], score),
+                                     question.get('bank_seq'))
+        self.current = None
+        # the next round gets lined up now, so "play again" has it ready. From the bank that
+        # means database reads, so the caller runs fill() once the result is out instead
+        if self.bank is None:
+            self.fill()
+
+        result = {'mode': self.mode, 'score': score}
+        result.update(outcome)
+        return result
+
+    # the parts each game fills in:
+    # draw() -> the round's data or None, show(round) -> what the player sees,
+    # answers(round) -> the pokemon ids (or yes/no) that count as right,
+    # check(round, answers, answer) -> (outcome, the leaderboard row between user_id and is_correct)
+    def draw(self):
+        raise NotImplementedError
+
+    def show(self, round):
+        raise NotImplementedError
+
+    def answers(self, round):
+        raise NotImplementedError
+
+    def check(self, round, answers, answer):
+        raise NotImplementedError
+
+    # 1-3, the more pokemon count as right the easier it is
+    def difficulty(self, round, answers):
+        if len(answers) >= 10:
+            return 1
+        return 2 if len(answers) >= 3 else 3
+
+    # a round as a question_bank row (pokemon1_id, pokemon2_id, detail_id) and back again,
+    # the one pokemon it was drawn from for most games
+    def bank_row(self, row):
+        return row["pokemon_id"], None, None
+
+    def from_bank(self, pokemon1_id, pokemon2_id, detail_id):
+        return self.pokedex.get(pokemon1_id)
+
+
+# the games that show two pokemon store both
+class PairQuiz(QuizEngine):
+
+    def bank_row(self, round):
+        return round[0]["pokemon_id"], round[1]["pokemon_id"], None
+
+    def from_bank(self, pokemon1_id, pokemon2_id, detail_id):
+        pair = [self.pokedex.get(pokemon1_id), self.pokedex.get(pokemon2_id)]
+        return pair if all(pair) else None
+
+
+# the older the pokemon the more people know it by heart
+def generation_difficulty(row):
+    generation = row["generation"] or 9
+    if generation <= 2:
+        return 1
+    return 2 if generation <= 5 else 3
+
+
+class WeightQuiz(PairQuiz):
+
+    mode = 'guess_weight'
+    title = "\n===== WHICH POKEMON WEIGHS MORE? ====="
+    label = "weight"
+    ask = "Your choice (1 or 2): "
+    empty_message = "Not enough Pokémon found."
+    points = 100
+    insert = """
+        INSERT INTO leaderboard_guess_weight (
+            user_id,
+            pokemon1_id,
+            pokemon2_id,
+            user_choice_id,
+            correct_pokemon_id,
+            is_correct,
+            score
+        )
+        VALUES (%s, %s, %s, %s, %s, %s, %s);
+    """
+
+    # from the weight pair table so easy, medium and hard come up equally often,
+    # any level of it when the asked for one has no pairs, a plain random pair only if it's empty
+    def draw(self):
+        rng = self.sampler.rng
+        weight_pairs = self.pokedex.weight_pairs
+        pair = weight_pairs.draw(rng, self.level) or weight_pairs.draw(rng) or self.sampler.draw_pair('all')
+        return pair if len(pair) == 2 else None
+
+    def show(self, round):
+        p1, p2 = round
+        return {
+            'prompt': f"Choose which one is heavier:\n1. {p1['name']}\n2. {p2['name']}",
+            'choices': [p1["name"], p2["name"]],
+        }
+
+    def answers(self, round):
+        p1, p2 = round
+        return frozenset((p1["pokemon_id"] if p1["weight"] > p2["weight"] else p2["pokemon_id"],))
+
+    def check(self, round, answers, answer):
+        if answer not in ("1", "2"):
+            raise InvalidAnswer("Invalid choice. Please enter 1 or 2.")
+        p1, p2 = round
+        user_choice = p1 if answer == "1" else p2
+        correct_pokemon = p1 if p1["pokemon_id"] in answers else p2
+        is_correct = (user_choice["pokemon_id"] in answers)
+        outcome = {
+            'correct': is_correct,
+            'answer': correct_pokemon["name"],
+            'guessed': user_choice["name"],
+            'message': f"{'Correct' if is_correct else 'Wrong'}! The heavier Pokémon is: {correct_pokemon['name']}",
+        }
+        return outcome, (p1["pokemon_id"], p2["pokemon_id"], user_choice["pokemon_id"], correct_pokemon["pokemon_id"])
+
+    # 4x heavier is easy to call, within 1.5x is a coin flip for most people
+    def difficulty(self, round, answers):
+        light, heavy = sorted(p["weight"] or 0 for p in round)
+        if not light or heavy / light >= EASY_RATIO:
+            return 1
+        return 2 if heavy / light >= MEDIUM_RATIO else 3
+
+
+class StatsQuiz(QuizEngine):
+
+    mode = 'guess_stats'
+    title = "\n=== Guess the Pokémon From Its Stats ==="
+    label = "stat"
+    empty_message = "No valid Pokémon with stats found in database."
+    points = 600
+    insert = """
+        INSERT INTO leaderboard_guess_stats (
+            user_id,
+            pokemon_id,
+            is_correct,
+            score
+        )
+        VALUES (%s, %s, %s, %s);
+    """
+
+    def draw(self):
+        return self.sampler.draw('stats')
+
+    def show(self, row):
+        return {
+            'prompt': "Here are the stats of a Pokémon:",
+            'stats': {
+                "HP": row["hp"],
+                "Attack": row["attack"],
+                "Defense": row["defense"],
+                "Sp. Atk": row["sp_atk"],
+                "Sp. Def": row["sp_def"],
+                "Speed": row["speed"],
+                "Total": row["total"],
+            },
+        }
+
+    # any pokemon with the exact same stat line counts, not just the one we drew
+    def answers(self, row):
+        return self.pokedex.stat_answers(row)
+
+    def check(self, row, answers, answer):
+        guessed = self.resolve(answer)
+        is_correct = (guessed is not None and guessed["pokemon_id"] in answers)
+        if not is_correct:
+            message = f"Wrong! The Pokémon was {row['name']}."
+        elif guessed["pokemon_id"] == row["pokemon_id"]:
+            message = f"Correct! The Pokémon was {row['name']}!"
+        else:
+            message = f"Correct! {guessed['name']} has the exact same stats as {row['name']}!"
+        outcome = {'correct': is_correct, 'answer': row["name"],
+                   'guessed': guessed["name"] if guessed else None, 'message': message}
+        return outcome, (row["pokemon_id"],)
+
+    def difficulty(self, row, answers):
+        return generation_difficulty(row)
+
+
+class SpeciesQuiz(QuizEngine):
+
+    mode = 'guess_species'
+    title = "\n=== Guess the Pokémon from Species ==="
+    label = "species"
+    empty_message = "No valid Pokémon species found in database."
+    points = 200
+    insert = """
+        INSERT INTO leaderboard_guess_species (
+            user_id,
+            given_species,
+            guessed_pokemon_id,
+            is_correct,
+            score
+        )
+        VALUES (%s, %s, %s, %s, %s);
+    """
+
+    def draw(self):
+        return self.sampler.draw('species')
+
+    def show(self, row):
+        return {
+            'prompt': f"Species: {row['species']}\nName any Pokémon that belongs to this species.",
+            'species': row["species"],
+        }
+
+    def answers(self, row):
+        return self.pokedex.species_answers(row["species"])
+
+    def check(self, row, answers, answer):
+        guessed = self.resolve(answer)
+        is_correct = (guessed is not None and guessed["pokemon_id"] in answers)
+        if is_correct:
+            message = f"Correct! {guessed['name']} belongs to the species '{row['species']}'!"
+        else:
+            # show one correct answer
+            message = f"Wrong! A correct answer is: {row['name']} (species: {row['species']})"
+        outcome = {'correct': is_correct, 'answer': row["name"],
+                   'guessed': guessed["name"] if guessed else None, 'message': message}
+        # a guess that isn't a pokemon is recorded as the right one so the row is never NULL
+        return outcome, (row["species"], guessed["pokemon_id"] if guessed else row["pokemon_id"])
+
+
+class EggGroupQuiz(PairQuiz):
+
+    mode = 'guess_egg_group'
+    title = "\n=== Guess if Pokémon Share an Egg Group ==="
+    label = "egg group"
+    ask = "Your answer (yes/no): "
+    empty_message = "Not enough Pokémon with egg group data found."
+    points = 100
+    insert = """
+        INSERT INTO leaderboard_guess_egg_group (
+            user_id,
+            pokemon1_id,
+            pokemon2_id,
+            share_egg_group,
+            user_answer,
+            is_correct,
+            score
+        )
+        VALUES (%s, %s, %s, %s, %s, %s, %s);
+    """
+
+    # from the egg group matrix, "yes" EGG_YES_RATIO of the time instead of hardly ever
+    # when no pair at the asked for level turns up it takes one of any level with the same answer,
+    # so the yes/no split holds, and only goes to a plain random pair if the matrix has none
+    def draw(self):
+        rng = self.sampler.rng
+        answers = frozenset(("yes",) if rng.random() < EGG_YES_RATIO else ("no",))
+        share = "yes" in answers
+        egg_matrix = self.pokedex.egg_matrix
+        pair = []
+        if self.level is not None:
+            pair = egg_matrix.draw(rng, share, lambda pair: self.difficulty(pair, answers) == self.level)
+        pair = pair or egg_matrix.draw(rng, share) or self.sampler.draw_pair('egg_groups')
+        return pair if len(pair) == 2 else None
+
+    def show(self, round):
+        p1, p2 = round
+        return {
+            'prompt': f"Pokémon 1: {p1['name']}\nPokémon 2: {p2['name']}\n\n"
+                      "Do these two Pokémon share at least one egg group?",
+            'pokemon': [p1["name"], p2["name"]],
+        }
+
+    # yes when they share any egg group
+    def answers(self, round):
+        p1, p2 = round
+        p1_groups = {p1["egg_group1_id"], p1["egg_group2_id"]} - {None}
+        p2_groups = {p2["egg_group1_id"], p2["egg_group2_id"]} - {None}
+        return frozenset(("yes",) if p1_groups & p2_groups else ("no",))
+
+    def check(self, round, answers, answer):
+        answer = answer.lower()
+        if answer not in ("yes", "y", "no", "n"):
+            raise InvalidAnswer("Please enter 'yes' or 'no'.")
+        p1, p2 = round
+        share_egg_group = "yes" in answers
+        user_answer = answer in ("yes", "y")
+        is_correct = (user_answer == share_egg_group)
+        outcome = {
+            'correct': is_correct,
+            'answer': "yes" if share_egg_group else "no",
+            'guessed': "yes" if user_answer else "no",
+            'message': f"{'Correct' if is_correct else 'Wrong'}! They "
+                       f"{'share' if share_egg_group else 'do not share'} an egg group.",
+        }
+        return outcome, (p1["pokemon_id"], p2["pokemon_id"], share_egg_group, user_answer)
+
+    # people guess from how alike they look, so it's hard when sharing a type
+    # and sharing an egg group disagree (a Water type that can't breed with another one)
+    def difficulty(self, round, answers):
+        p1, p2 = round
+        share_type = bool({p1["type1_id"], p1["type2_id"]} & {p2["type1_id"], p2["type2_id"]} - {None})
+        return 1 if share_type == ("yes" in answers) else 3
+
+
+class DexNumQuiz(QuizEngine):
+
+    mode = 'guess_dexnum'
+    title = "\n=== Guess the Pokémon from Dex Number ==="
+    label = "dex number"
+    empty_message = "No valid Pokémon with dex numbers found in database."
+    points = 300
+    insert = """
+        INSERT INTO leaderboard_guess_dexnum (
+            user_id,
+            shown_dex,
+            user_choice_id,
+            correct_pokemon_id,
+            is_correct,
+            score
+        )
+        VALUES (%s, %s, %s, %s, %s, %s);
+    """
+
+    def draw(self):
+        return self.sampler.draw('all')
+
+    def show(self, row):
+        return {
+            'prompt': f"Dex Number: #{row['pokemon_id']}\nName the Pokémon that has this dex number.",
+            'dex_number': row["pokemon_id"],
+        }
+
+    def answers(self, row):
+        return frozenset((row["pokemon_id"],))
+
+    def check(self, row, answers, answer):
+        dex_number = row["pokemon_id"]
+        guessed = self.resolve(answer)
+        is_correct = (guessed is not None and guessed["pokemon_id"] in answers)
+        outcome = {
+            'correct': is_correct,
+            'answer': row["name"],
+            'guessed': guessed["name"] if guessed else None,
+            'message': f"{'Correct' if is_correct else 'Wrong'}! #{dex_number} is {row['name']}{'!' if is_correct else '.'}",
+        }
+        return outcome, (dex_number, guessed["pokemon_id"] if guessed else dex_number, dex_number)
+
+    def difficulty(self, row, answers):
+        return generation_difficulty(row)
+
+
+class AbilityQuiz(QuizEngine):
+
+    mode = 'guess_ability'
+    title = "\n=== Guess a Pokémon with the Given Ability ==="
+    label = "ability"
+    empty_message = "No valid Pokémon with abilities found in database."
+    points = 250
+    insert = """
+        INSERT INTO leaderboard_guess_ability (
+            user_id,
+            ability_id,
+            guessed_pokemon_id,
+            is_correct,
+            score
+        )
+        VALUES (%s, %s, %s, %s, %s);
+    """
+
+    # the pokemon plus one of its abilities, picked with the sampler's rng so a seeded session repeats
+    def draw(self):
+        row = self.sampler.draw('abilities')
+        if not row:
+            return None
+        abilities_available = [
+            (row[id_col], row[name_col])
+            for id_col, name_col in (("ability1_id", "ability1"), ("ability2_id", "ability2"),
+                                     ("hidden_ability_id", "hidden_ability"))
+            if row[id_col]
+        ]
+        ability_id, ability_name = self.sampler.rng.choice(abilities_available)
+        return row, ability_id, ability_name
+
+    def show(self, round):
+        _, _, ability_name = round
+        return {
+            'prompt': f"Ability: {ability_name}\nName any Pokémon that has this ability.",
+            'ability': ability_name,
+        }
+
+    def answers(self, round):
+        return self.pokedex.ability_answers(round[1])
+
+    def check(self, round, answers, answer):
+        row, ability_id, ability_name = round
+        guessed = self.resolve(answer)
+        is_correct = (guessed is not None and guessed["pokemon_id"] in answers)
+        if is_correct:
+            message = f"Correct! {guessed['name']} has the ability '{ability_name}'!"
+        else:
+            message = f"Wrong! A correct answer is: {row['name']} (ability: {ability_name})"
+        outcome = {'correct': is_correct, 'answer': row["name"],
+                   'guessed': guessed["name"] if guessed else None, 'message': message}
+        return outcome, (ability_id, guessed["pokemon_id"] if guessed else row["pokemon_id"])
+
+    # the ability shown goes in detail_id
+    def bank_row(self, round):
+        row, ability_id, _ = round
+        return row["pokemon_id"], None, ability_id
+
+    def from_bank(self, pokemon1_id, pokemon2_id, detail_id):
+        row = self.pokedex.get(pokemon1_id)
+        if row is None:
+            return None
+        for id_col, name_col in (("ability1_id", "ability1"), ("ability2_id", "ability2"),
+                                 ("hidden_ability_id", "hidden_ability")):
+            if row[id_col] == detail_id:
+                return row, detail_id, row[name_col]
+        return None
+
+
+class TypeQuiz(QuizEngine):
+
+    mode = 'guess_type'
+    title = "\n=== Guess a Pokémon with the Given Type(s) ==="
+    label = "type"
+    empty_message = "No valid Pokémon with types found in database."
+    points = 300
+    insert = """
+        INSERT INTO leaderboard_guess_type (
+            user_id,
+            type1_id,
+            type2_id,
+            guessed_pokemon_id,
+            is_correct,
+            score
+        )
+        VALUES (%s, %s, %s, %s, %s, %s);
+    """
+
+    def draw(self):
+        return self.sampler.draw('types')
+
+    # dual types need both, a single type just needs that one
+    def show(self, row):
+        if row["type2_id"]:
+            prompt = f"Types: {row['type1']} / {row['type2']}\nName any Pokémon that has BOTH of these types."
+            types = [row["type1"], row["type2"]]
+        else:
+            prompt = f"Type: {row['type1']}\nName any Pokémon that has this type."
+            types = [row["type1"]]
+        return {'prompt': prompt, 'types': types}
+
+    def answers(self, row):
+        return self.pokedex.type_answers(row["type1_id"], row["type2_id"])
+
+    def check(self, row, answers, answer):
+        guessed = self.resolve(answer)
+        is_correct = (guessed is not None and guessed["pokemon_id"] in answers)
+        if is_correct:
+            message = f"Correct! {guessed['name']} matches the required type(s)."
+        else:
+            message = f"Wrong! An example answer: {row['name']}."
+        outcome = {'correct': is_correct, 'answer': row["name"],
+                   'guessed': guessed["name"] if guessed else None, 'message': message}
+        # the pokemon we drew always has the typing, so it stands in for a guess that isn't a pokemon
+        return outcome, (row["type1_id"], row["type2_id"], guessed["pokemon_id"] if guessed else row["pokemon_id"])
+
+
+# mode_name -> engine, same names as the game_modes table
+ENGINES = {engine.mode: engine for engine in (
+    StatsQuiz, WeightQuiz, SpeciesQuiz, EggGroupQuiz, DexNumQuiz, AbilityQuiz, TypeQuiz
+)}
+
+
+# --------------------------------------------------------------------
+# REPLAY
+# --------------------------------------------------------------------
+
+def read_sessions(path):
+    with open(path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            session = json.loads(line)
+            if session.get('mode') not in ENGINES:
+                raise ValueError(f"{path}:{line_no}: unknown mode {session.get('mode')!r}")
+            yield session
+
+# plays one scripted session, one round per answer, and yields every answer's question and result
+def play_session(session, pokedex, writer=None, bank=None):
+    from sampler import Sampler
+
+    seed = session.get('seed')
+    sampler = Sampler(pokedex, random.Random(seed) if seed is not None else None)
+    engine = ENGINES[session['mode']](session.get('user_id'), pokedex, sampler, writer, bank=bank)
+    question = None
+    for answer in session.get('answers', []):
+        if question is None:
+            question = engine.next_question()
+            if question is None:
+                return
+        try:
+            result = engine.submit(answer)
+        except InvalidAnswer as e:
+            # nothing gets recorded and the next answer is for the same question,
+            # same as the menus asking again
+            yield question, {'mode': engine.mode, 'error': str(e)}
+            continue
+        yield question, result
+        question = None
+
+def replay(path, pokedex, writer=None, out=None, bank=None):
+    from tabulate import tabulate
+
+    totals = {}
+    started = time.perf_counter()
+    for session in read_sessions(path):
+        for question, result in play_session(session, pokedex, writer, bank):
+            t = totals.setdefault(result['mode'], {'rounds': 0, 'correct': 0, 'invalid': 0, 'score': 0})
+            if 'error' in result:
+                t['invalid'] += 1
+            else:
+                t['rounds'] += 1
+                t['correct'] += result['correct']
+                t['score'] += result['score']
+            if out:
+                out.write(json.dumps({'user_id': session.get('user_id'), 'question': question,
+                                      'result': result}, ensure_ascii=False) + '\n')
+    # the rounds aren't played until they're saved
+    if writer is not None:
+        writer.flush()
+    elapsed = time.perf_counter() - started
+
+    rounds = sum(t['rounds'] for t in totals.values())
+    table = [[mode, t['rounds'], t['correct'], t['invalid'], t['score']] for mode, t in sorted(totals.items())]
+    print(tabulate(table, headers=["MODE", "ROUNDS", "CORRECT", "INVALID", "SCORE"], tablefmt="grid"))
+    print(f"{rounds} rounds in {elapsed:.2f}s ({rounds / elapsed if elapsed else 0:.0f} rounds/s)")
+    return totals
+
+
+def main(argv=None):
+    from pokedex import Pokedex
+    from question_bank import QuestionBank
+    from results import ResultWriter
+    from storage import open_pool
+
+    parser = argparse.ArgumentParser(description="Replay scripted quiz sessions from a JSONL file.")
+    parser.add_argument("sessions", help="JSONL file, one session per line")
+    parser.add_argument("--no-save", action="store_true", help="check the answers without saving any rounds")
+    parser.add_argument("--out", help="write every question and result here as JSONL")
+    parser.add_argument("--bank", action="store_true", help="serve the questions from the question bank")
+    args = parser.parse_args(argv)
+
+    pool = open_pool()
+    with pool.cursor() as cursor:
+        pokedex = Pokedex.load(cursor)
+    # built before the clock starts so rounds/s is about the rounds
+    pokedex.matcher
+    writer = None if args.no_save else ResultWriter(pool, batch_size=500)
+
+    out = open(args.out, 'w', encoding='utf-8') if args.out else None
+    try:
+        replay(args.sessions, pokedex, writer, out, QuestionBank(pool) if args.bank else None)
+    finally:
+        if out:
+            out.close()
+        if writer is not None:
+            writer.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
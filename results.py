@@ -0,0 +1,158 @@
+# results.py
+# Write-behind buffer for quiz rounds.
+# Games hand their rounds to the ResultWriter instead of inserting and committing
+# on the spot, and a background thread saves them in batches with executemany.
+# One commit per batch instead of two commits per round.
+
+import sys
+import threading
+import time
+
+from leaderboards import update_totals
+from storage import db_rejections
+
+
+GENERAL_INSERT = """
+    INSERT INTO leaderboard_general (
+        user_id, mode_id, score, correct, incorrect, bank_seq
+    )
+    VALUES (%s, %s, %s, %s, %s, %s);
+"""
+
+
+class ResultWriter:
+
+    # on_commit gets called with the leaderboard_general rows (user_id, mode_id, score,
+    # correct, incorrect) of every batch that was saved, that's how the leaderboard
+    # cache and the scoreboards find out about new rounds
+    # a batch the database turns down (a bad row) gets written one round at a time and only
+    # the rounds it rejects are dropped (and printed), anything else (the database being
+    # down) keeps the rounds queued and the background flushes back off up to max_backoff seconds
+    def __init__(self, pool, batch_size=50, flush_interval=2.0, on_commit=None, max_backoff=60.0):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_commit = on_commit
+        self.max_backoff = max_backoff
+        # failed flushes in a row, and when the background thread should try again
+        self.failures = 0
+        self.retry_at = 0.0
+
+        self.pending = []
+        self.lock = threading.Lock()
+        # only one flush talks to the database at a time so batches land in order
+        self.flush_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = False
+
+        self.thread = threading.Thread(target=self._run, name='result-writer', daemon=True)
+        self.thread.start()
+
+    # queues one round, mode_insert/mode_params is the row for the game's own leaderboard
+    # and the leaderboard_general row gets built from the rest
+    # bank_seq is the question_bank question it was, None for a round drawn live
+    def record_round(self, user_id, mode_id, score, is_correct, mode_insert, mode_params, bank_seq=None):
+        with self.lock:
+            self.pending.append((user_id, mode_id, score, is_correct, mode_insert, tuple(mode_params), bank_seq))
+            full = len(self.pending) >= self.batch_size
+        if full:
+            self.wake.set()
+
+    # background loop, flushes when the batch is full or every flush_interval seconds
+    def _run(self):
+        while not self.stopping:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            if time.monotonic() < self.retry_at:
+                continue
+            try:
+                self.flush()
+            except Exception:
+                # database hiccup, the rounds were put back and a later flush tries again
+                pass
+
+    # saves everything queued so far, returns how many rounds were written
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                batch, self.pending = self.pending, []
+            if not batch:
+                return 0
+
+            try:
+                general = self._write(batch)
+            except db_rejections():
+                # some row in there is bad, find it instead of retrying the whole batch forever
+                return self._write_each(batch)
+            except Exception:
+                self._put_back(batch)
+                raise
+
+            self.failures = 0
+            if self.on_commit:
+                self.on_commit(general)
+            return len(batch)
+
+    # puts rounds back in front so nothing is lost or reordered, and backs off the next try
+    def _put_back(self, rounds):
+        with self.lock:
+            self.pending[:0] = rounds
+        self.failures += 1
+        self.retry_at = time.monotonic() + min(self.flush_interval * 2 ** self.failures, self.max_backoff)
+
+    # a batch with a bad row in it, saves the rounds the database takes and drops the ones it rejects
+    def _write_each(self, batch):
+        saved = 0
+        for i, round in enumerate(batch):
+            try:
+                general = self._write([round])
+            except db_rejections() as e:
+                user_id, mode_id, score, is_correct, mode_insert, mode_params, _ = round
+                print(f"result-writer: dropped a round the database rejected "
+                      f"(user {user_id}, mode {mode_id}, params {mode_params}): {e}", file=sys.stderr)
+                continue
+            except Exception:
+                # lost the database halfway through, the rest waits for the next flush
+                self._put_back(batch[i:])
+                raise
+            saved += 1
+            if self.on_commit:
+                self.on_commit(general)
+        self.failures = 0
+        return saved
+
+    # one transaction for the whole batch, one executemany per table
+    def _write(self, batch):
+        by_table = {}
+        general = []
+        bank_seqs = []
+        for user_id, mode_id, score, is_correct, mode_insert, mode_params, bank_seq in batch:
+            by_table.setdefault(mode_insert, []).append(mode_params)
+            if mode_id:
+                general.append((user_id, mode_id, score, 1 if is_correct else 0, 0 if is_correct else 1))
+                bank_seqs.append(bank_seq)
+
+        with self.pool.cursor() as cursor:
+            for mode_insert, rows in by_table.items():
+                cursor.executemany(mode_insert, rows)
+            if general:
+                cursor.executemany(GENERAL_INSERT, [row + (seq,) for row, seq in zip(general, bank_seqs)])
+                # running totals go in the same transaction so they can't drift from the history
+                update_totals(cursor, general)
+        return general
+
+    # stops the background thread and saves whatever is left, used when the app exits
+    def close(self):
+        self.stopping = True
+        self.wake.set()
+        self.thread.join(timeout=self.flush_interval + 1)
+        # gives the database about 15s to come back, waiting longer each time
+        for delay in (1, 2, 4, 8, 0):
+            try:
+                self.flush()
+                return
+            except Exception as e:
+                error = e
+            if delay:
+                time.sleep(delay)
+        print(f"result-writer: {len(self.pending)} rounds could not be saved before exit: {error}", file=sys.stderr)
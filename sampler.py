@@ -0,0 +1,81 @@
+# sampler.py
+# Picks random pokemon for the quiz questions without going to MySQL.
+# Replaces the old ORDER BY RAND() queries, every draw is constant time.
+
+import random
+
+
+# hands out every item once, in a random order, before any of them repeat
+# works like a shuffle that is done one step at a time (Fisher-Yates),
+# so each draw is O(1) and there is no big reshuffle at the start
+class ShuffleBag:
+
+    def __init__(self, items, rng=None):
+        self.items = list(items)
+        self.rng = rng or random.Random()
+        # everything before this index has not been handed out yet in this pass
+        self.remaining = len(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def draw(self):
+        if not self.items:
+            return None
+
+        # pool is used up, start a new pass over everything
+        if self.remaining == 0:
+            self.remaining = len(self.items)
+
+        i = self.rng.randrange(self.remaining)
+        self.remaining -= 1
+        last = self.remaining
+        self.items[i], self.items[last] = self.items[last], self.items[i]
+        return self.items[last]
+
+    # two DIFFERENT items, used by the games that compare two pokemon
+    def draw_pair(self):
+        if len(self.items) < 2:
+            return []
+
+        first = self.draw()
+        second = self.draw()
+        # can only be the same one when the bag refilled between the draws,
+        # and the first one is gone from the new pass so one redraw fixes it
+        if second is first:
+            second = self.draw()
+        return [first, second]
+
+
+# the pokemon each game draws from, named after the Pokedex pools
+POOLS = {
+    'all': 'entries',
+    'stats': 'with_stats',
+    'species': 'with_species',
+    'types': 'with_types',
+    'abilities': 'with_abilities',
+    'egg_groups': 'with_egg_groups',
+}
+
+
+# one of these per player session, keeps a separate bag per pool
+# so a player won't see the same pokemon again until they have seen them all
+class Sampler:
+
+    def __init__(self, pokedex, rng=None):
+        self.pokedex = pokedex
+        self.rng = rng or random.Random()
+        self.bags = {}
+
+    def bag(self, pool):
+        if pool not in self.bags:
+            self.bags[pool] = ShuffleBag(getattr(self.pokedex, POOLS[pool]), self.rng)
+        return self.bags[pool]
+
+    # one random pokemon from the pool, None if the pool is empty
+    def draw(self, pool='all'):
+        return self.bag(pool).draw()
+
+    # two different random pokemon from the pool
+    def draw_pair(self, pool='all'):
+        return self.bag(pool).draw_pair()
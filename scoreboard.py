@@ -0,0 +1,221 @@
+# scoreboard.py
+# Ranked scoreboards kept in memory, one overall and one per game mode.
+# Every board is an indexable skip list (each link knows how many players it
+# skips over), so "what is my rank", "who is #k" and "five above/below me"
+# are all O(log n) instead of sorting everybody's total score.
+
+import random
+import threading
+
+
+class _Node:
+
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, height):
+        self.key = key
+        self.next = [None] * height
+        # width[i] = how many players next[i] jumps over (counting the one it lands on)
+        self.width = [1] * height
+
+
+class IndexableSkipList:
+
+    MAX_LEVEL = 32
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self.size = 0
+        # NIL sits past the last player so every link always points at a real node
+        self.nil = _Node(None, 0)
+        self.head = _Node(None, self.MAX_LEVEL)
+        self.head.next = [self.nil] * self.MAX_LEVEL
+
+    def __len__(self):
+        return self.size
+
+    def _random_height(self):
+        height = 1
+        while height < self.MAX_LEVEL and self.rng.random() < 0.5:
+            height += 1
+        return height
+
+    # the last node before key on every level, and how far along each of them is
+    def _predecessors(self, key):
+        update = [None] * self.MAX_LEVEL
+        positions = [0] * self.MAX_LEVEL
+        node = self.head
+        pos = 0
+        for level in reversed(range(self.MAX_LEVEL)):
+            while node.next[level] is not self.nil and node.next[level].key < key:
+                pos += node.width[level]
+                node = node.next[level]
+            update[level] = node
+            positions[level] = pos
+        return update, positions
+
+    def insert(self, key):
+        update, positions = self._predecessors(key)
+        pos = positions[0]
+        height = self._random_height()
+        new = _Node(key, height)
+        for level in range(height):
+            prev = update[level]
+            steps = pos - positions[level]
+            new.next[level] = prev.next[level]
+            new.width[level] = prev.width[level] - steps
+            prev.next[level] = new
+            prev.width[level] = steps + 1
+        for level in range(height, self.MAX_LEVEL):
+            update[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, key):
+        update, _ = self._predecessors(key)
+        target = update[0].next[0]
+        if target is self.nil or target.key != key:
+            raise KeyError(key)
+        height = len(target.next)
+        for level in range(height):
+            prev = update[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(height, self.MAX_LEVEL):
+            update[level].width[level] -= 1
+        self.size -= 1
+
+    # 0-based position of key, None if it isn't in the list
+    def index(self, key):
+        update, positions = self._predecessors(key)
+        node = update[0].next[0]
+        if node is self.nil or node.key != key:
+            return None
+        return positions[0]
+
+    # the node at 0-based position i
+    def _node_at(self, i):
+        node = self.head
+        remaining = i + 1
+        for level in reversed(range(self.MAX_LEVEL)):
+            while node.next[level] is not self.nil and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.size:
+            raise IndexError(i)
+        return self._node_at(i).key
+
+    # keys from position start up to (not including) stop, O(log n + stop - start)
+    def slice(self, start, stop):
+        start = max(start, 0)
+        stop = min(stop, self.size)
+        if start >= stop:
+            return []
+        node = self._node_at(start)
+        keys = []
+        for _ in range(stop - start):
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class RankedScores:
+
+    # ordered like the general leaderboard, score then games played, both descending,
+    # and user_id last so every player has their own spot
+    @staticmethod
+    def _key(user_id, score, games):
+        return (-score, -games, user_id)
+
+    def __init__(self):
+        self.ranks = IndexableSkipList()
+        # user_id -> (total_score, total_games)
+        self.totals = {}
+
+    def __len__(self):
+        return len(self.ranks)
+
+    def add(self, user_id, score, games=1):
+        old = self.totals.get(user_id)
+        if old:
+            self.ranks.remove(self._key(user_id, *old))
+            score, games = old[0] + score, old[1] + games
+        self.totals[user_id] = (score, games)
+        self.ranks.insert(self._key(user_id, score, games))
+
+    # 1-based rank, None if the player hasn't played yet
+    def rank(self, user_id):
+        totals = self.totals.get(user_id)
+        if totals is None:
+            return None
+        return self.ranks.index(self._key(user_id, *totals)) + 1
+
+    # how many percent of players this player is ahead of (or tied with)
+    def percentile(self, user_id):
+        rank = self.rank(user_id)
+        if rank is None:
+            return None
+        return 100.0 * (len(self) - rank + 1) / len(self)
+
+    def _entries(self, start, stop):
+        start = max(start, 0)
+        return [
+            {'rank': start + i + 1, 'user_id': user_id, 'total_score': -neg_score, 'total_games': -neg_games}
+            for i, (neg_score, neg_games, user_id) in enumerate(self.ranks.slice(start, stop))
+        ]
+
+    def top(self, k=10):
+        return self._entries(0, k)
+
+    # the player plus up to `spread` players above and below them
+    def around(self, user_id, spread=5):
+        rank = self.rank(user_id)
+        if rank is None:
+            return []
+        return self._entries(rank - 1 - spread, rank + spread)
+
+
+# board name for everything added up, the per-mode boards are keyed by mode_id
+OVERALL = 'overall'
+
+class Scoreboard:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.boards = {OVERALL: RankedScores()}
+
+    # fills the boards from leaderboard_mode_totals, which is leaderboard_general summed
+    # per user per mode (one row each instead of every round ever played)
+    def seed(self, cursor):
+        cursor.execute("""
+            SELECT user_id, mode_id, total_score, total_games
+            FROM leaderboard_mode_totals;
+        """)
+        with self.lock:
+            self.boards = {OVERALL: RankedScores()}
+            for r in cursor.fetchall():
+                self.boards.setdefault(r["mode_id"], RankedScores()).add(
+                    r["user_id"], int(r["total_score"]), int(r["total_games"]))
+                self.boards[OVERALL].add(r["user_id"], int(r["total_score"]), int(r["total_games"]))
+
+    # adds saved leaderboard_general rows (user_id, mode_id, score, correct, incorrect)
+    def add_rounds(self, rows):
+        with self.lock:
+            for user_id, mode_id, score, _, _ in rows:
+                self.boards.setdefault(mode_id, RankedScores()).add(user_id, score)
+                self.boards[OVERALL].add(user_id, score)
+
+    # rank, percentile, and the players around one player on one board
+    def standing(self, user_id, mode_id=OVERALL, spread=5):
+        with self.lock:
+            board = self.boards.get(mode_id)
+            if board is None or board.rank(user_id) is None:
+                return None
+            return {
+                'rank': board.rank(user_id),
+                'players': len(board),
+                'percentile': board.percentile(user_id),
+                'around': board.around(user_id, spread),
+            }
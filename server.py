@@ -0,0 +1,331 @@
+# server.py
+# Hosts the quiz for many players at once from one process.
+# Every connection gets its own Session (who is logged in, their sampler and the
+# game they are playing) instead of project.py's current_user, and shares the
+# pool, pokedex, scoreboards, leaderboard cache and result writer with everyone else.
+# Anything that talks to the database runs on a bounded thread pool the same size as
+# the connection pool, the games and searches work off the in-memory pokedex.
+#
+# python server.py                          -> TCP on 127.0.0.1:7878
+# python server.py --host 0.0.0.0 --port 9000
+# python server.py --unix /tmp/pokequiz.sock
+#
+# the protocol is one JSON object per line each way, "id" is optional and comes back as is:
+# -> {"id": 1, "op": "login", "identifier": "ash", "password": "pikachu"}
+# <- {"id": 1, "ok": true, "user": {...}}
+# <- {"id": 1, "ok": false, "error": "Invalid username/email or password."}
+#
+# ops: ping, login, logout, modes, play {mode, level: easy/medium/hard}, next, answer {answer}, stop,
+#      leaderboard {board: general/day/week/month, mode}, ranking, search {name},
+#      partners {name}, chain {start, end}
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from leaderboards import PERIODS, period_start
+from quiz import DIFFICULTIES, ENGINES, InvalidAnswer
+from sampler import Sampler
+from storage import db_errors
+
+
+HOST = os.environ.get('POKEQUIZ_HOST', '127.0.0.1')
+PORT = int(os.environ.get('POKEQUIZ_PORT', '7878'))
+# threads for database calls, one per pooled connection so none of them wait on the pool
+DB_WORKERS = int(os.environ.get('POKEQUIZ_POOL_SIZE', '5'))
+# longest request line we read, anything bigger drops the connection
+MAX_LINE = 64 * 1024
+
+
+# a request we can't do, the message goes back to the client as the error
+class RequestError(Exception):
+    pass
+
+
+# one per connection, what the CLI keeps in module globals
+class Session:
+
+    def __init__(self):
+        self.user = None
+        self.sampler = None
+        self.engine = None
+        # the bank engine lining up its next round after an answer, see answer
+        self.refill = None
+
+    def require_user(self):
+        if self.user is None:
+            raise RequestError("Log in first.")
+        return self.user
+
+    def require_engine(self):
+        if self.engine is None:
+            raise RequestError("Pick a game with play first.")
+        return self.engine
+
+
+class QuizServer:
+
+    # app is project.py, it owns the shared pool/pokedex/scoreboard/writer
+    def __init__(self, app, workers=DB_WORKERS):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='db')
+        self.connections = 0
+        self.ops = {
+            'ping': self.ping,
+            'login': self.login,
+            'logout': self.logout,
+            'modes': self.modes,
+            'play': self.play,
+            'next': self.next_question,
+            'answer': self.answer,
+            'stop': self.stop,
+            'leaderboard': self.leaderboard,
+            'ranking': self.ranking,
+            'search': self.search,
+            'partners': self.partners,
+            'chain': self.chain,
+        }
+
+    # runs blocking database work off the event loop
+    async def db(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    # builds the shared state before the first player connects, and fails loudly if it can't
+    def warm_up(self):
+        for thing in (self.app.db_pool, self.app.pokedex, self.app.scoreboard, self.app.result_writer):
+            thing.value()
+        # the fuzzy name index, otherwise the first guess builds it and stalls every connection
+        self.app.pokedex.matcher
+
+    async def handle(self, reader, writer):
+        session = Session()
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self.dispatch(session, line)
+                writer.write(json.dumps(reply, default=str, ensure_ascii=False).encode('utf-8') + b'\n')
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # client went away, or sent a line longer than MAX_LINE
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def dispatch(self, session, line):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {'ok': False, 'error': "Requests are one JSON object per line."}
+        if not isinstance(request, dict):
+            return {'ok': False, 'error': "Requests are one JSON object per line."}
+
+        reply = {'id': request['id']} if 'id' in request else {}
+        handler = self.ops.get(request.get('op'))
+        try:
+            if handler is None:
+                raise RequestError(f"Unknown op {request.get('op')!r}.")
+            reply.update(await handler(session, request))
+            reply['ok'] = True
+        except RequestError as e:
+            reply.update(ok=False, error=str(e))
+        except db_errors() as e:
+            reply.update(ok=False, error=f"Database error: {e}")
+        except Exception:
+            # one bad request shouldn't take everyone else down with it
+            traceback.print_exc()
+            reply.update(ok=False, error="Something went wrong on the server.")
+        return reply
+
+    # --------------------------------------------------------------------
+    # OPS
+    # --------------------------------------------------------------------
+
+    # engines work from memory, but one serving from the question bank reads a row per round
+    async def run_engine(self, engine, fn, *args):
+        if engine.bank is not None:
+            return await self.db(fn, *args)
+        return fn(*args)
+
+    async def ping(self, session, request):
+        return {'players': self.connections}
+
+    async def login(self, session, request):
+        user = await self.db(self.app.authenticate_user,
+                             str(request.get('identifier', '')).strip(), str(request.get('password', '')))
+        if not user:
+            raise RequestError("Invalid username/email or password.")
+        session.user = user
+        session.sampler = Sampler(self.app.pokedex.value())
+        session.engine = None
+        return {'user': user}
+
+    async def logout(self, session, request):
+        session.__init__()
+        return {}
+
+    async def modes(self, session, request):
+        return {'modes': [
+            {'mode_id': m['mode_id'], 'mode_name': m['mode_name'], 'description': m.get('description') or ""}
+            for m in self.app.pokedex.modes if m['mode_name'] in ENGINES
+        ]}
+
+    async def play(self, session, request):
+        user = session.require_user()
+        engine_class = ENGINES.get(request.get('mode'))
+        if engine_class is None:
+            raise RequestError(f"Unknown mode {request.get('mode')!r}.")
+        levels = {name: level for level, name in DIFFICULTIES.items()}
+        level = None
+        if request.get('level'):
+            level = levels.get(request['level'])
+            if level is None:
+                raise RequestError(f"Unknown level {request['level']!r}, use {', '.join(levels)}.")
+        bank = self.app.question_bank.value() if self.app.QUESTION_BANK_ENABLED else None
+        session.engine = engine_class(user['user_id'], self.app.pokedex.value(), session.sampler,
+                                      self.app.result_writer.value(), bank=bank, level=level)
+        reply = await self.next_question(session, request)
+        reply['title'] = session.engine.title.strip().strip('= ')
+        return reply
+
+    async def next_question(self, session, request):
+        engine = session.require_engine()
+        if session.refill is not None:
+            refill, session.refill = session.refill, None
+            try:
+                await refill
+            except db_errors():
+                # nothing got lined up, next_question reads the round itself
+                pass
+        question = await self.run_engine(engine, engine.next_question)
+        if question is None:
+            raise RequestError(engine.empty_message)
+        return {'question': question}
+
+    async def answer(self, session, request):
+        engine = session.require_engine()
+        try:
+            result = await self.run_engine(engine, engine.submit, request.get('answer', ''))
+        except InvalidAnswer as e:
+            # the question is still open, the client just asks again
+            raise RequestError(str(e))
+        except RuntimeError:
+            raise RequestError("No question to answer, ask for the next one first.")
+        # a bank engine reads its next round from the database, that happens after the reply goes out
+        if engine.bank is not None:
+            session.refill = asyncio.ensure_future(self.db(engine.fill))
+        return {'result': result}
+
+    # leaves the game and saves its rounds so the leaderboards have them
+    async def stop(self, session, request):
+        session.engine = None
+        await self.db(self.app.result_writer.flush)
+        return {}
+
+    # general = top 10 of all time, day/week/month = top 10 so far this period
+    async def leaderboard(self, session, request):
+        board = request.get('board', 'general')
+        if board == 'general':
+            return {'rows': await self.db(self.app.general_leaderboard)}
+        if board not in PERIODS:
+            raise RequestError(f"Unknown board {board!r}, use general, {', '.join(PERIODS)}.")
+
+        mode_id = None
+        if request.get('mode'):
+            mode_id = self.app.pokedex.mode_id(request['mode'])
+            if mode_id is None:
+                raise RequestError(f"Unknown mode {request['mode']!r}.")
+        today = date.today()
+        return {'rows': await self.db(self.app.window_rows, period_start(board, today), today, mode_id)}
+
+    async def ranking(self, session, request):
+        user = session.require_user()
+        return {'standing': await self.db(self.app.my_standing, user['user_id'])}
+
+    async def search(self, session, request):
+        name = str(request.get('name', '')).strip()
+        found = self.app.search_pokemon(name)
+        if not found:
+            return {'pokemon': None, 'suggestions': self.app.pokedex.suggest(name)}
+        pokemon = dict(found[0])
+        pokemon.update(self.app.search_pokemon_stats(name)[0])
+        return {'pokemon': pokemon}
+
+    # the pokemon's name resolved the same way search does, or an error with suggestions
+    def find_pokemon(self, name):
+        name = str(name or '').strip()
+        entry = self.app.pokedex.match(name)
+        if not entry:
+            suggestions = self.app.pokedex.suggest(name)
+            hint = f" Did you mean: {', '.join(s['name'] for s in suggestions)}?" if suggestions else ""
+            raise RequestError(f"No Pokémon named {name!r}.{hint}")
+        return entry
+
+    # everything that can breed with the pokemon, empty when it can't breed
+    async def partners(self, session, request):
+        entry = self.find_pokemon(request.get('name'))
+        return {'pokemon': entry['name'], 'partners': self.app.search_breeding_partners(entry['name'])}
+
+    # the shortest breeding chain between two pokemon, empty when there is none
+    async def chain(self, session, request):
+        start = self.find_pokemon(request.get('start'))
+        end = self.find_pokemon(request.get('end'))
+        return {'chain': self.app.search_breeding_chain(start['name'], end['name'])}
+
+
+async def serve(host=HOST, port=PORT, unix=None, workers=DB_WORKERS):
+    import project
+
+    server = QuizServer(project, workers)
+    await server.db(server.warm_up)
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, path=unix, limit=MAX_LINE)
+        where = unix
+    else:
+        listener = await asyncio.start_server(server.handle, host, port, limit=MAX_LINE)
+        where = ', '.join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in listener.sockets)
+    print(f"PokeQuiz server listening on {where}", flush=True)
+
+    # Ctrl+C or a plain kill stops it cleanly, the result writer saves what's queued on the way out
+    stopping = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(sig, stopping.set)
+        except (NotImplementedError, RuntimeError):
+            # no signal handlers on Windows, Ctrl+C still ends asyncio.run
+            pass
+    async with listener:
+        await stopping.wait()
+    print("\nShutting down.")
+    server.executor.shutdown(wait=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the quiz to many players over line-delimited JSON.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=DB_WORKERS, help="threads for database calls")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,558 @@
+# storage.py
+# Picks the database the app runs on.
+# MySQL (database.ConnectionPool) is still the default. SQLite is built in for
+# single-machine installs and kiosks that shouldn't need a server process, and
+# ':memory:' gives a throwaway database that is ready in milliseconds.
+# Both backends hand out the same thing: pool.cursor() is a dictionary cursor
+# that commits when the block finishes and rolls back if it raises, and
+# pool.connection() is a raw connection. So every query in the app stays written
+# once, in MySQL's dialect, and SQLitePool rewrites the handful of spots where
+# SQLite spells things differently (placeholders, upserts, NOW(), date math).
+#
+# POKEQUIZ_DB_BACKEND=mysql (default) or sqlite
+# POKEQUIZ_SQLITE_PATH=pokequiz.db (default) or :memory:
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from functools import lru_cache
+
+import querylog
+
+
+BACKEND = os.environ.get('POKEQUIZ_DB_BACKEND', 'mysql').lower()
+SQLITE_PATH = os.environ.get('POKEQUIZ_SQLITE_PATH', 'pokequiz.db')
+
+# what to catch around database calls, whichever backend is running
+# (the mysql driver is slow to import and sqlite-only installs don't have it, so it
+# only counts once something has imported it, nothing can raise its errors before that)
+def db_errors():
+    mysql = sys.modules.get('mysql.connector')
+    return (sqlite3.Error, mysql.Error) if mysql else (sqlite3.Error,)
+
+# the subset of those where the database got the statement and turned the row itself down,
+# retrying the same row won't ever work (anything else could be the connection)
+def db_rejections():
+    mysql = sys.modules.get('mysql.connector')
+    rejected = (sqlite3.IntegrityError, sqlite3.DataError)
+    return rejected + (mysql.IntegrityError, mysql.DataError) if mysql else rejected
+
+
+# returns a pool for the configured backend (or the one asked for)
+# with POKEQUIZ_QUERY_LOG=1 it comes back wrapped so every statement is timed (see querylog.py)
+def open_pool(backend=None, **options):
+    backend = (backend or BACKEND).lower()
+    if backend == 'mysql':
+        from database import ConnectionPool
+        pool = ConnectionPool(**options)
+    elif backend == 'sqlite':
+        pool = SQLitePool(**options)
+    else:
+        raise ValueError(f"Unknown database backend {backend!r}, expected 'mysql' or 'sqlite'")
+
+    return querylog.instrument(pool) if querylog.ENABLED else pool
+
+
+# --------------------------------------------------------------------
+# MYSQL -> SQLITE
+# --------------------------------------------------------------------
+
+_REWRITES = [
+    (re.compile(r"VALUES\((\w+)\)"), r"excluded.\1"),
+    (re.compile(r"\bON DUPLICATE KEY UPDATE\b"), "ON CONFLICT DO UPDATE SET"),
+    (re.compile(r"\bINSERT IGNORE\b"), "INSERT OR IGNORE"),
+    (re.compile(r"\bNOW\(\)"), "DATETIME('now', 'localtime')"),
+    (re.compile(r"\bRAND\(\)"), "RANDOM()"),
+    # d - INTERVAL n DAY, only ever used to find the start of a week/month
+    (re.compile(r"(\w+) - INTERVAL (.+?) DAY\b"), r"DATE(\1, '-' || (\2) || ' days')"),
+    (re.compile(r"%s"), "?"),
+]
+
+@lru_cache(maxsize=512)
+def translate(sql):
+    for pattern, replacement in _REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+def _day(value):
+    return date.fromisoformat(str(value)[:10])
+
+# MySQL's date functions the queries use, WEEKDAY is 0 for Monday like in MySQL
+def _weekday(value):
+    return None if value is None else _day(value).weekday()
+
+def _dayofmonth(value):
+    return None if value is None else _day(value).day
+
+# dates go in as ISO text and TIMESTAMP/DATE columns come back as datetime/date like mysql gives us
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(sep=' '))
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_converter('TIMESTAMP', lambda b: datetime.fromisoformat(b.decode()))
+sqlite3.register_converter('DATE', lambda b: date.fromisoformat(b.decode()[:10]))
+
+
+class SQLiteCursor:
+
+    def __init__(self, conn, dictionary=False):
+        self.cursor = conn.cursor()
+        self.dictionary = dictionary
+        self.statement = None
+
+    def execute(self, sql, params=()):
+        self.statement = sql
+        self.cursor.execute(translate(sql), tuple(params or ()))
+
+    def executemany(self, sql, seq_params):
+        self.statement = sql
+        self.cursor.executemany(translate(sql), [tuple(p) for p in seq_params])
+
+    @property
+    def column_names(self):
+        return tuple(d[0] for d in self.cursor.description or ())
+
+    def _row(self, row):
+        if row is None or not self.dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def fetchone(self):
+        return self._row(self.cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(r) for r in self.cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(r) for r in self.cursor.fetchall()]
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self.cursor.lastrowid
+
+    def close(self):
+        self.cursor.close()
+
+
+class SQLiteConnection:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    # buffered is accepted so callers written for mysql work unchanged, sqlite always streams
+    def cursor(self, dictionary=False, buffered=None):
+        return SQLiteCursor(self.conn, dictionary)
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+
+class SQLitePool:
+
+    # one connection shared by every thread, callers take turns through the lock
+    # (SQLite only has one writer at a time anyway, and ':memory:' only exists on
+    # the connection that made it). pool_size etc. are accepted and ignored so it
+    # can be swapped in wherever a ConnectionPool is made.
+    def __init__(self, path=SQLITE_PATH, **_):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        self.conn.execute("PRAGMA foreign_keys = ON;")
+        if path != ':memory:':
+            self.conn.execute("PRAGMA journal_mode = WAL;")
+        self.conn.create_function('WEEKDAY', 1, _weekday, deterministic=True)
+        self.conn.create_function('DAYOFMONTH', 1, _dayofmonth, deterministic=True)
+        # tables the schema is about to add to a database that already exists
+        existing = {r[0] for r in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table';")}
+        new_tables = {t for t, _ in SQLITE_BACKFILLS if t not in existing} if existing else set()
+        self.conn.executescript(SQLITE_SCHEMA)
+        self._add_columns(new_tables)
+
+    # CREATE TABLE IF NOT EXISTS leaves a database made before a column was added alone,
+    # so columns added later (SQLITE_ADDED_COLUMNS) get ALTERed in here, and tables it just
+    # added to an older database get their backfill (SQLITE_BACKFILLS)
+    def _add_columns(self, new_tables=()):
+        for table, column, definition in SQLITE_ADDED_COLUMNS:
+            have = {r[1] for r in self.conn.execute(f"PRAGMA table_info({table});")}
+            if column not in have:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition};")
+        for table, statement in SQLITE_BACKFILLS:
+            if table in new_tables:
+                self.conn.execute(statement)
+        self.conn.commit()
+
+    @contextmanager
+    def connection(self):
+        with self.lock:
+            yield SQLiteConnection(self.conn)
+
+    @contextmanager
+    def cursor(self):
+        with self.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+
+# --------------------------------------------------------------------
+# SQLITE SCHEMA
+# --------------------------------------------------------------------
+
+# the same tables, reference rows and indexes migrate.py ends up with on MySQL,
+# written the way SQLite wants them. Everything is IF NOT EXISTS / OR IGNORE so
+# it runs every time a database is opened. Names compare case-insensitively
+# (NOCASE) the way they do under MySQL's default collation.
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_roles (
+    role_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    role_name TEXT COLLATE NOCASE UNIQUE NOT NULL
+);
+INSERT OR IGNORE INTO user_roles (role_name) VALUES ('Admin'), ('Mod'), ('Normal User');
+
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT COLLATE NOCASE NOT NULL UNIQUE,
+    email TEXT COLLATE NOCASE NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    role_id INT NOT NULL DEFAULT 3 REFERENCES user_roles(role_id),
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime')),
+    last_login TIMESTAMP DEFAULT NULL,
+    status TEXT DEFAULT 'active' CHECK (status IN ('active', 'inactive', 'banned'))
+);
+
+CREATE TABLE IF NOT EXISTS user_profiles (
+    profile_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL UNIQUE REFERENCES users(user_id) ON DELETE CASCADE,
+    display_name TEXT COLLATE NOCASE NOT NULL,
+    role_id INT NOT NULL REFERENCES user_roles(role_id),
+    bio TEXT,
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime')),
+    display_name_key TEXT GENERATED ALWAYS AS (LOWER(TRIM(display_name))) STORED
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_profiles_display_name_key ON user_profiles (display_name_key);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    session_token TEXT NOT NULL UNIQUE,
+    login_time TIMESTAMP DEFAULT (DATETIME('now', 'localtime')),
+    logout_time TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS growth_rates (
+    growth_rate_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    growth_rate_name TEXT COLLATE NOCASE NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS special_groups (
+    special_group_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    special_group_name TEXT COLLATE NOCASE NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS pokemon (
+    pokemon_id INT PRIMARY KEY,
+    name TEXT COLLATE NOCASE NOT NULL,
+    generation INT,
+    species TEXT COLLATE NOCASE,
+    height DOUBLE,
+    weight DOUBLE,
+    base_exp INT,
+    catch_rate INT,
+    base_friendship INT,
+    egg_cycles INT,
+    growth_rate_id INT REFERENCES growth_rates(growth_rate_id),
+    special_group_id INT REFERENCES special_groups(special_group_id),
+    name_key TEXT GENERATED ALWAYS AS (LOWER(TRIM(name))) STORED
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_pokemon_name_key ON pokemon (name_key);
+
+CREATE TABLE IF NOT EXISTS pokemon_stats (
+    pokemon_id INT PRIMARY KEY REFERENCES pokemon(pokemon_id),
+    hp INT,
+    attack INT,
+    defense INT,
+    sp_atk INT,
+    sp_def INT,
+    speed INT,
+    total INT,
+    ev_yield TEXT
+);
+
+CREATE TABLE IF NOT EXISTS types (
+    type_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type_name TEXT COLLATE NOCASE UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS pokemon_types (
+    pokemon_id INT NOT NULL PRIMARY KEY REFERENCES pokemon(pokemon_id),
+    slot1_type INT NOT NULL REFERENCES types(type_id),
+    slot2_type INT DEFAULT NULL REFERENCES types(type_id)
+);
+
+CREATE TABLE IF NOT EXISTS abilities (
+    ability_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ability_name TEXT COLLATE NOCASE UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS pokemon_abilities (
+    pokemon_id INT PRIMARY KEY REFERENCES pokemon(pokemon_id),
+    ability1_id INT NOT NULL REFERENCES abilities(ability_id),
+    ability2_id INT REFERENCES abilities(ability_id),
+    hidden_ability_id INT REFERENCES abilities(ability_id)
+);
+
+CREATE TABLE IF NOT EXISTS egg_groups (
+    egg_group_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    egg_group_name TEXT COLLATE NOCASE UNIQUE NOT NULL
+);
+INSERT OR IGNORE INTO egg_groups (egg_group_name) VALUES
+('Amorphous'), ('Bug'), ('Ditto'), ('Dragon'), ('Fairy'), ('Field'), ('Flying'), ('Grass'),
+('Human-Like'), ('Mineral'), ('Monster'), ('Undiscovered'), ('Water 1'), ('Water 2'), ('Water 3');
+
+CREATE TABLE IF NOT EXISTS pokemon_egg_groups (
+    pokemon_id INT PRIMARY KEY REFERENCES pokemon(pokemon_id),
+    egg_group1_id INT NOT NULL REFERENCES egg_groups(egg_group_id),
+    egg_group2_id INT REFERENCES egg_groups(egg_group_id)
+);
+
+CREATE TABLE IF NOT EXISTS game_modes (
+    mode_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mode_name TEXT UNIQUE NOT NULL,
+    description TEXT
+);
+INSERT OR IGNORE INTO game_modes (mode_name, description) VALUES
+('guess_stats', 'Identify a Pokémon from its stats'),
+('guess_weight', 'Choose which Pokémon weighs more'),
+('guess_dexnum', 'Guess the Pokémon based on its Pokédex number'),
+('guess_ability', 'Guess a Pokémon that has the shown ability'),
+('guess_egg_group', 'Guess whether two Pokémon share an egg group'),
+('guess_type', 'Guess a Pokémon that matches the given type'),
+('guess_species', 'Guess a Pokémon that matches the given species');
+
+CREATE TABLE IF NOT EXISTS leaderboard_general (
+    entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(user_id),
+    mode_id INT NOT NULL REFERENCES game_modes(mode_id),
+    score INT NOT NULL,
+    correct INT DEFAULT 0,
+    incorrect INT DEFAULT 0,
+    bank_seq BIGINT,
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_general_user_mode ON leaderboard_general (user_id, mode_id);
+CREATE INDEX IF NOT EXISTS idx_general_created ON leaderboard_general (created_at);
+
+CREATE TABLE IF NOT EXISTS leaderboard_guess_stats (
+    stats_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(user_id),
+    pokemon_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    is_correct BOOLEAN NOT NULL,
+    score INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_guess_stats_score ON leaderboard_guess_stats (score, created_at);
+CREATE INDEX IF NOT EXISTS idx_guess_stats_created ON leaderboard_guess_stats (created_at);
+
+CREATE TABLE IF NOT EXISTS leaderboard_guess_weight (
+    weight_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(user_id),
+    pokemon1_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    pokemon2_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    user_choice_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    correct_pokemon_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    is_correct BOOLEAN NOT NULL,
+    score INT NOT NULL,
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_guess_weight_score ON leaderboard_guess_weight (score, created_at);
+
+CREATE TABLE IF NOT EXISTS leaderboard_guess_dexnum (
+    guess_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(user_id),
+    shown_dex INT NOT NULL,
+    user_choice_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    correct_pokemon_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    is_correct BOOLEAN NOT NULL,
+    score INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_guess_dexnum_score ON leaderboard_guess_dexnum (score, created_at);
+
+CREATE TABLE IF NOT EXISTS leaderboard_guess_ability (
+    ability_guess_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(user_id),
+    ability_id INT NOT NULL REFERENCES abilities(ability_id),
+    guessed_pokemon_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    is_correct BOOLEAN NOT NULL,
+    score INT DEFAULT 0,
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_guess_ability_score ON leaderboard_guess_ability (score, created_at);
+
+CREATE TABLE IF NOT EXISTS leaderboard_guess_egg_group (
+    egg_guess_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(user_id),
+    pokemon1_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    pokemon2_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    share_egg_group BOOLEAN NOT NULL,
+    user_answer BOOLEAN NOT NULL,
+    is_correct BOOLEAN NOT NULL,
+    score INT DEFAULT 0,
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_guess_egg_group_score ON leaderboard_guess_egg_group (score, created_at);
+
+CREATE TABLE IF NOT EXISTS leaderboard_guess_type (
+    type_guess_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(user_id),
+    type1_id INT NOT NULL REFERENCES types(type_id),
+    type2_id INT REFERENCES types(type_id),
+    guessed_pokemon_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    is_correct BOOLEAN NOT NULL,
+    score INT DEFAULT 0,
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_guess_type_score ON leaderboard_guess_type (score, created_at);
+
+CREATE TABLE IF NOT EXISTS leaderboard_guess_species (
+    species_guess_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(user_id),
+    given_species TEXT NOT NULL,
+    guessed_pokemon_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    is_correct BOOLEAN NOT NULL,
+    score INT DEFAULT 0,
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_guess_species_score ON leaderboard_guess_species (score, created_at);
+
+CREATE TABLE IF NOT EXISTS pokemon_favorites_count (
+    pokemon_id INT PRIMARY KEY REFERENCES pokemon(pokemon_id),
+    favorite_count INT NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_favorites_count ON pokemon_favorites_count (favorite_count);
+
+CREATE TABLE IF NOT EXISTS user_favorite_pokemon (
+    user_id INT NOT NULL REFERENCES users(user_id),
+    pokemon_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime')),
+    PRIMARY KEY (user_id, pokemon_id)
+);
+CREATE INDEX IF NOT EXISTS idx_favorite_pokemon ON user_favorite_pokemon (pokemon_id);
+
+CREATE TABLE IF NOT EXISTS pokemon_comments (
+    comment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(user_id),
+    pokemon_id INT NOT NULL REFERENCES pokemon(pokemon_id),
+    comment TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_comments_pokemon ON pokemon_comments (pokemon_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_comments_user ON pokemon_comments (user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS user_feedback (
+    feedback_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(user_id),
+    feedback TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_user ON user_feedback (user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS leaderboard_totals (
+    user_id INT PRIMARY KEY REFERENCES users(user_id),
+    total_games INT NOT NULL DEFAULT 0,
+    total_score BIGINT NOT NULL DEFAULT 0,
+    correct INT NOT NULL DEFAULT 0,
+    incorrect INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_totals_rank ON leaderboard_totals (total_score, total_games);
+
+CREATE TABLE IF NOT EXISTS leaderboard_mode_totals (
+    user_id INT NOT NULL REFERENCES users(user_id),
+    mode_id INT NOT NULL REFERENCES game_modes(mode_id),
+    total_games INT NOT NULL DEFAULT 0,
+    total_score BIGINT NOT NULL DEFAULT 0,
+    correct INT NOT NULL DEFAULT 0,
+    incorrect INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime')),
+    PRIMARY KEY (user_id, mode_id)
+);
+CREATE INDEX IF NOT EXISTS idx_mode_totals_rank ON leaderboard_mode_totals (mode_id, total_score, total_games);
+
+CREATE TABLE IF NOT EXISTS leaderboard_period_totals (
+    period TEXT NOT NULL CHECK (period IN ('day', 'week', 'month')),
+    period_start DATE NOT NULL,
+    mode_id INT NOT NULL REFERENCES game_modes(mode_id),
+    user_id INT NOT NULL REFERENCES users(user_id),
+    total_games INT NOT NULL DEFAULT 0,
+    total_score BIGINT NOT NULL DEFAULT 0,
+    correct INT NOT NULL DEFAULT 0,
+    incorrect INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime')),
+    PRIMARY KEY (period, period_start, mode_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_period_rank
+    ON leaderboard_period_totals (period, period_start, mode_id, total_score, total_games);
+
+CREATE TABLE IF NOT EXISTS question_answer_sets (
+    answer_key CHAR(16) PRIMARY KEY,
+    answers TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS question_bank (
+    mode_id INT NOT NULL REFERENCES game_modes(mode_id),
+    seq INT NOT NULL,
+    pokemon1_id INT NOT NULL,
+    pokemon2_id INT NULL,
+    detail_id INT NULL,
+    answer_key CHAR(16) NOT NULL,
+    difficulty TINYINT NOT NULL,
+    PRIMARY KEY (mode_id, seq)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS question_bank_modes (
+    mode_id INT PRIMARY KEY REFERENCES game_modes(mode_id),
+    first_seq INT NOT NULL,
+    size INT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS question_bank_cursors (
+    user_id INT NOT NULL REFERENCES users(user_id),
+    mode_id INT NOT NULL REFERENCES game_modes(mode_id),
+    next_seq BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, mode_id)
+);
+"""
+
+# columns added to SQLITE_SCHEMA tables after databases were already made with them,
+# (table, column, definition), see SQLitePool._add_columns
+SQLITE_ADDED_COLUMNS = [
+    ('leaderboard_general', 'bank_seq', 'BIGINT'),
+]
+
+# tables added to SQLITE_SCHEMA later that have to be filled in from what's already there
+# when an older database gets them, (table, statement), see SQLitePool._add_columns
+SQLITE_BACKFILLS = [
+    ('question_bank_modes', """
+        INSERT OR IGNORE INTO question_bank_modes (mode_id, first_seq, size)
+        SELECT mode_id, 0, MAX(seq) + 1
+        FROM question_bank
+        GROUP BY mode_id;
+    """),
+]